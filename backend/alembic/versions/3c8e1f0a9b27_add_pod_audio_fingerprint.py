@@ -0,0 +1,65 @@
+"""add_pod_audio_fingerprint
+
+Revision ID: 3c8e1f0a9b27
+Revises: ef1b35f107b6
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8e1f0a9b27'
+down_revision: Union[str, None] = 'ef1b35f107b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Les tables sont créées par Base.metadata.create_all au démarrage : cette révision ne fait
+# qu'ajouter aux bases existantes ce que create_all n'ajoute pas (colonnes, index, contraintes).
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("pods"):
+        # Base neuve : create_all crée le schéma complet
+        return
+    columns = {column["name"] for column in inspector.get_columns("pods")}
+
+    if "audio_fingerprint" not in columns:
+        op.add_column("pods", sa.Column("audio_fingerprint", sa.LargeBinary(), nullable=True))
+    if "duplicate_of_id" not in columns:
+        op.add_column("pods", sa.Column("duplicate_of_id", sa.Integer(), nullable=True))
+        op.create_index("ix_pods_duplicate_of_id", "pods", ["duplicate_of_id"])
+    if bind.dialect.name != "sqlite":
+        # Contrainte éventuellement créée par create_all sans ON DELETE : remplacée
+        for foreign_key in inspector.get_foreign_keys("pods"):
+            if foreign_key["constrained_columns"] == ["duplicate_of_id"] and foreign_key.get("name"):
+                op.drop_constraint(foreign_key["name"], "pods", type_="foreignkey")
+        op.create_foreign_key(
+            "pods_duplicate_of_id_fkey", "pods", "pods", ["duplicate_of_id"], ["id"], ondelete="SET NULL"
+        )
+
+    if not inspector.has_table("audio_fingerprint_hashes"):
+        op.create_table(
+            "audio_fingerprint_hashes",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("pod_id", sa.Integer(), sa.ForeignKey("pods.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("hash", sa.BigInteger(), nullable=False),
+            sa.Column("offset", sa.Integer(), nullable=False),
+        )
+        op.create_index("ix_audio_fingerprint_hashes_pod_id", "audio_fingerprint_hashes", ["pod_id"])
+        op.create_index("ix_audio_fingerprint_hashes_hash", "audio_fingerprint_hashes", ["hash"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("audio_fingerprint_hashes")
+    op.drop_index("ix_pods_duplicate_of_id", table_name="pods")
+    with op.batch_alter_table("pods") as batch_op:
+        batch_op.drop_column("duplicate_of_id")
+        batch_op.drop_column("audio_fingerprint")
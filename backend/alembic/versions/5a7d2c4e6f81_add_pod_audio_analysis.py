@@ -0,0 +1,46 @@
+"""add_pod_audio_analysis
+
+Revision ID: 5a7d2c4e6f81
+Revises: 3c8e1f0a9b27
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a7d2c4e6f81'
+down_revision: Union[str, None] = '3c8e1f0a9b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Colonnes de l'analyse audio des Pods (durée, caractéristiques de l'audio, forme d'onde)
+COLUMNS = [
+    ("duration_seconds", sa.Float()),
+    ("audio_bitrate", sa.Integer()),
+    ("audio_sample_rate", sa.Integer()),
+    ("audio_channels", sa.Integer()),
+    ("waveform_peaks", sa.LargeBinary()),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("pods"):
+        # Base neuve : create_all crée le schéma complet
+        return
+    columns = {column["name"] for column in inspector.get_columns("pods")}
+    for name, type_ in COLUMNS:
+        if name not in columns:
+            op.add_column("pods", sa.Column(name, type_, nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("pods") as batch_op:
+        for name, _ in reversed(COLUMNS):
+            batch_op.drop_column(name)
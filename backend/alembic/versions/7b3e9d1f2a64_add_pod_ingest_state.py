@@ -0,0 +1,42 @@
+"""add_pod_ingest_state
+
+Revision ID: 7b3e9d1f2a64
+Revises: 5a7d2c4e6f81
+Create Date: 2026-10-19 09:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e9d1f2a64'
+down_revision: Union[str, None] = '5a7d2c4e6f81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("pods"):
+        # Base neuve : create_all crée le schéma complet
+        return
+    columns = {column["name"] for column in inspector.get_columns("pods")}
+
+    # Pods existants : NULL, aucune ingestion à reprendre
+    if "ingest_status" not in columns:
+        op.add_column("pods", sa.Column("ingest_status", sa.String(), nullable=True))
+        op.create_index("ix_pods_ingest_status", "pods", ["ingest_status"])
+    if "ingest_state" not in columns:
+        op.add_column("pods", sa.Column("ingest_state", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_pods_ingest_status", table_name="pods")
+    with op.batch_alter_table("pods") as batch_op:
+        batch_op.drop_column("ingest_state")
+        batch_op.drop_column("ingest_status")
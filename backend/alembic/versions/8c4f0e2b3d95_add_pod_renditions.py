@@ -0,0 +1,40 @@
+"""add_pod_renditions
+
+Revision ID: 8c4f0e2b3d95
+Revises: 7b3e9d1f2a64
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4f0e2b3d95'
+down_revision: Union[str, None] = '7b3e9d1f2a64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("pods"):
+        # Base neuve : create_all crée le schéma complet
+        return
+    columns = {column["name"] for column in inspector.get_columns("pods")}
+
+    # Pods existants : sans déclinaison, la copie d'écoute d'origine est servie
+    if "audio_renditions" not in columns:
+        op.add_column("pods", sa.Column("audio_renditions", sa.JSON(), nullable=True))
+    if "preview_url" not in columns:
+        op.add_column("pods", sa.Column("preview_url", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("pods") as batch_op:
+        batch_op.drop_column("preview_url")
+        batch_op.drop_column("audio_renditions")
@@ -0,0 +1,35 @@
+"""add_profile_avatar_variants
+
+Revision ID: 9d5a1b3c4e06
+Revises: 8c4f0e2b3d95
+Create Date: 2026-10-19 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d5a1b3c4e06'
+down_revision: Union[str, None] = '8c4f0e2b3d95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("profiles"):
+        # Base neuve : create_all crée le schéma complet
+        return
+    # Profils existants : NULL, profile_picture_url reste servie telle quelle
+    if "avatar_variants" not in {column["name"] for column in inspector.get_columns("profiles")}:
+        op.add_column("profiles", sa.Column("avatar_variants", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("profiles") as batch_op:
+        batch_op.drop_column("avatar_variants")
@@ -0,0 +1,36 @@
+"""add_upload_session_storage_key
+
+Revision ID: a1e6c2d8f317
+Revises: 9d5a1b3c4e06
+Create Date: 2026-10-19 09:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1e6c2d8f317'
+down_revision: Union[str, None] = '9d5a1b3c4e06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("upload_sessions"):
+        # Table créée par create_all, déjà avec la colonne
+        return
+    if "storage_key" not in {column["name"] for column in inspector.get_columns("upload_sessions")}:
+        op.add_column("upload_sessions", sa.Column("storage_key", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("upload_sessions"):
+        with op.batch_alter_table("upload_sessions") as batch_op:
+            batch_op.drop_column("storage_key")
@@ -0,0 +1,42 @@
+"""add_listing_indexes
+
+Revision ID: b2f7d3e9a428
+Revises: a1e6c2d8f317
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2f7d3e9a428'
+down_revision: Union[str, None] = 'a1e6c2d8f317'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Index de la pagination par curseur (created_at, id) des listes de Pods et d'utilisateurs
+INDEXES = [
+    ("pods", "ix_pods_created_at_id", ["created_at", "id"]),
+    ("pods", "ix_pods_owner_id_created_at_id", ["owner_id", "created_at", "id"]),
+    ("users", "ix_users_created_at_id", ["created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    for table, name, columns in INDEXES:
+        if not inspector.has_table(table):
+            # Base neuve : create_all crée le schéma complet
+            continue
+        if name not in {index["name"] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,38 @@
+"""add_pod_counters
+
+Revision ID: c3a8e4f0b539
+Revises: b2f7d3e9a428
+Create Date: 2026-10-19 10:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a8e4f0b539'
+down_revision: Union[str, None] = 'b2f7d3e9a428'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("pods"):
+        # Base neuve : create_all crée le schéma complet
+        return
+    columns = {column["name"] for column in inspector.get_columns("pods")}
+    # NOT NULL avec valeur par défaut en base : les Pods existants partent de 0
+    for name in ("play_count", "like_count"):
+        if name not in columns:
+            op.add_column("pods", sa.Column(name, sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("pods") as batch_op:
+        batch_op.drop_column("like_count")
+        batch_op.drop_column("play_count")
@@ -16,6 +16,114 @@ class Settings(BaseSettings):
     PROJECT_EMAIL: str = "admin@example.com"
     PROJECT_ID: str = "default_project_id"
 
+    # Détection d'activité vocale (VAD) avant transcription
+    VAD_ENABLED: bool = True
+    VAD_FRAME_MS: int = 30
+    VAD_THRESHOLD_DB: float = -40.0  # Énergie minimale (dBFS) d'une trame considérée comme parole
+    VAD_MIN_SILENCE_MS: int = 600  # Les silences plus courts sont conservés tels quels
+    VAD_PADDING_MS: int = 150  # Marge conservée autour de chaque zone de parole
+
+    # Profils d'encodage audio : copie "speech" pour la transcription, copie "playback" pour l'écoute
+    SPEECH_AUDIO_CODEC: str = "libopus"
+    SPEECH_AUDIO_FORMAT: str = "ogg"
+    SPEECH_AUDIO_BITRATE: str = "24k"
+    SPEECH_SAMPLE_RATE: int = 16000
+    PLAYBACK_AUDIO_CODEC: str = "libmp3lame"
+    PLAYBACK_AUDIO_FORMAT: str = "mp3"
+    PLAYBACK_AUDIO_BITRATE: str = "96k"
+    PLAYBACK_AUDIO_CHANNELS: int = 2
+    # Pistes recopiées telles quelles (-c:a copy) au lieu d'être réencodées pour l'écoute
+    PLAYBACK_COPY_CODECS: str = "aac,opus,mp3"
+    PLAYBACK_COPY_MIN_BITRATE: int = 48000  # bit/s, en dessous la qualité d'écoute est insuffisante
+    PLAYBACK_COPY_MAX_BITRATE: int = 256000  # bit/s, au-dessus le réencodage réduit nettement le stockage
+
+    # Déclinaisons de débit pour la lecture adaptative et extrait de prévisualisation
+    RENDITIONS_ENABLED: bool = True
+    RENDITION_CODEC: str = "libopus"
+    RENDITION_FORMAT: str = "webm"
+    RENDITION_BITRATES: str = "32k,64k,128k"
+    PREVIEW_SECONDS: int = 30
+    PREVIEW_START_SECONDS: int = 0
+
+    # Détection des doublons par empreinte audio
+    FINGERPRINT_ENABLED: bool = True
+    FINGERPRINT_INDEX_SECONDS: int = 120  # Durée du début de l'audio indexée pour la recherche de candidats
+    FINGERPRINT_MAX_BIT_ERROR_RATE: float = 0.25  # Taux d'erreur binaire maximal pour considérer deux audios identiques
+
+    # Forme d'onde précalculée pour les lecteurs
+    WAVEFORM_PEAK_COUNT: int = 800  # Nombre de paires (min, max) stockées par Pod
+
+    # Cache disque des médias distants (retranscription, empreintes, formes d'onde)
+    MEDIA_CACHE_DIR: str = "/tmp/spotbulle-media-cache"
+    MEDIA_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024  # 2 Go
+    MEDIA_CACHE_REVALIDATE_SECONDS: int = 300  # Durée pendant laquelle une entrée est servie sans revalidation ETag
+
+    # Téléversements
+    MAX_REQUEST_BODY_BYTES: int = 200 * 1024 * 1024  # Limite globale du corps des requêtes (200 Mo)
+    MAX_UPLOAD_BYTES: int = 100 * 1024 * 1024  # Limite par fichier média (100 Mo)
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    UPLOAD_SPOOL_DIR: Optional[str] = None  # Répertoire des fichiers temporaires (défaut : répertoire temporaire système)
+    UPLOAD_SESSION_TTL_HOURS: int = 24  # Durée de vie d'un téléversement reprenable inachevé
+    STREAMING_INGEST_ENABLED: bool = True  # Extraction audio en flux pendant la réception de la vidéo
+
+    # Stockage des fichiers audio : "local" (servi sous /static/media) ou "s3" (S3, MinIO, Supabase Storage)
+    STORAGE_BACKEND: str = "local"
+    STORAGE_LOCAL_DIR: str = "./static/media"
+    STORAGE_PUBLIC_BASE_URL: Optional[str] = None  # URL publique des objets (défaut : déduite du backend)
+    STORAGE_S3_ENDPOINT_URL: Optional[str] = None  # Défaut : point d'accès S3 de Supabase Storage
+    STORAGE_S3_REGION: str = "us-east-1"
+    STORAGE_S3_ACCESS_KEY: str = ""
+    STORAGE_S3_SECRET_KEY: str = ""
+    STORAGE_MULTIPART_PART_SIZE: int = 8 * 1024 * 1024  # Taille des parties des envois multipart (5 Mo minimum)
+    STORAGE_MAX_CONNECTIONS: int = 20  # Connexions HTTP simultanées vers le stockage
+    PRESIGNED_UPLOAD_EXPIRES_SECONDS: int = 900  # Validité des URLs d'envoi direct vers le stockage
+    PRESIGNED_DOWNLOAD_EXPIRES_SECONDS: int = 3600  # Validité des URLs de téléchargement direct
+    # Lectures des médias (voir media_fetch_service)
+    STORAGE_READ_CONNECTIONS_PER_HOST: int = 10
+    STORAGE_READ_MAX_RETRIES: int = 2
+    STORAGE_READ_BACKOFF_SECONDS: float = 0.2  # Attente de base avant une nouvelle tentative (doublée à chaque fois)
+    STORAGE_READ_BACKOFF_MAX_SECONDS: float = 2.0
+    STORAGE_HEDGE_PERCENTILE: float = 0.95  # Latence au-delà de laquelle une seconde requête est envoyée
+    STORAGE_HEDGE_MAX_RATIO: float = 0.1  # Part maximale de requêtes supplémentaires
+
+    # Ramasse-miettes du stockage (fichiers sans référence ou orphelins)
+    MEDIA_GC_ENABLED: bool = True
+    MEDIA_GC_INTERVAL_SECONDS: int = 3600
+    MEDIA_GC_GRACE_SECONDS: int = 24 * 3600  # Âge minimal d'un fichier avant suppression (envois en cours)
+    MEDIA_GC_BATCH_SIZE: int = 50  # Suppressions simultanées par lot
+    MEDIA_GC_BATCH_PAUSE_SECONDS: float = 1.0  # Pause entre deux lots
+
+    # Recherche plein texte des Pods (voir pod_search_service)
+    SEARCH_TEXT_CONFIG: str = "french"  # Configuration PostgreSQL (racinisation, mots vides)
+
+    # Compteurs d'écoutes et de likes (tampon en mémoire et journal, voir pod_counter_service)
+    COUNTER_FLUSH_INTERVAL_SECONDS: float = 5.0  # Report en base des compteurs agrégés
+    COUNTER_JOURNAL_DIR: str = "./data/counter-journal"  # Segments rejoués au redémarrage après un arrêt brutal
+
+    # Autocomplétion des tags (index en mémoire, voir tag_index_service)
+    TAG_INDEX_REFRESH_SECONDS: int = 300  # Rechargement complet, pour suivre les autres processus
+
+    # Service des médias locaux sous /static
+    MEDIA_ACCEL_REDIRECT_PREFIX: Optional[str] = None  # Ex. "/_protected": envoi délégué à nginx (X-Accel-Redirect)
+
+    # Images de profil (avatars)
+    PUBLIC_BASE_URL: str = "http://localhost:8000"  # URL publique de l'API, pour les fichiers servis sous /static
+    AVATAR_DIR: str = "./static/avatars"
+    AVATAR_SIZES: str = "64,128,256"  # Côtés en pixels des variantes WebP
+    AVATAR_DEFAULT_SIZE: int = 128  # Variante référencée par profile_picture_url
+    AVATAR_WEBP_QUALITY: int = 80
+    AVATAR_MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+
+    # Exécution des processus ffmpeg
+    FFMPEG_MAX_CONCURRENCY: Optional[int] = None  # Processus simultanés (défaut : nombre de CPU)
+    # Extractions en flux (/upload/stream) : pool séparé, car un processus y reste actif tant que le
+    # client envoie sa vidéo ; des téléversements lents n'occupent ainsi pas les créneaux des autres
+    # traitements (analyse, déclinaisons). Un flux sans progrès (ni entrée ni sortie) est interrompu.
+    FFMPEG_STREAM_MAX_CONCURRENCY: Optional[int] = None  # Défaut : moitié de FFMPEG_MAX_CONCURRENCY (au moins 1)
+    FFMPEG_STREAM_IDLE_TIMEOUT_SECONDS: float = 30.0
+    FFMPEG_TIMEOUT_SECONDS: float = 600.0  # Délai maximal d'un traitement avant que le processus soit tué
+    FFMPEG_MAX_QUEUE_DEPTH: int = 32  # Au-delà, les nouveaux traitements sont refusés (503)
+
     @validator("SUPABASE_URL")
     def validate_supabase_url(cls, v):
         if not urlparse(v).scheme in ['http', 'https']:
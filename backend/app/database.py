@@ -23,7 +23,7 @@ Base = declarative_base()
 
 # Importer les modèles ici pour s'assurer qu'ils sont enregistrés avec Base.metadata
 # avant qu'Alembic ne tente de générer des migrations.
-from .models import user_model, pod_model, profile_model
+from .models import user_model, pod_model, profile_model, transcript_segment_model, audio_fingerprint_model, upload_session_model, media_object_model
 
 # Fonction pour obtenir une session de base de données (dépendance pour les routes)
 def get_db():
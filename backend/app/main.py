@@ -7,9 +7,14 @@ from slowapi.errors import RateLimitExceeded
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 from fastapi import HTTPException
+import asyncio
 import os
 import logging
 
+from .config import settings
+from .services.ffmpeg_service import get_ffmpeg_metrics
+from .services import ingest_service, media_fetch_service, media_gc_service, pod_counter_service, pod_search_service, storage_service, tag_index_service, tag_service
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("spotbulle-api")
@@ -22,7 +27,7 @@ except ImportError:
 
 # Importation des routes
 try:
-    from .routes import auth_routes, user_routes, pod_routes, profile_routes, ia_routes, video_routes
+    from .routes import auth_routes, user_routes, pod_routes, profile_routes, ia_routes, video_routes, upload_routes, media_routes, tag_routes
 except ImportError:
     logger.warning("Impossible d'importer toutes les routes - utilisation des routes de base")
 
@@ -34,6 +39,8 @@ try:
     from .database import Base, engine
     logger.info("Initialisation des tables de la base de données...")
     Base.metadata.create_all(bind=engine)
+    pod_search_service.ensure_search_index(engine)
+    tag_service.migrate_legacy_tags(engine)
     logger.info("Tables initialisées avec succès")
 except Exception as e:
     logger.error(f"Erreur lors de l'initialisation des tables: {e}")
@@ -47,28 +54,98 @@ app = FastAPI(
     redoc_url="/api/v1/redoc"
 )
 
-class EnhancedSecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        security_headers = {
-            "X-Content-Type-Options": "nosniff",
-            "X-Frame-Options": "DENY",
-            "Content-Security-Policy": "default-src 'self'",
-            "Strict-Transport-Security": "max-age=63072000; includeSubDomains",
-            "Referrer-Policy": "strict-origin-when-cross-origin"
-        }
-        response.headers.update(security_headers)
-        return response
-
-class LargeFileUploadMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        content_length = request.headers.get("content-length")
-        if content_length and int(content_length) > 209715200:  # 200 Mo
-            return JSONResponse(
-                status_code=413,
-                content={"detail": "Taille du fichier trop importante"}
-            )
-        return await call_next(request)
+class EnhancedSecurityHeadersMiddleware:
+    """
+    Ajoute les en-têtes de sécurité aux réponses. Middleware ASGI pur : seul le message de début
+    de réponse est modifié, le corps (fichiers audio notamment) passe sans traitement.
+    Les médias sous /static/ ne reçoivent pas les en-têtes propres aux documents (CSP, X-Frame-Options).
+    """
+    security_headers = [
+        (b"x-content-type-options", b"nosniff"),
+        (b"strict-transport-security", b"max-age=63072000; includeSubDomains"),
+        (b"referrer-policy", b"strict-origin-when-cross-origin")
+    ]
+    document_headers = [
+        (b"x-frame-options", b"DENY"),
+        (b"content-security-policy", b"default-src 'self'")
+    ]
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        added_headers = list(self.security_headers)
+        if not scope["path"].startswith("/static/"):
+            added_headers += self.document_headers
+        added_names = {name for name, _ in added_headers}
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = [(name, value) for name, value in message.get("headers", []) if name.lower() not in added_names]
+                message = {**message, "headers": headers + added_headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+class RequestBodyTooLarge(Exception):
+    pass
+
+class LargeFileUploadMiddleware:
+    """
+    Limite la taille du corps des requêtes.
+
+    L'en-tête Content-Length est vérifié d'emblée, puis les octets réellement reçus sont comptés
+    au fil de la lecture : les requêtes en transfert "chunked" (sans Content-Length) sont aussi bornées.
+    Middleware ASGI pur, pour intercepter le flux `receive` sans mettre le corps en mémoire.
+    """
+    def __init__(self, app, max_body_size: int = settings.MAX_REQUEST_BODY_BYTES):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        too_large_response = JSONResponse(
+            status_code=413,
+            content={"detail": "Taille du fichier trop importante"}
+        )
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+            return await too_large_response(scope, receive, send)
+
+        state = {"received": 0, "exceeded": False, "response_started": False}
+
+        async def limited_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                state["received"] += len(message.get("body", b""))
+                if state["received"] > self.max_body_size:
+                    state["exceeded"] = True
+                    raise RequestBodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            if state["exceeded"]:
+                # L'application a pu convertir l'exception en erreur 400/500 : on répond 413 à la place
+                if message["type"] == "http.response.start" and not state["response_started"]:
+                    state["response_started"] = True
+                    await too_large_response(scope, receive, send)
+                return
+            if message["type"] == "http.response.start":
+                state["response_started"] = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except RequestBodyTooLarge:
+            if not state["response_started"]:
+                state["response_started"] = True
+                await too_large_response(scope, receive, send)
 
 class AuthenticationErrorMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
@@ -101,9 +178,9 @@ app.add_middleware(
         "http://127.0.0.1:5173"
     ],
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH", "HEAD"],
     allow_headers=["*"],
-    expose_headers=["Content-Range", "X-Total-Count"]
+    expose_headers=["Content-Range", "X-Total-Count", "X-Next-Cursor", "Location", "Upload-Offset", "Upload-Length", "Tus-Resumable"]
 )
 
 app.state.limiter = limiter
@@ -115,7 +192,13 @@ os.makedirs("./static/media", exist_ok=True)
 os.makedirs("./static/audio", exist_ok=True)
 os.makedirs("./static/avatars", exist_ok=True)
 
-# Monter le dossier static
+# Médias (audio, déclinaisons, avatars) : route dédiée avec Range, ETag et cache immutable,
+# déclarée avant le montage /static qui sert le reste du dossier
+try:
+    app.include_router(media_routes.router)
+except NameError:
+    logger.warning("Route des médias indisponible - fichiers servis par le montage /static")
+
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 @app.get("/")
@@ -126,7 +209,46 @@ async def root_endpoint():
 @app.get("/health")
 async def health_check():
     logger.info("Health check endpoint called")
-    return {"status": "ok", "version": app.version}
+    return {
+        "status": "ok",
+        "version": app.version,
+        "ffmpeg": get_ffmpeg_metrics(),
+        "ingest": ingest_service.get_ingest_metrics(),
+        "media_fetch": media_fetch_service.get_media_fetch_metrics(),
+        "media_gc": media_gc_service.get_gc_report(),
+        "tag_index": tag_index_service.get_tag_index_metrics(),
+        "counters": pod_counter_service.get_counter_metrics()
+    }
+
+@app.on_event("startup")
+async def resume_interrupted_ingests():
+    # Les ingestions interrompues par un redémarrage reprennent en arrière-plan, sans retarder le démarrage
+    app.state.ingest_resume_task = asyncio.create_task(ingest_service.resume_pending_ingests())
+
+@app.on_event("startup")
+async def start_media_gc():
+    app.state.media_gc_task = asyncio.create_task(media_gc_service.media_gc_loop()) if settings.MEDIA_GC_ENABLED else None
+
+@app.on_event("startup")
+async def start_counter_flush():
+    # Reprise du journal des écoutes et likes, puis reports périodiques en base
+    app.state.counter_flush_task = asyncio.create_task(pod_counter_service.counter_flush_loop())
+
+@app.on_event("shutdown")
+async def flush_pending_counters():
+    app.state.counter_flush_task.cancel()
+    try:
+        await asyncio.to_thread(pod_counter_service.flush_counters)
+    except Exception as e:
+        # Les événements restent dans le journal, rejoués au prochain démarrage
+        logger.error(f"Compteurs non reportés à l'arrêt: {e}")
+
+@app.on_event("shutdown")
+async def close_storage_connections():
+    if app.state.media_gc_task:
+        app.state.media_gc_task.cancel()
+    await storage_service.get_storage_backend().aclose()
+    await media_fetch_service.media_reader.aclose()
 
 # Routes de base pour compatibilité frontend - SUPPRIMÉES EN MODE PROFESSIONNEL
 # Les vraies routes sont dans les modules séparés
@@ -137,11 +259,14 @@ API_PREFIX = "/api/v1"
 try:
     route_config = [
         (auth_routes.router, "", ["Authentication"]),
+        # Avant les routes utilisateurs : "/{user_id}" capturerait "/pods" et "/tags"
+        (pod_routes.router, "/pods", ["Pods"]),
+        (tag_routes.router, "", ["Tags"]),
         (user_routes.router, "", ["Users"]),
-        (pod_routes.router, "", ["Pods"]),
         (profile_routes.router, "", ["Profiles"]),
         (ia_routes.router, "", ["IA"]),
-        (video_routes.router, "", ["Videos"])
+        (video_routes.router, "", ["Videos"]),
+        (upload_routes.router, "", ["Uploads"])
     ]
 
     for router, path, tags in route_config:
@@ -1,5 +1,12 @@
 from .user_model import User
 from .profile_model import Profile
 from .pod_model import Pod
+from .transcript_segment_model import TranscriptSegment
+from .audio_fingerprint_model import AudioFingerprintHash
+from .upload_session_model import UploadSession
+from .media_object_model import MediaObject
+from .tag_model import Tag, pod_tags
+from .pod_like_model import PodLike
+from .counter_batch_model import CounterBatch
 
-__all__ = ["User", "Profile", "Pod"]
+__all__ = ["User", "Profile", "Pod", "TranscriptSegment", "AudioFingerprintHash", "UploadSession", "MediaObject", "Tag", "pod_tags", "PodLike", "CounterBatch"]
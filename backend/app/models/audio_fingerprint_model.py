@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, Index
+
+from ..database import Base
+
+class AudioFingerprintHash(Base):
+    """
+    Index inversé des sous-empreintes audio (32 bits) du début de chaque Pod.
+    Permet de retrouver en quelques lectures d'index les Pods candidats à un doublon.
+    """
+    __tablename__ = "audio_fingerprint_hashes"
+
+    id = Column(Integer, primary_key=True)
+    pod_id = Column(Integer, ForeignKey("pods.id", ondelete="CASCADE"), nullable=False, index=True)
+    hash = Column(BigInteger, nullable=False)  # Sous-empreinte 32 bits non signée
+    offset = Column(Integer, nullable=False)  # Position de la trame dans l'empreinte du Pod
+
+    __table_args__ = (
+        Index("ix_audio_fingerprint_hashes_hash", "hash"),
+    )
+
+    def __repr__(self):
+        return f"<AudioFingerprintHash(pod_id={self.pod_id}, hash={self.hash}, offset={self.offset})>"
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+
+from ..database import Base
+
+class CounterBatch(Base):
+    """
+    Lot de compteurs (écoutes, likes) déjà reporté sur les Pods, identifié par son segment de
+    journal. Enregistré dans la même transaction que les mises à jour : un segment rejoué après
+    un arrêt brutal n'est jamais compté deux fois (voir pod_counter_service).
+    """
+    __tablename__ = "counter_batches"
+
+    id = Column(String(32), primary_key=True)  # Nom du segment de journal (uuid4 hexadécimal)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<CounterBatch(id='{self.id}')>"
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
+from datetime import datetime
+
+from ..database import Base
+
+class MediaObject(Base):
+    """
+    Fichier du stockage identifié par l'empreinte SHA-256 de son contenu. Un même contenu n'est
+    stocké qu'une fois ; `ref_count` compte les références (champs de Pods) qui pointent vers lui.
+    """
+    __tablename__ = "media_objects"
+
+    sha256 = Column(String(64), primary_key=True)
+    key = Column(String, nullable=False, unique=True)  # Clé de l'objet dans le backend de stockage
+    url = Column(String, nullable=False, unique=True, index=True)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String, nullable=True)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<MediaObject(sha256='{self.sha256[:12]}', size={self.size}, ref_count={self.ref_count})>"
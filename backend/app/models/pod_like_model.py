@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from datetime import datetime
+
+from ..database import Base
+
+class PodLike(Base):
+    """
+    Like d'un utilisateur sur un Pod : au plus un par couple (clé primaire (user_id, pod_id)).
+    Le total par Pod est tenu dans `pods.like_count`, mis à jour par lots (voir pod_counter_service).
+    """
+    __tablename__ = "pod_likes"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    pod_id = Column(Integer, ForeignKey("pods.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Suppression en cascade et recomptage par Pod
+        Index("ix_pod_likes_pod_id", "pod_id"),
+    )
+
+    def __repr__(self):
+        return f"<PodLike(user_id={self.user_id}, pod_id={self.pod_id})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, LargeBinary, Float, Index
 import json
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -13,8 +13,24 @@ class Pod(Base):
     description = Column(Text)
     audio_file_url = Column(String)  # URL vers le fichier audio (ex : Supabase Storage)
     transcription = Column(Text, nullable=True)  # Transcription de l'audio
-    tags = Column(Text, nullable=True)  # Tags stockés en JSON sous forme de texte
     embedding = Column(JSON, nullable=True)  # Champ JSON pour stocker les embeddings
+    audio_fingerprint = Column(LargeBinary, nullable=True)  # Empreinte audio perceptuelle (uint32 little-endian)
+    duplicate_of_id = Column(Integer, ForeignKey("pods.id", ondelete="SET NULL"), nullable=True, index=True)  # Pod d'origine si doublon détecté (NULL si l'original est supprimé)
+    # Métadonnées audio relevées par ffprobe à l'ingestion
+    duration_seconds = Column(Float, nullable=True)
+    audio_bitrate = Column(Integer, nullable=True)  # bit/s
+    audio_sample_rate = Column(Integer, nullable=True)  # Hz
+    audio_channels = Column(Integer, nullable=True)
+    waveform_peaks = Column(LargeBinary, nullable=True)  # Paires (min, max) int8 entrelacées, voir audio_service.compute_waveform_peaks
+    # Déclinaisons de débit [{name, codec, bitrate (kbit/s), url}] et extrait de prévisualisation
+    audio_renditions = Column(JSON, nullable=True)
+    preview_url = Column(String, nullable=True)
+    # Ingestion en arrière-plan (voir ingest_service) : statut et état des étapes pour la reprise
+    ingest_status = Column(String, nullable=True, index=True)  # processing | ready | failed
+    ingest_state = Column(JSON, nullable=True)
+    # Compteurs mis à jour par lots agrégés (voir pod_counter_service), jamais à chaque événement
+    play_count = Column(Integer, nullable=False, default=0, server_default="0")
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     owner_id = Column(Integer, ForeignKey("users.id"))
@@ -22,5 +38,32 @@ class Pod(Base):
     # Relation avec l'utilisateur propriétaire
     owner = relationship("User", back_populates="pods")
 
+    # Tags normalisés (table d'association pod_tags, voir tag_model) ; à modifier via tag_service
+    tags = relationship("Tag", secondary="pod_tags", order_by="Tag.name", lazy="selectin")
+
+    # Segments horodatés de la transcription (voir transcript_segment_model)
+    transcript_segments = relationship(
+        "TranscriptSegment",
+        back_populates="pod",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="TranscriptSegment.start",
+        lazy="dynamic"
+    )
+
+    # Likes (un par utilisateur)
+    likes = relationship(
+        "PodLike",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="dynamic"
+    )
+
+    __table_args__ = (
+        # Pagination par curseur (created_at, id), sur tous les Pods ou ceux d'un propriétaire
+        Index("ix_pods_created_at_id", "created_at", "id"),
+        Index("ix_pods_owner_id_created_at_id", "owner_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Pod(id={self.id}, title='{self.title}')>"
@@ -11,6 +11,7 @@ class Profile(Base):
     user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
     bio = Column(Text, nullable=True)
     profile_picture_url = Column(String, nullable=True)
+    avatar_variants = Column(JSON, nullable=True) # {"64": url, "128": url, ...}, voir avatar_service
     # Champs pour le profil DISC
     disc_type = Column(String, nullable=True) # D, I, S, ou C, ou une combinaison
     disc_assessment_results = Column(JSON, nullable=True) # Pour stocker les résultats détaillés du test DISC
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, Index
+from datetime import datetime
+
+from ..database import Base
+
+# Association Pod ↔ Tag. La clé primaire (pod_id, tag_id) sert aux lectures par Pod,
+# l'index (tag_id, pod_id) au filtrage des Pods par tag
+pod_tags = Table(
+    "pod_tags",
+    Base.metadata,
+    Column("pod_id", Integer, ForeignKey("pods.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_pod_tags_tag_id_pod_id", "tag_id", "pod_id")
+)
+
+class Tag(Base):
+    """
+    Tag normalisé (minuscules, espaces simples), partagé par tous les Pods qui le portent.
+    `pod_count` est tenu à jour à chaque ajout ou retrait (voir tag_service).
+    """
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(50), nullable=False, unique=True, index=True)
+    pod_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Liste des tags les plus utilisés
+        Index("ix_tags_pod_count", "pod_count"),
+    )
+
+    def __repr__(self):
+        return f"<Tag(name='{self.name}', pod_count={self.pod_count})>"
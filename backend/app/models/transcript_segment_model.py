@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, Text, Index
+from sqlalchemy.orm import relationship
+
+from ..database import Base
+
+class TranscriptSegment(Base):
+    __tablename__ = "transcript_segments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    pod_id = Column(Integer, ForeignKey("pods.id", ondelete="CASCADE"), nullable=False)
+    start = Column(Float, nullable=False)  # Début du segment en secondes (audio original)
+    end = Column(Float, nullable=False)  # Fin du segment en secondes (audio original)
+    text = Column(Text, nullable=False)
+    normalized_text = Column(Text, nullable=False)  # Texte en minuscules sans accents, utilisé pour la recherche
+
+    # Relation avec le Pod
+    pod = relationship("Pod", back_populates="transcript_segments")
+
+    __table_args__ = (
+        # Toutes les lectures se font par pod, dans l'ordre chronologique
+        Index("ix_transcript_segments_pod_id_start", "pod_id", "start"),
+    )
+
+    def __repr__(self):
+        return f"<TranscriptSegment(pod_id={self.pod_id}, start={self.start:.2f}, end={self.end:.2f})>"
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, JSON
+from datetime import datetime
+
+from ..database import Base
+
+class UploadSession(Base):
+    """
+    Téléversement reprenable (protocole compatible tus 1.0) : la vidéo est reçue en plusieurs
+    requêtes PATCH, ajoutées à un fichier sur disque. `offset` est le nombre d'octets déjà reçus.
+    """
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(32), primary_key=True)  # Identifiant aléatoire (uuid4 hexadécimal), présent dans l'URL
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    upload_length = Column(BigInteger, nullable=False)  # Taille totale annoncée (octets)
+    offset = Column(BigInteger, nullable=False, default=0)
+    filename = Column(String, nullable=True)
+    content_type = Column(String, nullable=True)
+    upload_metadata = Column(JSON, nullable=True)  # Titre, description, tags, transcription demandée
+    spool_path = Column(String, nullable=False)
+    storage_key = Column(String, nullable=True)  # Envoi direct (URL signée) : clé de l'objet dans le stockage
+    status = Column(String, nullable=False, default="uploading")  # uploading | presigned | finalized
+    pod_id = Column(Integer, ForeignKey("pods.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<UploadSession(id='{self.id}', offset={self.offset}/{self.upload_length}, status='{self.status}')>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from typing import TYPE_CHECKING
@@ -39,6 +39,11 @@ class User(Base):
         lazy="dynamic"
     )
 
+    __table_args__ = (
+        # Pagination par curseur (created_at, id) de la liste des utilisateurs
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<User(id={self.id}, email='{self.email}')>"
 
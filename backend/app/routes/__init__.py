@@ -9,6 +9,9 @@ from .pod_routes import router as pod_router
 from .profile_routes import router as profile_router
 from .ia_routes import router as ia_router
 from .video_routes import router as video_router
+from .upload_routes import router as upload_router
+from .media_routes import router as media_router
+from .tag_routes import router as tag_router
 
 # Exporte tous les routeurs pour qu'ils soient accessibles via routes.*
 __all__ = [
@@ -17,5 +20,8 @@ __all__ = [
     "pod_router", 
     "profile_router", 
     "ia_router", 
-    "video_router"
+    "video_router",
+    "upload_router",
+    "media_router",
+    "tag_router"
 ]
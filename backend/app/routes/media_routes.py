@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Request
+import logging
+
+from ..services import media_serving_service
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Fichiers médias locaux, servis à leurs URLs historiques /static/... (hors préfixe /api/v1)
+router = APIRouter(
+    prefix="/static",
+    tags=["Media"],
+    include_in_schema=False
+)
+
+@router.api_route("/media/{path:path}", methods=["GET", "HEAD"])
+async def serve_stored_media(path: str, request: Request):
+    """Audio, déclinaisons et extraits du stockage local (noms adressés par contenu)."""
+    return media_serving_service.build_media_response(request, "media", path)
+
+@router.api_route("/audio/{path:path}", methods=["GET", "HEAD"])
+async def serve_audio(path: str, request: Request):
+    return media_serving_service.build_media_response(request, "audio", path)
+
+@router.api_route("/avatars/{path:path}", methods=["GET", "HEAD"])
+async def serve_avatar(path: str, request: Request):
+    return media_serving_service.build_media_response(request, "avatars", path)
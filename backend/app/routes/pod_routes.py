@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Response
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Response, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import logging
 
 from ..schemas import pod_schema, user_schema
-from ..services import pod_service, storage_service, transcription_service
+from ..services import audio_service, media_store_service, pod_search_service, pod_service, rendition_service, storage_service, transcription_service, transcript_service
 from ..utils import security
+from ..utils.pagination import set_next_cursor
 from ..database import get_db
 
 from slowapi import Limiter
@@ -101,7 +102,7 @@ async def create_pod(
 
 @router.get(
     "",
-    response_model=List[pod_schema.Pod],
+    response_model=List[pod_schema.PodSummary],
     summary="Récupérer tous les Pods",
     responses={
         200: {"description": "Liste des Pods récupérée avec succès"},
@@ -109,37 +110,47 @@ async def create_pod(
     }
 )
 async def get_all_pods(
+    response: Response,
     db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
+    skip: int = Query(0, ge=0, description="Obsolète : préférer `cursor`."),
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
     search: Optional[str] = None,
-    tags: Optional[str] = None
+    tags: Optional[str] = None,
+    tags_mode: str = Query("any", pattern="^(any|all)$", description="`any` : au moins un des tags, `all` : tous les tags.")
 ):
     """
-    Récupérer tous les Pods publics avec pagination et filtres optionnels.
+    Récupérer tous les Pods publics, du plus récent au plus ancien, avec filtres optionnels.
     
-    - **skip**: Nombre d'éléments à ignorer (pagination)
+    - **cursor**: Curseur de la page suivante (en-tête `X-Next-Cursor` de la réponse précédente)
+    - **skip**: Nombre d'éléments à ignorer (pagination par décalage, conservée pour compatibilité)
     - **limit**: Nombre maximum d'éléments à retourner
     - **search**: Terme de recherche dans le titre et la description
     - **tags**: Tags à filtrer (séparés par des virgules)
+    - **tags_mode**: `any` (au moins un des tags, par défaut) ou `all` (tous les tags)
     """
     try:
-        logger.info(f"Récupération des Pods - skip: {skip}, limit: {limit}, search: {search}")
+        logger.info(f"Récupération des Pods - cursor: {cursor}, skip: {skip}, limit: {limit}, search: {search}")
         
         # Conversion des tags en liste si fournis
         tag_list = tags.split(',') if tags else None
         
-        pods = await pod_service.get_pods(
+        pods, next_cursor = pod_service.get_pods_page(
             db=db,
-            skip=skip,
             limit=limit,
+            cursor=cursor,
+            skip=skip,
             search=search,
-            tags=tag_list
+            tags=tag_list,
+            match_all_tags=tags_mode == "all"
         )
+        set_next_cursor(response, next_cursor)
         
         logger.info(f"Nombre de Pods récupérés: {len(pods)}")
         return pods
         
+    except HTTPException as he:
+        raise he
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des Pods: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -149,32 +160,39 @@ async def get_all_pods(
 
 @router.get(
     "/my",
-    response_model=List[pod_schema.Pod],
+    response_model=List[pod_schema.PodSummary],
     summary="Récupérer mes Pods",
     dependencies=[Depends(security.get_current_active_user)]
 )
 async def get_my_pods(
+    response: Response,
     current_user: user_schema.User = Depends(security.get_current_active_user),
     db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100
+    skip: int = Query(0, ge=0, description="Obsolète : préférer `cursor`."),
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None
 ):
     """
-    Récupérer tous les Pods de l'utilisateur connecté.
+    Récupérer les Pods de l'utilisateur connecté, du plus récent au plus ancien
+    (page suivante : paramètre `cursor` issu de l'en-tête `X-Next-Cursor`).
     """
     try:
         logger.info(f"Récupération des Pods de l'utilisateur {current_user.id}")
         
-        pods = await pod_service.get_user_pods(
+        pods, next_cursor = pod_service.get_pods_page(
             db=db,
-            user_id=current_user.id,
+            limit=limit,
+            cursor=cursor,
             skip=skip,
-            limit=limit
+            owner_id=current_user.id
         )
+        set_next_cursor(response, next_cursor)
         
         logger.info(f"Nombre de Pods utilisateur récupérés: {len(pods)}")
         return pods
         
+    except HTTPException as he:
+        raise he
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des Pods utilisateur: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -182,6 +200,30 @@ async def get_my_pods(
             detail="Erreur lors de la récupération de vos Pods"
         )
 
+@router.get(
+    "/search",
+    response_model=List[pod_schema.PodSearchResult],
+    summary="Recherche plein texte dans les Pods"
+)
+async def search_pods(
+    q: str = Query(..., min_length=1, max_length=200, description="Mots recherchés dans le titre, la description et la transcription."),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    Pods classés par pertinence (le titre compte plus que la description, elle-même plus que la
+    transcription), avec un extrait où les termes trouvés sont entourés de `<mark>`.
+    """
+    try:
+        return pod_search_service.search_pods(db=db, query=q, limit=limit, offset=offset)
+    except Exception as e:
+        logger.error(f"Erreur lors de la recherche de Pods ({q}): {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur lors de la recherche"
+        )
+
 @router.get(
     "/{pod_id}",
     response_model=pod_schema.Pod,
@@ -197,7 +239,7 @@ async def get_pod(
     try:
         logger.info(f"Récupération du Pod {pod_id}")
         
-        pod = await pod_service.get_pod(db=db, pod_id=pod_id)
+        pod = pod_service.get_pod(db=db, pod_id=pod_id)
         if not pod:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -215,6 +257,153 @@ async def get_pod(
             detail="Erreur lors de la récupération du Pod"
         )
 
+@router.get(
+    "/{pod_id}/transcript/search",
+    response_model=List[pod_schema.TranscriptSegment],
+    summary="Rechercher dans la transcription d'un Pod"
+)
+async def search_pod_transcript(
+    pod_id: int,
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Rechercher un terme dans la transcription d'un Pod.
+
+    Retourne les segments correspondants avec leurs horodatages (en secondes),
+    pour permettre au lecteur de se positionner directement sur le passage.
+    """
+    try:
+        logger.info(f"Recherche dans la transcription du Pod {pod_id}: {q}")
+        
+        pod = pod_service.get_pod(db=db, pod_id=pod_id)
+        if not pod:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Pod non trouvé"
+            )
+        
+        return transcript_service.search_pod_segments(db=db, pod_id=pod_id, query=q, limit=limit)
+        
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Erreur lors de la recherche dans la transcription du Pod {pod_id}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur lors de la recherche dans la transcription"
+        )
+
+@router.get(
+    "/{pod_id}/waveform",
+    response_model=pod_schema.PodWaveform,
+    summary="Obtenir la forme d'onde et les métadonnées audio d'un Pod"
+)
+async def get_pod_waveform(
+    pod_id: int,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    """
+    Retourne la durée, les caractéristiques audio et la forme d'onde précalculée d'un Pod,
+    pour que le lecteur puisse s'afficher sans télécharger le fichier audio.
+    """
+    try:
+        pod = pod_service.get_pod(db=db, pod_id=pod_id)
+        if not pod:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Pod non trouvé"
+            )
+        
+        # La forme d'onde ne change pas une fois calculée
+        response.headers["Cache-Control"] = "public, max-age=86400"
+        peaks = audio_service.waveform_from_bytes(pod.waveform_peaks) if pod.waveform_peaks else None
+        return pod_schema.PodWaveform(
+            pod_id=pod.id,
+            duration_seconds=pod.duration_seconds,
+            bitrate=pod.audio_bitrate,
+            sample_rate=pod.audio_sample_rate,
+            channels=pod.audio_channels,
+            peaks=peaks.ravel().tolist() if peaks is not None else []
+        )
+        
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération de la forme d'onde du Pod {pod_id}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur lors de la récupération de la forme d'onde"
+        )
+
+@router.get(
+    "/{pod_id}/stream",
+    status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+    summary="Rediriger vers la déclinaison audio adaptée au client"
+)
+async def stream_pod_audio(
+    pod_id: int,
+    request: Request,
+    quality: Optional[str] = Query(None, pattern="^(low|medium|high)$", description="Force une déclinaison."),
+    preview: bool = Query(False, description="Servir l'extrait de prévisualisation."),
+    db: Session = Depends(get_db)
+):
+    """
+    Redirige vers l'audio du Pod au débit adapté à la connexion du client, d'après les
+    indications `Save-Data`, `Downlink` et `ECT` (Client Hints) ou le paramètre `quality`.
+    Sans déclinaison disponible, redirige vers la copie d'écoute d'origine. Sur un stockage
+    S3, la redirection pointe vers une URL signée de durée limitée.
+    """
+    try:
+        pod = pod_service.get_pod(db=db, pod_id=pod_id)
+        if not pod:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Pod non trouvé"
+            )
+
+        if preview and pod.preview_url:
+            url = pod.preview_url
+        else:
+            try:
+                downlink = float(request.headers.get("Downlink")) if request.headers.get("Downlink") else None
+            except ValueError:
+                downlink = None
+            rendition = rendition_service.select_rendition(
+                pod.audio_renditions,
+                save_data=request.headers.get("Save-Data", "").lower() == "on",
+                downlink=downlink,
+                ect=request.headers.get("ECT"),
+                quality=quality
+            )
+            url = rendition["url"] if rendition else pod.audio_file_url
+        if not url:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Audio non disponible pour ce Pod"
+            )
+
+        return Response(
+            status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+            headers={
+                "Location": storage_service.presign_download_url(url),
+                "Accept-CH": "Save-Data, Downlink, ECT",
+                "Vary": "Save-Data, Downlink, ECT",
+                "Cache-Control": "private, max-age=300"
+            }
+        )
+
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Erreur lors de la sélection de l'audio du Pod {pod_id}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur lors de la sélection de l'audio"
+        )
+
 @router.put(
     "/{pod_id}",
     response_model=pod_schema.Pod,
@@ -284,21 +473,31 @@ async def delete_pod(
         logger.info(f"Suppression du Pod {pod_id} par l'utilisateur {current_user.id}")
         
         # Vérifier que le Pod existe et appartient à l'utilisateur
-        existing_pod = await pod_service.get_pod(db=db, pod_id=pod_id)
+        existing_pod = pod_service.get_pod(db=db, pod_id=pod_id)
         if not existing_pod:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Pod non trouvé"
             )
         
-        if existing_pod.user_id != current_user.id:
+        if existing_pod.owner_id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Vous n'êtes pas autorisé à supprimer ce Pod"
             )
         
+        media_urls = pod_service.get_media_urls(existing_pod)
+        
         # Suppression du Pod
-        await pod_service.delete_pod(db=db, pod_id=pod_id)
+        pod_service.delete_pod(db=db, pod_id=pod_id)
+        
+        # Libération des références seulement : les fichiers sans référence sont supprimés du
+        # stockage en arrière-plan par le ramasse-miettes (media_gc_service)
+        for media_url in media_urls:
+            try:
+                media_store_service.release_media(db, media_url)
+            except Exception as e:
+                logger.warning(f"Média {media_url} du Pod {pod_id} non libéré: {str(e)}")
         
         logger.info(f"Pod {pod_id} supprimé avec succès")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -328,7 +527,7 @@ async def like_pod(
     try:
         logger.info(f"Like du Pod {pod_id} par l'utilisateur {current_user.id}")
         
-        result = await pod_service.toggle_like(
+        result = pod_service.toggle_like(
             db=db,
             pod_id=pod_id,
             user_id=current_user.id
@@ -361,7 +560,7 @@ async def record_play(
     try:
         logger.info(f"Écoute du Pod {pod_id} par l'utilisateur {current_user.id}")
         
-        result = await pod_service.record_play(
+        result = pod_service.record_play(
             db=db,
             pod_id=pod_id,
             user_id=current_user.id
@@ -1,11 +1,11 @@
 # Routes pour la gestion des profils utilisateurs et du DISC
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any 
 
 from ..schemas import profile_schema, user_schema, disc_schema 
-from ..services import profile_service, user_service, disc_service 
+from ..services import avatar_service, profile_service, user_service, disc_service 
 from ..utils import security
 from ..database import get_db
 
@@ -57,6 +57,25 @@ async def update_my_profile(
     # Convertir l'objet ORM en modèle Pydantic
     return profile_schema.Profile.model_validate(updated_profile) if hasattr(profile_schema.Profile, 'model_validate') else profile_schema.Profile.from_orm(updated_profile)
 
+@router.post("/me/avatar", response_model=profile_schema.Profile)
+@profile_router_limiter.limit("10/minute")
+async def upload_my_avatar(
+    request: Request,
+    file: UploadFile = File(..., description="Image JPEG, PNG, WebP ou GIF"),
+    db: Session = Depends(get_db),
+    current_user: user_schema.User = Depends(security.get_current_active_user)
+):
+    """
+    Remplace l'image de profil. L'image est recadrée au carré et déclinée en plusieurs tailles WebP ;
+    `profile_picture_url` pointe vers la taille par défaut, `avatar_variants` liste toutes les tailles.
+    """
+    profile = profile_service.get_profile_by_user_id(db, user_id=current_user.id)
+    if not profile:
+        profile = profile_service.create_user_profile(db, user=current_user, profile_in=profile_schema.ProfileCreate())
+
+    updated_profile = await avatar_service.update_profile_avatar(db, profile, file)
+    return profile_schema.Profile.model_validate(updated_profile)
+
 @router.get("/{user_id}", response_model=profile_schema.Profile)
 @profile_router_limiter.limit("30/minute")
 async def read_user_profile_by_id(
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List
+import logging
+
+from ..schemas import pod_schema
+from ..services import tag_index_service, tag_service
+from ..database import get_db
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/tags",
+    tags=["Tags"]
+)
+
+@router.get(
+    "",
+    response_model=List[pod_schema.TagCount],
+    summary="Tags les plus utilisés"
+)
+async def get_popular_tags(
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """
+    Tags portés par au moins un Pod, du plus au moins utilisé, avec le nombre de Pods de chacun.
+    """
+    try:
+        return tag_service.get_popular_tags(db=db, limit=limit)
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des tags: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur lors de la récupération des tags"
+        )
+
+@router.get(
+    "/suggest",
+    response_model=List[pod_schema.TagCount],
+    summary="Autocomplétion des tags"
+)
+async def suggest_tags(
+    prefix: str = Query("", max_length=50, description="Début du tag saisi (casse et espaces multiples ignorés)."),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """
+    Tags existants commençant par `prefix`, du plus au moins utilisé. Servi depuis un index en
+    mémoire : pas de requête en base à chaque frappe.
+    """
+    try:
+        return tag_index_service.suggest_tags(db=db, prefix=prefix, limit=limit)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'autocomplétion des tags ({prefix}): {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur lors de l'autocomplétion des tags"
+        )
@@ -0,0 +1,254 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request, Response, Header
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime, timedelta
+import logging
+
+from ..config import settings
+from ..schemas import pod_schema, upload_schema, user_schema
+from ..services import ingest_service, storage_service, upload_session_service, video_service
+from ..utils import security
+from ..database import get_db
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/uploads",
+    tags=["Uploads"],
+    dependencies=[Depends(security.get_current_active_user)],
+    responses={
+        404: {"description": "Session de téléversement introuvable ou expirée"},
+        409: {"description": "Position (Upload-Offset) incohérente"}
+    }
+)
+
+TUS_HEADERS = {"Tus-Resumable": upload_session_service.TUS_VERSION}
+
+
+@router.post(
+    "",
+    status_code=status.HTTP_201_CREATED,
+    summary="Créer un téléversement reprenable"
+)
+async def create_upload(
+    request: Request,
+    response: Response,
+    upload_length: int = Header(..., alias="Upload-Length"),
+    upload_metadata: Optional[str] = Header(None, alias="Upload-Metadata"),
+    db: Session = Depends(get_db),
+    current_user: user_schema.User = Depends(security.get_current_active_user)
+):
+    """
+    Crée une session de téléversement (tus 1.0 « creation »).
+
+    `Upload-Metadata` contient en base64 : `filename`, `filetype`, `title`, `description`,
+    `tags` (séparés par des virgules) et `transcribe` ("true"/"false").
+    L'URL de la session est retournée dans l'en-tête `Location`.
+    """
+    metadata = upload_session_service.parse_upload_metadata(upload_metadata)
+    video_service.validate_video_content_type(metadata.get("filetype"))
+
+    upload_session_service.delete_expired_sessions(db)
+    upload_session = upload_session_service.create_upload_session(
+        db=db,
+        user_id=current_user.id,
+        upload_length=upload_length,
+        metadata=metadata
+    )
+    response.headers.update(TUS_HEADERS)
+    response.headers["Location"] = str(request.url_for("get_upload_offset", session_id=upload_session.id))
+    response.headers["Upload-Offset"] = "0"
+    return {"id": upload_session.id, "upload_length": upload_session.upload_length, "expires_at": upload_session.expires_at}
+
+
+@router.head(
+    "/{session_id}",
+    summary="Position courante d'un téléversement"
+)
+async def get_upload_offset(
+    session_id: str,
+    db: Session = Depends(get_db),
+    current_user: user_schema.User = Depends(security.get_current_active_user)
+):
+    """Retourne dans `Upload-Offset` le nombre d'octets déjà reçus, pour reprendre l'envoi."""
+    upload_session = upload_session_service.get_upload_session(db, session_id, current_user.id)
+    return Response(
+        status_code=status.HTTP_200_OK,
+        headers={
+            **TUS_HEADERS,
+            "Upload-Offset": str(upload_session.offset),
+            "Upload-Length": str(upload_session.upload_length),
+            "Cache-Control": "no-store"
+        }
+    )
+
+
+@router.patch(
+    "/{session_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Envoyer une partie du fichier"
+)
+async def append_upload_chunk(
+    session_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    content_type: Optional[str] = Header(None, alias="Content-Type"),
+    db: Session = Depends(get_db),
+    current_user: user_schema.User = Depends(security.get_current_active_user)
+):
+    """
+    Ajoute le corps de la requête à la position `Upload-Offset` (qui doit être la position courante).
+    Le corps est écrit sur disque au fil de la réception, sans être chargé en mémoire.
+    """
+    if content_type != "application/offset+octet-stream":
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Content-Type attendu : application/offset+octet-stream"
+        )
+    upload_session = upload_session_service.get_upload_session(db, session_id, current_user.id)
+    new_offset = await upload_session_service.append_chunk(db, upload_session, upload_offset, request.stream())
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers={**TUS_HEADERS, "Upload-Offset": str(new_offset)}
+    )
+
+
+@router.delete(
+    "/{session_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Abandonner un téléversement"
+)
+async def delete_upload(
+    session_id: str,
+    db: Session = Depends(get_db),
+    current_user: user_schema.User = Depends(security.get_current_active_user)
+):
+    upload_session = upload_session_service.get_upload_session(db, session_id, current_user.id)
+    if upload_session.status == upload_session_service.STATUS_PRESIGNED:
+        # Objet éventuellement déjà déposé par le client
+        await storage_service.get_storage_backend().delete(upload_session.storage_key)
+    upload_session_service.delete_upload_session(db, upload_session)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=TUS_HEADERS)
+
+
+@router.post(
+    "/{session_id}/finalize",
+    response_model=pod_schema.Pod,
+    status_code=status.HTTP_201_CREATED,
+    summary="Finaliser un téléversement et créer le Pod"
+)
+async def finalize_upload(
+    session_id: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: user_schema.User = Depends(security.get_current_active_user)
+):
+    """
+    Crée le Pod à partir de la vidéo entièrement reçue. Le traitement (extraction audio,
+    transcription, indexation) se poursuit en arrière-plan, comme pour `/upload`.
+    """
+    upload_session = upload_session_service.get_upload_session(db, session_id, current_user.id)
+    if upload_session.status == upload_session_service.STATUS_FINALIZED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Téléversement déjà finalisé (Pod {upload_session.pod_id})"
+        )
+    if not upload_session_service.is_complete(upload_session):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Téléversement incomplet : {upload_session.offset}/{upload_session.upload_length} octets reçus"
+        )
+
+    return _create_pod_from_session(db, background_tasks, upload_session, current_user)
+
+
+@router.post(
+    "/presigned",
+    response_model=upload_schema.PresignedUpload,
+    status_code=status.HTTP_201_CREATED,
+    summary="Obtenir une URL d'envoi direct vers le stockage"
+)
+async def create_presigned_upload(
+    upload: upload_schema.PresignedUploadCreate,
+    db: Session = Depends(get_db),
+    current_user: user_schema.User = Depends(security.get_current_active_user)
+):
+    """
+    Retourne une URL signée de courte durée : le client y envoie la vidéo (PUT) directement,
+    sans passer par l'API, avec l'en-tête Content-Type indiqué. Il appelle ensuite
+    `/uploads/{id}/complete` pour créer le Pod.
+    """
+    video_service.validate_video_content_type(upload.content_type)
+    upload_session_service.delete_expired_sessions(db)
+    upload_session = upload_session_service.create_presigned_upload_session(db, current_user.id, upload)
+    return upload_schema.PresignedUpload(
+        id=upload_session.id,
+        upload_url=upload_session_service.presign_upload_session(upload_session),
+        headers={"Content-Type": upload_session.content_type},
+        expires_at=datetime.utcnow() + timedelta(seconds=settings.PRESIGNED_UPLOAD_EXPIRES_SECONDS)
+    )
+
+
+@router.post(
+    "/{session_id}/complete",
+    response_model=pod_schema.Pod,
+    status_code=status.HTTP_201_CREATED,
+    summary="Confirmer un envoi direct et créer le Pod"
+)
+async def complete_presigned_upload(
+    session_id: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: user_schema.User = Depends(security.get_current_active_user)
+):
+    """
+    Vérifie que la vidéo est présente dans le stockage, crée le Pod et lance son traitement en
+    arrière-plan (la vidéo est recopiée depuis le stockage par l'ingestion, puis supprimée).
+    """
+    upload_session = upload_session_service.get_upload_session(db, session_id, current_user.id)
+    if upload_session.status != upload_session_service.STATUS_PRESIGNED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Cette session n'est pas un envoi direct en attente de confirmation"
+        )
+    await upload_session_service.verify_presigned_upload(db, upload_session)
+    return _create_pod_from_session(db, background_tasks, upload_session, current_user)
+
+
+def _create_pod_from_session(
+    db: Session,
+    background_tasks: BackgroundTasks,
+    upload_session,
+    current_user: user_schema.User
+) -> pod_schema.Pod:
+    metadata = upload_session.upload_metadata or {}
+    title = (metadata.get("title") or "").strip()
+    if not 3 <= len(title) <= 150:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Le titre (métadonnée 'title') doit contenir entre 3 et 150 caractères"
+        )
+    description = metadata.get("description") or None
+    if description and len(description) > 5000:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La description ne peut pas dépasser 5000 caractères"
+        )
+
+    pod = ingest_service.create_ingesting_pod(
+        db=db,
+        owner_id=current_user.id,
+        title=title,
+        description=description,
+        tags=video_service.parse_tags(metadata.get("tags")),
+        source_path=upload_session.spool_path,
+        audio_filename=video_service.playback_audio_filename(upload_session.filename),
+        transcribe=(metadata.get("transcribe") or "").lower() in ("1", "true", "yes"),
+        source_key=upload_session.storage_key
+    )
+    upload_session_service.mark_finalized(db, upload_session, pod.id)
+    background_tasks.add_task(ingest_service.run_pod_ingest, pod.id)
+    logger.info(f"Téléversement {upload_session.id} finalisé: Pod {pod.id} créé")
+
+    return pod_schema.Pod.model_validate(pod)
@@ -1,12 +1,13 @@
 # Routes pour la gestion des utilisateurs (en dehors de l'authentification pure)
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from ..schemas import user_schema # Schémas Pydantic
 from ..services import user_service # Services CRUD pour les utilisateurs
 from ..utils import security # Pour get_current_active_user et les rôles
+from ..utils.pagination import set_next_cursor
 from ..database import get_db # Dépendance pour la session DB
 
 # Importer le limiteur global de main.py ou en créer un spécifique ici
@@ -35,16 +36,20 @@ def get_current_active_superuser(current_user: user_schema.User = Depends(securi
 @user_router_limiter.limit("20/minute") # Limite pour la liste des utilisateurs
 async def read_users(
     request: Request, 
-    skip: int = 0, 
-    limit: int = 100, 
+    response: Response,
+    skip: int = Query(0, ge=0, description="Obsolète : préférer `cursor`."), 
+    limit: int = Query(100, ge=1, le=100), 
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db), 
     current_user: user_schema.User = Depends(get_current_active_superuser) # Seuls les superusers peuvent lister tous les utilisateurs
 ):
     """
-    Récupère une liste d'utilisateurs. 
+    Récupère une liste d'utilisateurs, du plus récent au plus ancien. 
     Accessible uniquement par un superutilisateur.
+    La page suivante s'obtient avec le paramètre `cursor`, valeur de l'en-tête `X-Next-Cursor`.
     """
-    users = user_service.get_users(db, skip=skip, limit=limit)
+    users, next_cursor = user_service.get_users_page(db, limit=limit, cursor=cursor, skip=skip)
+    set_next_cursor(response, next_cursor)
     return users
 
 @router.get("/{user_id}", response_model=user_schema.User)
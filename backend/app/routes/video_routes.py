@@ -1,14 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Response
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Form, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import logging
-import tempfile
 import os
 
 from ..schemas import pod_schema, user_schema
-from ..services import pod_service, storage_service, transcription_service, video_service
+from ..services import pod_service, storage_service, transcription_service, video_service, ingest_service, upload_spool_service
 from ..utils import security
 from ..database import get_db
+from ..config import settings
 
 from slowapi import Limiter
 from slowapi.util import get_remote_address
@@ -43,6 +43,7 @@ router = APIRouter(
 @video_router_limiter.limit("5/minute")
 async def upload_video(
     request: Request,
+    background_tasks: BackgroundTasks,
     title: str = Form(..., min_length=3, max_length=150),
     description: Optional[str] = Form(None, max_length=5000),
     tags: Optional[str] = Form(None),
@@ -52,94 +53,153 @@ async def upload_video(
     current_user: user_schema.User = Depends(security.get_current_active_user)
 ):
     """
-    Téléverse une vidéo, extrait l'audio, crée un Pod et optionnellement transcrit l'audio
+    Téléverse une vidéo et crée un Pod.
+
+    La réponse est immédiate (`ingest_status` = "processing") : l'extraction de l'audio,
+    la transcription optionnelle, l'embedding et l'indexation se poursuivent en arrière-plan.
+    Le formulaire multipart est reçu en entier avant traitement : pour extraire l'audio pendant
+    la réception de la vidéo, utiliser `/upload/stream`.
     """
     # Validation du fichier vidéo
-    valid_video_types = ["video/mp4", "video/quicktime", "video/x-msvideo", "video/x-ms-wmv"]
-    if video_file.content_type not in valid_video_types:
+    video_service.validate_video_content_type(video_file.content_type)
+
+    try:
+        # Traitement des tags
+        tag_list = video_service.parse_tags(tags)
+
+        # Recopier la vidéo sur disque par blocs (taille maximale vérifiée au fil de l'eau, jamais en mémoire)
+        spooled_video = await upload_spool_service.spool_upload_file(video_file)
+        return _start_pod_ingest(
+            db, background_tasks, current_user, spooled_video,
+            title=title,
+            description=description,
+            tags=tag_list,
+            transcribe=transcribe
+        )
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Erreur téléversement vidéo : {str(e)}")
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Type de fichier vidéo non supporté. Types acceptés: {', '.join(valid_video_types)}"
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur interne lors du téléversement de la vidéo: {str(e)}"
         )
 
-    # Vérification taille fichier (100MB max)
-    MAX_SIZE = 100 * 1024 * 1024  # 100MB
-    content = await video_file.read()
-    if len(content) > MAX_SIZE:
+@router.post(
+    "/upload/stream",
+    response_model=pod_schema.Pod,
+    status_code=status.HTTP_201_CREATED,
+    summary="Téléverser une vidéo en flux (corps brut) et créer un Pod",
+    responses={
+        201: {"description": "Vidéo téléversée et Pod créé avec succès"},
+        400: {"description": "Données invalides"},
+        413: {"description": "Fichier trop volumineux"}
+    },
+    dependencies=[Depends(security.get_current_active_user)]
+)
+@video_router_limiter.limit("5/minute")
+async def upload_video_stream(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    title: str = Query(..., min_length=3, max_length=150),
+    description: Optional[str] = Query(None, max_length=5000),
+    tags: Optional[str] = Query(None),
+    filename: Optional[str] = Query(None, max_length=255, description="Nom du fichier vidéo d'origine."),
+    transcribe: bool = Query(False),
+    db: Session = Depends(get_db),
+    current_user: user_schema.User = Depends(security.get_current_active_user)
+):
+    """
+    Variante de `/upload` dont le corps est la vidéo elle-même (type dans `Content-Type`),
+    les métadonnées étant passées en paramètres de requête.
+
+    Le corps est lu au fil de sa réception : si le conteneur est lisible depuis un pipe (MP4
+    « faststart », MKV...), l'audio est extrait et téléversé pendant que la vidéo arrive.
+    Sinon, la vidéo est recopiée sur disque et l'audio extrait ensuite, comme avec `/upload`.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    video_service.validate_video_content_type(content_type)
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_UPLOAD_BYTES:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"Taille maximale autorisée : {MAX_SIZE//(1024*1024)}MB"
+            detail=f"Taille maximale autorisée : {settings.MAX_UPLOAD_BYTES // (1024 * 1024)}MB"
         )
-    await video_file.seek(0)
 
     try:
-        # Traitement des tags
-        tag_list = []
-        if tags:
-            raw_tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
-            if len(raw_tags) > 20:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Maximum 20 tags autorisés"
-                )
-            for tag in raw_tags:
-                if len(tag) > 50:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Tag trop long : '{tag[:20]}...' (max 50 caractères)"
-                    )
-                tag_list.append(tag)
-
-        # Sauvegarder temporairement le fichier vidéo
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(video_file.filename)[1]) as temp_video:
-            temp_video.write(content)
-            temp_video_path = temp_video.name
-
-        try:
-            # Extraire l'audio de la vidéo
-            audio_file_path = await video_service.extract_audio_from_video(temp_video_path)
-            
-            # Téléverser le fichier audio extrait
-            with open(audio_file_path, "rb") as audio_file:
-                audio_url = await storage_service.upload_audio_from_file(
-                    file_content=audio_file.read(),
-                    filename=f"{os.path.splitext(video_file.filename)[0]}.mp3",
-                    user_id=current_user.id
-                )
-            
-            # Création du Pod en base
-            pod = pod_service.create_pod(
-                db=db,
-                title=title,
-                description=description,
-                tags=tag_list,
-                audio_url=audio_url,
-                owner_id=current_user.id
+        tag_list = video_service.parse_tags(tags)
+        audio_filename = video_service.playback_audio_filename(filename)
+
+        # En-tête du conteneur lu sans être consommé : il fait partie du flux transmis ensuite
+        header, body = await upload_spool_service.peek_stream(request.stream(), 64 * 1024)
+        streamed_audio_url = None
+        if settings.STREAMING_INGEST_ENABLED and video_service.can_stream_container(header):
+            spooled_video, streamed_audio_url = await video_service.ingest_video_stream(
+                db,
+                body,
+                audio_filename=audio_filename,
+                filename=filename,
+                content_type=content_type
+            )
+        else:
+            spooled_video = await upload_spool_service.spool_stream(
+                body,
+                filename=filename,
+                content_type=content_type,
+                suffix=os.path.splitext(filename or "")[1]
             )
-            
-            # Transcription si demandée
-            if transcribe:
-                pod = await transcription_service.transcribe_pod(
-                    db=db,
-                    pod_id=pod.id,
-                    audio_url=audio_url
-                )
-            
-            # Convertir l'objet ORM en modèle Pydantic
-            return pod_schema.Pod.model_validate(pod) if hasattr(pod_schema.Pod, 'model_validate') else pod_schema.Pod.from_orm(pod)
-        
-        finally:
-            # Nettoyage des fichiers temporaires
-            if os.path.exists(temp_video_path):
-                os.unlink(temp_video_path)
-            if 'audio_file_path' in locals() and os.path.exists(audio_file_path):
-                os.unlink(audio_file_path)
+        return _start_pod_ingest(
+            db, background_tasks, current_user, spooled_video,
+            title=title,
+            description=description,
+            tags=tag_list,
+            transcribe=transcribe,
+            streamed_audio_url=streamed_audio_url
+        )
 
     except HTTPException as e:
         raise e
     except Exception as e:
-        logger.error(f"Erreur téléversement vidéo : {str(e)}")
+        logger.error(f"Erreur téléversement vidéo en flux : {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur interne lors du téléversement de la vidéo: {str(e)}"
         )
+
+def _start_pod_ingest(
+    db: Session,
+    background_tasks: BackgroundTasks,
+    current_user: user_schema.User,
+    spooled_video: upload_spool_service.SpooledUpload,
+    title: str,
+    description: Optional[str],
+    tags: List[str],
+    transcribe: bool,
+    streamed_audio_url: Optional[str] = None
+) -> pod_schema.Pod:
+    # Le Pod est créé immédiatement ; analyse, transcodage, téléversement, transcription,
+    # embedding et indexation sont exécutés en arrière-plan par le pipeline d'ingestion
+    # (qui devient responsable de la vidéo recopiée sur disque)
+    try:
+        pod = ingest_service.create_ingesting_pod(
+            db=db,
+            owner_id=current_user.id,
+            title=title,
+            description=description,
+            tags=tags,
+            source_path=spooled_video.path,
+            # Nom du fichier audio téléversé (l'extension dépend du profil d'écoute)
+            audio_filename=video_service.playback_audio_filename(spooled_video.filename),
+            transcribe=transcribe,
+            streamed_audio_url=streamed_audio_url
+        )
+    except Exception:
+        # Annule aussi la référence à l'audio extrait en flux, validée avec le Pod
+        db.rollback()
+        spooled_video.cleanup()
+        raise
+    background_tasks.add_task(ingest_service.run_pod_ingest, pod.id)
+
+    # Convertir l'objet ORM en modèle Pydantic
+    return pod_schema.Pod.model_validate(pod) if hasattr(pod_schema.Pod, 'model_validate') else pod_schema.Pod.from_orm(pod)
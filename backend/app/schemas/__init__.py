@@ -8,6 +8,7 @@ from .ia_schema import *
 from .pod_schema import *
 from .profile_schema import *
 from .token_schema import *
+from .upload_schema import *
 from .user_schema import *
 
 # Liste explicite des classes et fonctions exportées
@@ -26,6 +27,11 @@ __all__ = [
     "PodUpdate",
     "PodInDB",
     "Pod",
+    "PodSummary",
+    "AudioRendition",
+    "TranscriptSegment",
+    "PodWaveform",
+    "TagCount",
     
     # Profile schemas
     "ProfileBase",
@@ -38,6 +44,10 @@ __all__ = [
     "Token",
     "TokenData",
     
+    # Upload schemas
+    "PresignedUploadCreate",
+    "PresignedUpload",
+    
     # User schemas
     "UserBase",
     "UserCreate",
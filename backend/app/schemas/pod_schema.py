@@ -1,6 +1,6 @@
 # Schémas Pydantic pour l'entité Pod - Version corrigée pour Pydantic v2
 
-from pydantic import BaseModel, Field, HttpUrl, field_validator
+from pydantic import AliasChoices, BaseModel, Field, HttpUrl, field_validator
 from typing import Optional, List
 from datetime import datetime
 
@@ -34,12 +34,17 @@ class PodUpdate(BaseModel):
         "json_encoders": {datetime: lambda v: v.isoformat()}
     }
 
-# Schéma pour lire un pod (ce qui est retourné par l'API)
-class Pod(PodBase):
+# Schéma allégé pour les listes de pods (sans la transcription complète)
+class PodSummary(PodBase):
     id: int
-    user_id: int  # Renommé owner_id en user_id pour cohérence avec user_model
+    user_id: int = Field(..., validation_alias=AliasChoices("user_id", "owner_id"))  # Renommé owner_id en user_id pour cohérence avec user_model
     audio_file_url: Optional[HttpUrl] = None
-    transcription: Optional[str] = Field(None, description="Transcription du contenu audio.")
+    duplicate_of_id: Optional[int] = Field(None, description="Pod d'origine si l'audio est un doublon détecté par empreinte.")
+    duration_seconds: Optional[float] = Field(None, description="Durée de l'audio en secondes.")
+    ingest_status: Optional[str] = Field(None, description="État du traitement en arrière-plan : processing, ready ou failed.")
+    preview_url: Optional[HttpUrl] = Field(None, description="Extrait de prévisualisation (30 s).")
+    play_count: int = Field(0, description="Nombre d'écoutes (mis à jour toutes les quelques secondes).")
+    like_count: int = Field(0, description="Nombre de likes (mis à jour toutes les quelques secondes).")
     created_at: datetime
     updated_at: datetime
 
@@ -52,6 +57,50 @@ class Pod(PodBase):
         if isinstance(v, str):
             return [tag.strip() for tag in v.split(",") if tag.strip()]
         if isinstance(v, list):
-            # S'assurer que tous les éléments sont des strings et non vides après strip
-            return [str(tag).strip() for tag in v if str(tag).strip()]
+            # Tags du modèle (objets Tag) ou chaînes ; non vides après strip
+            names = [str(getattr(tag, "name", tag)).strip() for tag in v]
+            return [name for name in names if name]
         raise ValueError("Les tags doivent être une liste de chaînes de caractères ou une chaîne séparée par des virgules.")
+
+# Déclinaison de débit de l'audio d'un pod
+class AudioRendition(BaseModel):
+    name: str
+    codec: str
+    bitrate: int = Field(..., description="Débit en kbit/s.")
+    url: HttpUrl
+
+# Schéma pour lire un pod (ce qui est retourné par l'API)
+class Pod(PodSummary):
+    transcription: Optional[str] = Field(None, description="Transcription du contenu audio.")
+    audio_renditions: Optional[List[AudioRendition]] = Field(None, description="Déclinaisons de débit, de la plus légère à la plus lourde.")
+
+# Résultat de la recherche plein texte
+class PodSearchResult(BaseModel):
+    pod: PodSummary
+    rank: float = Field(..., description="Pertinence (plus élevé = plus pertinent).")
+    snippet: Optional[str] = Field(None, description="Extrait HTML échappé, termes trouvés entre <mark> et </mark>.")
+
+# Tag et nombre de Pods qui le portent
+class TagCount(BaseModel):
+    name: str
+    pod_count: int
+
+    model_config = {"from_attributes": True}
+
+# Segment horodaté de la transcription d'un pod
+class TranscriptSegment(BaseModel):
+    id: int
+    start: float = Field(..., description="Début du segment en secondes.")
+    end: float = Field(..., description="Fin du segment en secondes.")
+    text: str
+
+    model_config = {"from_attributes": True}
+
+# Forme d'onde et métadonnées audio d'un pod, pour l'affichage du lecteur
+class PodWaveform(BaseModel):
+    pod_id: int
+    duration_seconds: Optional[float] = None
+    bitrate: Optional[int] = Field(None, description="Débit audio en bit/s.")
+    sample_rate: Optional[int] = Field(None, description="Fréquence d'échantillonnage en Hz.")
+    channels: Optional[int] = None
+    peaks: List[int] = Field(default_factory=list, description="Paires (min, max) entrelacées, valeurs de -127 à 127.")
@@ -58,6 +58,7 @@ class Profile(ProfileBase):
     user_id: int
     disc_type: Optional[DISCType] = Field(None, description="Type de profil DISC de l'utilisateur.")
     disc_assessment_results: Optional[Dict[str, Any]] = Field(None, description="Résultats détaillés de l'évaluation DISC.")
+    avatar_variants: Optional[Dict[str, HttpUrl]] = Field(None, description="Variantes WebP de l'image de profil, par taille en pixels.")
     updated_at: datetime
     
     model_config = {"from_attributes": True}
@@ -0,0 +1,22 @@
+# Schémas Pydantic pour les téléversements directs vers le stockage (URLs signées)
+
+from pydantic import BaseModel, Field
+from typing import Dict
+from datetime import datetime
+
+from .pod_schema import PodBase
+
+# Demande d'envoi direct : métadonnées du futur pod et description du fichier vidéo
+class PresignedUploadCreate(PodBase):
+    filename: str = Field(..., min_length=1, max_length=255, description="Nom du fichier vidéo.")
+    content_type: str = Field(..., description="Type MIME de la vidéo, à renvoyer tel quel dans l'en-tête Content-Type du PUT.")
+    size: int = Field(..., gt=0, description="Taille exacte du fichier en octets.")
+    transcribe: bool = Field(False, description="Transcrire l'audio après l'envoi.")
+
+# URL signée retournée au client, qui envoie le fichier directement au stockage
+class PresignedUpload(BaseModel):
+    id: str = Field(..., description="Identifiant de la session, à utiliser pour /uploads/{id}/complete.")
+    upload_url: str
+    method: str = "PUT"
+    headers: Dict[str, str] = Field(default_factory=dict, description="En-têtes à envoyer avec la requête PUT.")
+    expires_at: datetime
@@ -3,31 +3,142 @@ Fichier d'initialisation pour le module services.
 Importe tous les services pour les rendre disponibles lors de l'initialisation de l'application.
 """
 
+from .audio_service import *
+from .avatar_service import *
 from .disc_service import *
+from .ffmpeg_service import *
+from .fingerprint_service import *
 from .ia_service import *
+from .ingest_service import *
+from .media_analysis_service import *
+from .media_cache_service import *
+from .media_fetch_service import *
+from .media_gc_service import *
+from .media_serving_service import *
+from .media_store_service import *
+from .pod_counter_service import *
+from .pod_search_service import *
 from .pod_service import *
 from .profile_service import *
+from .rendition_service import *
 from .storage_service import *
+from .tag_index_service import *
+from .tag_service import *
+from .transcript_service import *
 from .transcription_service import *
+from .upload_session_service import *
+from .upload_spool_service import *
 from .user_service import *
 from .video_service import *
 
 # Liste des services exportés
 __all__ = [
+    # Audio services
+    "TimestampMap",
+    "decode_to_pcm",
+    "detect_speech_regions",
+    "trim_silence",
+    "prepare_speech_audio",
+    "get_audio_profile",
+    "encode_pcm",
+    "probe_media",
+    "first_audio_stream",
+    "can_copy_audio_stream",
+    "compute_waveform_peaks",
+    
+    # Avatar services
+    "render_avatar_variants",
+    "store_avatar_variants",
+    "pick_avatar_url",
+    "update_profile_avatar",
+    
     # Disc services
     "process_disc_assessment",
     "get_disc_profile",
     
+    # FFmpeg services
+    "FFmpegRunner",
+    "FFmpegError",
+    "FFmpegTimeoutError",
+    "FFmpegBusyError",
+    "run_ffmpeg",
+    "stream_ffmpeg",
+    "get_ffmpeg_metrics",
+    
+    # Fingerprint services
+    "compute_fingerprint",
+    "fingerprint_media_file",
+    "find_duplicate_pod",
+    "index_pod_fingerprint",
+    "reuse_processing_results",
+    "fingerprint_pod",
+    
     # IA services
     "generate_ia_response",
     "process_ia_prompt",
     
+    # Ingest services
+    "Stage",
+    "StageSkipped",
+    "Pipeline",
+    "IngestContext",
+    "start_pod_ingest",
+    "run_pod_ingest",
+    "resume_pending_ingests",
+    "get_ingest_metrics",
+    
+    # Media analysis services
+    "MediaAnalysis",
+    "analyze_media_file",
+    "probe_audio_stream",
+    "apply_audio_format",
+    "save_pod_analysis",
+    "analyze_pod",
+    
+    # Media cache services
+    "MediaCache",
+    "fetch_media",
+    
+    # Media serving services
+    "resolve_media_path",
+    "build_media_response",
+    
+    # Media fetch services
+    "HedgedReader",
+    "get_media_fetch_metrics",
+    
+    # Media GC services
+    "run_media_gc",
+    "media_gc_loop",
+    "get_gc_report",
+    
+    # Media store services
+    "store_media_file",
+    "store_media_stream",
+    "acquire_media",
+    "release_media",
+    
+    # Pod counter services
+    "CounterBuffer",
+    "flush_counters",
+    "recover_counters",
+    "counter_flush_loop",
+    "get_counter_metrics",
+    
+    # Pod search services
+    "ensure_search_index",
+    "search_pods",
+    
     # Pod services
     "create_pod",
     "get_pod",
     "get_pods",
+    "get_pods_page",
     "update_pod",
     "delete_pod",
+    "get_media_urls",
+    "record_play",
+    "toggle_like",
     
     # Profile services
     "create_profile",
@@ -36,19 +147,73 @@ __all__ = [
     "update_profile",
     "delete_profile",
     
+    # Rendition services
+    "get_rendition_profiles",
+    "transcode_renditions",
+    "create_pod_renditions",
+    "select_rendition",
+    
     # Storage services
-    "upload_file",
-    "get_file_url",
+    "StorageBackend",
+    "LocalStorageBackend",
+    "S3StorageBackend",
+    "StorageError",
+    "StoredObject",
+    "get_storage_backend",
+    "upload_audio_from_file",
+    "upload_audio_from_path",
+    "upload_audio_stream",
+    "upload_audio",
+    "presign_upload_url",
+    "presign_download_url",
     "delete_file",
     
+    # Tag index services
+    "TagIndex",
+    "suggest_tags",
+    "get_tag_index_metrics",
+    
+    # Tag services
+    "normalize_tags",
+    "set_pod_tags",
+    "tag_filter",
+    "get_popular_tags",
+    "recount_tags",
+    "migrate_legacy_tags",
+    
     # Transcription services
     "transcribe_audio",
     "process_transcription",
+    "transcribe_audio_file",
+    "transcribe_audio_url",
+    
+    # Transcript services
+    "replace_pod_segments",
+    "get_pod_segments",
+    "search_pod_segments",
+    
+    # Upload session services
+    "parse_upload_metadata",
+    "create_upload_session",
+    "get_upload_session",
+    "append_chunk",
+    "delete_upload_session",
+    "delete_expired_sessions",
+    "create_presigned_upload_session",
+    "presign_upload_session",
+    "verify_presigned_upload",
+    
+    # Upload spool services
+    "SpooledUpload",
+    "spool_stream",
+    "spool_upload_file",
+    "iter_upload_file",
     
     # User services
     "get_user",
     "get_user_by_email",
     "get_users",
+    "get_users_page",
     "create_user",
     "update_user",
     "delete_user",
@@ -56,5 +221,7 @@ __all__ = [
     
     # Video services
     "process_video",
-    "generate_video_url"
+    "generate_video_url",
+    "can_stream_container",
+    "ingest_video_stream"
 ]
@@ -0,0 +1,348 @@
+# Services de traitement du signal audio (décodage PCM, détection d'activité vocale)
+
+import bisect
+import json
+import logging
+import wave
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ..config import settings
+from .ffmpeg_service import run_ffmpeg
+
+logger = logging.getLogger("audio_service")
+
+# Fréquence d'échantillonnage utilisée pour l'analyse et la transcription (Whisper travaille en 16 kHz)
+PCM_SAMPLE_RATE = 16000
+
+# Extension de fichier associée à chaque format de sortie ffmpeg
+FORMAT_SUFFIXES = {"ogg": ".ogg", "webm": ".webm", "mp3": ".mp3", "adts": ".aac", "ipod": ".m4a", "wav": ".wav"}
+
+# Conteneur de sortie utilisé pour recopier une piste sans la réencoder, selon son codec
+COPY_FORMATS = {"aac": "ipod", "opus": "ogg", "mp3": "mp3"}
+
+
+def get_audio_profile(name: str) -> dict:
+    """
+    Retourne le profil d'encodage `speech` (copie compacte envoyée à la transcription)
+    ou `playback` (copie d'écoute conservée dans le stockage).
+    """
+    if name == "speech":
+        return {
+            "codec": settings.SPEECH_AUDIO_CODEC,
+            "format": settings.SPEECH_AUDIO_FORMAT,
+            "bitrate": settings.SPEECH_AUDIO_BITRATE,
+            "sample_rate": settings.SPEECH_SAMPLE_RATE,
+            "channels": 1
+        }
+    if name == "playback":
+        return {
+            "codec": settings.PLAYBACK_AUDIO_CODEC,
+            "format": settings.PLAYBACK_AUDIO_FORMAT,
+            "bitrate": settings.PLAYBACK_AUDIO_BITRATE,
+            "sample_rate": None,
+            "channels": settings.PLAYBACK_AUDIO_CHANNELS
+        }
+    raise ValueError(f"Profil audio inconnu: {name}")
+
+
+def profile_suffix(profile: dict) -> str:
+    return FORMAT_SUFFIXES.get(profile["format"], f".{profile['format']}")
+
+
+def profile_ffmpeg_args(profile: dict) -> List[str]:
+    """Arguments ffmpeg d'encodage (côté sortie) correspondant à un profil audio."""
+    args = ["-vn", "-c:a", profile["codec"], "-b:a", profile["bitrate"], "-ac", str(profile["channels"])]
+    if profile.get("sample_rate"):
+        args += ["-ar", str(profile["sample_rate"])]
+    if profile["codec"] == "libopus":
+        # Mode "voip" : optimisé pour l'intelligibilité de la parole à bas débit
+        args += ["-application", "voip"]
+    return args + ["-f", profile["format"]]
+
+
+async def probe_media(input_path: str) -> dict:
+    """Retourne la description ffprobe (format et flux) d'un fichier média."""
+    command = [
+        "ffprobe",
+        "-v", "error",
+        "-print_format", "json",
+        "-show_format",
+        "-show_streams",
+        input_path
+    ]
+    return json.loads(await run_ffmpeg(command) or b"{}")
+
+
+def first_audio_stream(probe: dict) -> Optional[dict]:
+    """
+    Extrait de la sortie ffprobe les caractéristiques de la première piste audio :
+    codec, débit (bit/s), fréquence d'échantillonnage, canaux et durée (s). None si aucune piste audio.
+    """
+    for stream in probe.get("streams", []):
+        if stream.get("codec_type") != "audio":
+            continue
+        # Débit propre à la piste : les conteneurs MKV ne le déclarent que dans les statistiques
+        # de la piste (tag BPS). Jamais le débit global, qui compte aussi la vidéo
+        tags = stream.get("tags", {})
+        bitrate = stream.get("bit_rate") or tags.get("BPS") or tags.get("BPS-eng")
+        duration = stream.get("duration") or probe.get("format", {}).get("duration")
+        return {
+            "codec": stream.get("codec_name"),
+            "bitrate": int(bitrate) if bitrate else None,
+            "sample_rate": int(stream["sample_rate"]) if stream.get("sample_rate") else None,
+            "channels": stream.get("channels"),
+            "duration": float(duration) if duration else None
+        }
+    return None
+
+
+def can_copy_audio_stream(stream: Optional[dict]) -> bool:
+    """
+    Indique si une piste audio peut être conservée telle quelle pour l'écoute : codec lu par
+    les navigateurs et débit raisonnable. Le décodage pour la transcription accepte tous les codecs.
+    """
+    if not stream or stream["codec"] not in COPY_FORMATS:
+        return False
+    allowed_codecs = {codec.strip() for codec in settings.PLAYBACK_COPY_CODECS.split(",") if codec.strip()}
+    if stream["codec"] not in allowed_codecs or not stream["bitrate"]:
+        return False
+    return settings.PLAYBACK_COPY_MIN_BITRATE <= stream["bitrate"] <= settings.PLAYBACK_COPY_MAX_BITRATE
+
+
+def copy_ffmpeg_args(codec: str) -> List[str]:
+    """Arguments ffmpeg (côté sortie) recopiant la piste audio sans réencodage."""
+    output_format = COPY_FORMATS[codec]
+    args = ["-vn", "-c:a", "copy"]
+    if output_format == "ipod":
+        # Index en tête de fichier : lecture possible avant la fin du téléchargement
+        args += ["-movflags", "+faststart"]
+    return args + ["-f", output_format]
+
+
+def compute_waveform_peaks(samples: np.ndarray, peak_count: Optional[int] = None) -> np.ndarray:
+    """
+    Réduit un signal PCM mono en `peak_count` paires (min, max) quantifiées sur int8.
+
+    Retourne un tableau int8 de forme (n, 2) ; n est inférieur à `peak_count` pour les signaux
+    plus courts que `peak_count` échantillons.
+    """
+    peak_count = peak_count or settings.WAVEFORM_PEAK_COUNT
+    if len(samples) == 0:
+        return np.zeros((0, 2), dtype=np.int8)
+
+    # Découpage en blocs de tailles quasi égales couvrant tout le signal
+    bounds = np.linspace(0, len(samples), min(peak_count, len(samples)) + 1).astype(int)
+    minimums = np.minimum.reduceat(samples, bounds[:-1])
+    maximums = np.maximum.reduceat(samples, bounds[:-1])
+    peaks = np.stack([minimums, maximums], axis=1)
+    return np.round(np.clip(peaks, -1.0, 1.0) * 127.0).astype(np.int8)
+
+
+def waveform_to_bytes(peaks: np.ndarray) -> bytes:
+    return peaks.astype(np.int8).tobytes()
+
+
+def waveform_from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.int8).reshape(-1, 2)
+
+
+class TimestampMap:
+    """
+    Correspondance entre les instants de l'audio raccourci (silences retirés)
+    et ceux de l'audio original.
+
+    Chaque morceau est un triplet (début dans l'audio raccourci, début dans l'original, durée),
+    en secondes, trié par début dans l'audio raccourci.
+    """
+
+    def __init__(self, pieces: Optional[List[Tuple[float, float, float]]] = None):
+        self.pieces = sorted(pieces or [], key=lambda piece: piece[0])
+        self._starts = [piece[0] for piece in self.pieces]
+
+    @classmethod
+    def identity(cls, duration: float) -> "TimestampMap":
+        return cls([(0.0, 0.0, duration)])
+
+    def to_original(self, t: float, is_end: bool = False) -> float:
+        """
+        Convertit un instant de l'audio raccourci en instant de l'audio original.
+
+        Un instant situé exactement à la jonction de deux morceaux est rattaché au morceau
+        suivant, ou au précédent si `is_end` est vrai (fin d'un segment).
+        """
+        if not self.pieces:
+            return t
+        locate = bisect.bisect_left if is_end else bisect.bisect_right
+        index = max(locate(self._starts, t) - 1, 0)
+        trimmed_start, original_start, duration = self.pieces[index]
+        offset = min(max(t - trimmed_start, 0.0), duration)
+        return original_start + offset
+
+    @property
+    def trimmed_duration(self) -> float:
+        if not self.pieces:
+            return 0.0
+        trimmed_start, _, duration = self.pieces[-1]
+        return trimmed_start + duration
+
+    def to_list(self) -> List[List[float]]:
+        return [list(piece) for piece in self.pieces]
+
+    @classmethod
+    def from_list(cls, data: List[List[float]]) -> "TimestampMap":
+        return cls([tuple(piece) for piece in data])
+
+    def __repr__(self):
+        return f"<TimestampMap(pieces={len(self.pieces)}, trimmed_duration={self.trimmed_duration:.2f}s)>"
+
+
+async def decode_to_pcm(input_path: str, sample_rate: int = PCM_SAMPLE_RATE) -> np.ndarray:
+    """
+    Décode n'importe quel fichier audio/vidéo en PCM mono float32 normalisé dans [-1, 1].
+    """
+    command = [
+        "ffmpeg",
+        "-nostdin",
+        "-i", input_path,
+        "-vn",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-f", "s16le",
+        "-acodec", "pcm_s16le",
+        "pipe:1"
+    ]
+    stdout = await run_ffmpeg(command)
+    return np.frombuffer(stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def write_wav(samples: np.ndarray, output_path: str, sample_rate: int = PCM_SAMPLE_RATE) -> str:
+    """Écrit un signal PCM float32 dans un fichier WAV 16 bits mono."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    with wave.open(output_path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
+    return output_path
+
+
+async def encode_pcm(samples: np.ndarray, output_path: str, profile: dict, sample_rate: int = PCM_SAMPLE_RATE) -> str:
+    """Encode un signal PCM float32 mono selon un profil audio en passant le flux brut à ffmpeg via stdin."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    command = [
+        "ffmpeg",
+        "-y",
+        "-f", "s16le",
+        "-ar", str(sample_rate),
+        "-ac", "1",
+        "-i", "pipe:0",
+        *profile_ffmpeg_args(profile),
+        output_path
+    ]
+    await run_ffmpeg(command, input=pcm.tobytes())
+    return output_path
+
+
+def frame_energy_db(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """Énergie RMS (en dBFS) de chaque trame complète de `frame_length` échantillons."""
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return (20.0 * np.log10(np.maximum(rms, 1e-10))).astype(np.float32)
+
+
+def detect_speech_regions(
+    samples: np.ndarray,
+    sample_rate: int = PCM_SAMPLE_RATE,
+    frame_ms: Optional[int] = None,
+    threshold_db: Optional[float] = None,
+    min_silence_ms: Optional[int] = None,
+    padding_ms: Optional[int] = None
+) -> List[Tuple[int, int]]:
+    """
+    Détection d'activité vocale par seuil d'énergie.
+
+    Retourne la liste des zones de parole sous forme d'intervalles [début, fin) en indices d'échantillons.
+    Les silences plus courts que `min_silence_ms` sont fusionnés avec la parole environnante,
+    et chaque zone est élargie de `padding_ms` de chaque côté.
+    """
+    frame_ms = frame_ms or settings.VAD_FRAME_MS
+    threshold_db = settings.VAD_THRESHOLD_DB if threshold_db is None else threshold_db
+    min_silence_ms = settings.VAD_MIN_SILENCE_MS if min_silence_ms is None else min_silence_ms
+    padding_ms = settings.VAD_PADDING_MS if padding_ms is None else padding_ms
+
+    frame_length = max(int(sample_rate * frame_ms / 1000), 1)
+    voiced = frame_energy_db(samples, frame_length) > threshold_db
+    if not voiced.any():
+        return []
+
+    # Transitions silence <-> parole : indices de trames où une zone commence / se termine
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    min_gap_frames = int(np.ceil(min_silence_ms / frame_ms))
+    padding = int(sample_rate * padding_ms / 1000)
+
+    regions: List[Tuple[int, int]] = []
+    for start, end in zip(starts, ends):
+        if regions and start - regions[-1][1] < min_gap_frames:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+
+    # Conversion en échantillons avec marge, puis fusion des zones qui se chevauchent après élargissement
+    merged: List[Tuple[int, int]] = []
+    for start, end in regions:
+        start_sample = max(int(start) * frame_length - padding, 0)
+        end_sample = min(int(end) * frame_length + padding, len(samples))
+        if merged and start_sample <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], end_sample)
+        else:
+            merged.append((start_sample, end_sample))
+    return merged
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int = PCM_SAMPLE_RATE, **vad_options) -> Tuple[np.ndarray, TimestampMap]:
+    """
+    Retire les longs silences d'un signal PCM.
+
+    Retourne le signal raccourci et la TimestampMap permettant de ramener les instants
+    de la transcription sur l'audio original. Si aucune parole n'est détectée, le signal
+    est retourné intact pour laisser Whisper décider.
+    """
+    duration = len(samples) / sample_rate
+    regions = detect_speech_regions(samples, sample_rate, **vad_options)
+    if not regions:
+        return samples, TimestampMap.identity(duration)
+
+    pieces: List[Tuple[float, float, float]] = []
+    trimmed_cursor = 0
+    for start, end in regions:
+        pieces.append((trimmed_cursor / sample_rate, start / sample_rate, (end - start) / sample_rate))
+        trimmed_cursor += end - start
+
+    trimmed = np.concatenate([samples[start:end] for start, end in regions])
+    return trimmed, TimestampMap(pieces)
+
+
+async def prepare_speech_audio(input_path: str, output_path: str) -> TimestampMap:
+    """
+    Décode `input_path` en PCM 16 kHz mono, retire les silences et encode le résultat
+    dans `output_path` avec le profil `speech`.
+    """
+    samples = await decode_to_pcm(input_path)
+    trimmed, timestamp_map = trim_silence(samples)
+    await encode_pcm(trimmed, output_path, get_audio_profile("speech"))
+
+    original_duration = len(samples) / PCM_SAMPLE_RATE
+    if original_duration > 0:
+        logger.info(
+            f"VAD: {original_duration:.1f}s -> {timestamp_map.trimmed_duration:.1f}s "
+            f"({100.0 * (1 - timestamp_map.trimmed_duration / original_duration):.0f}% de silence retiré)"
+        )
+    return timestamp_map
@@ -0,0 +1,172 @@
+# Images de profil : redimensionnement en quelques tailles fixes et encodage WebP
+#
+# L'image envoyée est recadrée au carré puis déclinée en AVATAR_SIZES pixels. Chaque variante est
+# nommée d'après l'empreinte SHA-256 de son contenu : l'URL change quand l'image change, ce qui
+# permet de la servir avec un cache « immutable ». Les listes et cartes de correspondance chargent
+# ainsi quelques Ko au lieu de l'original.
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+from typing import Dict, Optional
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import String, cast, or_
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.profile_model import Profile
+
+logger = logging.getLogger("avatar_service")
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    logger.warning("Module Pillow non disponible - téléversement d'avatars désactivé")
+    Image = None
+    ImageOps = None
+
+VALID_IMAGE_TYPES = ["image/jpeg", "image/png", "image/webp", "image/gif"]
+
+# Au-delà, l'image est refusée avant d'être décodée (protection contre les « bombes » de décompression)
+MAX_IMAGE_PIXELS = 40_000_000
+
+
+def get_avatar_sizes() -> list:
+    return sorted(int(size) for size in settings.AVATAR_SIZES.split(",") if size.strip())
+
+
+def render_avatar_variants(data: bytes) -> Dict[int, bytes]:
+    """
+    Décode une image, la recadre au carré et retourne {taille: contenu WebP} pour chaque taille.
+    Fonction bloquante (calcul) : à appeler hors de la boucle d'événements.
+    """
+    if Image is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Traitement d'images indisponible sur ce serveur"
+        )
+    try:
+        image = Image.open(io.BytesIO(data))
+        if image.width * image.height > MAX_IMAGE_PIXELS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Image trop grande"
+            )
+        # Première image seulement pour les GIF animés, orientation EXIF appliquée
+        image.seek(0)
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.info(f"Image d'avatar illisible: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Image invalide ou format non supporté"
+        )
+
+    largest = get_avatar_sizes()[-1]
+    side = min(image.width, image.height, largest)
+    # Recadrage et réduction à la plus grande taille en une passe, puis réductions successives
+    square = ImageOps.fit(image, (side, side), method=Image.LANCZOS)
+
+    variants = {}
+    for size in sorted(get_avatar_sizes(), reverse=True):
+        if size < square.width:
+            square = square.resize((size, size), Image.LANCZOS)
+        output = io.BytesIO()
+        square.save(output, format="WEBP", quality=settings.AVATAR_WEBP_QUALITY, method=6)
+        variants[size] = output.getvalue()
+    return variants
+
+
+def _avatar_filename(content: bytes, size: int) -> str:
+    return f"{hashlib.sha256(content).hexdigest()[:24]}-{size}.webp"
+
+
+def _avatar_url(filename: str) -> str:
+    return f"{settings.PUBLIC_BASE_URL.rstrip('/')}/static/avatars/{filename}"
+
+
+def store_avatar_variants(variants: Dict[int, bytes]) -> Dict[str, str]:
+    """
+    Écrit les variantes dans AVATAR_DIR sous un nom dérivé de leur contenu et retourne {taille: URL}.
+    Un fichier déjà présent (même contenu) n'est pas réécrit.
+    """
+    os.makedirs(settings.AVATAR_DIR, exist_ok=True)
+    urls = {}
+    for size, content in variants.items():
+        filename = _avatar_filename(content, size)
+        path = os.path.join(settings.AVATAR_DIR, filename)
+        if not os.path.exists(path):
+            # Écriture atomique : un lecteur ne voit jamais de fichier partiel
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as avatar_file:
+                avatar_file.write(content)
+            os.replace(temp_path, path)
+        urls[str(size)] = _avatar_url(filename)
+    return urls
+
+
+def pick_avatar_url(variants: Optional[Dict[str, str]], size: Optional[int] = None) -> Optional[str]:
+    """Variante la plus petite couvrant `size` pixels (défaut : AVATAR_DEFAULT_SIZE)."""
+    if not variants:
+        return None
+    size = size or settings.AVATAR_DEFAULT_SIZE
+    sizes = sorted(int(key) for key in variants)
+    for available in sizes:
+        if available >= size:
+            return variants[str(available)]
+    return variants[str(sizes[-1])]
+
+
+def _delete_unused_variants(db: Session, profile: Profile, variants: Optional[Dict[str, str]]) -> None:
+    """Supprime les fichiers d'anciennes variantes qu'aucun profil n'utilise plus (même image)."""
+    current_urls = set((profile.avatar_variants or {}).values())
+    for url in (variants or {}).values():
+        if url in current_urls:
+            continue
+        # Nom de fichier dérivé du contenu : sa présence dans les variantes (JSON) d'un autre profil suffit
+        used = db.query(Profile.id).filter(
+            Profile.id != profile.id,
+            or_(
+                Profile.profile_picture_url == url,
+                cast(Profile.avatar_variants, String).contains(os.path.basename(url))
+            )
+        ).first()
+        if used:
+            continue
+        path = os.path.join(settings.AVATAR_DIR, os.path.basename(url))
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+async def update_profile_avatar(db: Session, profile: Profile, file: UploadFile) -> Profile:
+    if file.content_type not in VALID_IMAGE_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Type d'image non supporté. Formats acceptés: {', '.join(VALID_IMAGE_TYPES)}"
+        )
+    data = await file.read(settings.AVATAR_MAX_UPLOAD_BYTES + 1)
+    if len(data) > settings.AVATAR_MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Taille maximale autorisée : {settings.AVATAR_MAX_UPLOAD_BYTES // (1024 * 1024)}MB"
+        )
+
+    variants = await asyncio.to_thread(render_avatar_variants, data)
+    urls = store_avatar_variants(variants)
+
+    previous_variants = profile.avatar_variants
+    profile.avatar_variants = urls
+    profile.profile_picture_url = pick_avatar_url(urls)
+    db.commit()
+    db.refresh(profile)
+
+    if previous_variants and previous_variants != urls:
+        _delete_unused_variants(db, profile, previous_variants)
+    logger.info(f"Avatar du profil {profile.id} mis à jour ({sum(len(c) for c in variants.values())} octets)")
+    return profile
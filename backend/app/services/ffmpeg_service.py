@@ -0,0 +1,276 @@
+# Exécution non bloquante d'ffmpeg/ffprobe, avec limite de concurrence et métriques de file d'attente
+#
+# Les processus sont lancés avec `asyncio.create_subprocess_exec` : la boucle d'événements reste
+# disponible pour les autres requêtes pendant un encodage. Un sémaphore borne le nombre de processus
+# simultanés (par défaut le nombre de CPU) et une file trop longue est refusée immédiatement, pour
+# que les téléversements se dégradent en 503 plutôt que de bloquer l'API. Les extractions en flux,
+# dont la durée dépend du débit du client, ont leur propre pool (voir FFMPEG_STREAM_MAX_CONCURRENCY).
+
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from typing import AsyncIterator, List, Optional
+
+from ..config import settings
+
+logger = logging.getLogger("ffmpeg_service")
+
+STREAM_CHUNK_SIZE = 256 * 1024
+
+
+class FFmpegError(Exception):
+    """Échec d'un processus ffmpeg (code de retour non nul)."""
+
+    def __init__(self, command: List[str], returncode: Optional[int], stderr: bytes = b""):
+        self.command = command
+        self.returncode = returncode
+        self.stderr = stderr.decode("utf-8", errors="replace") if isinstance(stderr, bytes) else stderr
+        # Les dernières lignes de stderr suffisent à diagnostiquer l'erreur
+        super().__init__(f"{command[0]} a échoué (code {returncode}): {self.stderr[-500:]}")
+
+
+class FFmpegTimeoutError(FFmpegError):
+    """Le processus a dépassé son délai et a été tué."""
+
+
+class FFmpegBusyError(Exception):
+    """La file d'attente des traitements ffmpeg est pleine."""
+
+
+class FFmpegRunner:
+    """
+    Lance des processus ffmpeg en parallèle dans la limite de `max_concurrency`.
+
+    - Chaque tâche a un délai maximal (`timeout`) au-delà duquel le processus est tué.
+    - L'annulation de la coroutine appelante (client déconnecté, arrêt du serveur) tue aussi le processus.
+    - Au-delà de `max_queue_depth` tâches en attente, `run` lève FFmpegBusyError sans attendre.
+    - En flux, le processus est aussi tué après `idle_timeout` secondes sans bloc reçu ni produit.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        timeout: Optional[float] = None,
+        max_queue_depth: Optional[int] = None,
+        idle_timeout: Optional[float] = None
+    ):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_queue_depth = max_queue_depth
+        self.idle_timeout = idle_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    @contextlib.asynccontextmanager
+    async def _slot(self):
+        """Attend un créneau d'exécution (ou lève FFmpegBusyError si la file est pleine)."""
+        # Tant qu'un créneau est libre, la tâche n'attend pas (cas d'une file de profondeur nulle)
+        if self.max_queue_depth is not None and self.queued >= self.max_queue_depth and self._semaphore.locked():
+            self.rejected += 1
+            raise FFmpegBusyError(f"{self.queued} traitements ffmpeg déjà en attente")
+
+        queued_at = time.monotonic()
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        started_at = time.monotonic()
+        self.total_wait_seconds += started_at - queued_at
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self.total_run_seconds += time.monotonic() - started_at
+            self._semaphore.release()
+
+    async def run(self, command: List[str], input: Optional[bytes] = None, timeout: Optional[float] = None) -> bytes:
+        """
+        Exécute `command` (ex. ["ffmpeg", "-i", ...]) et retourne sa sortie standard.
+        `input` est envoyé sur l'entrée standard du processus.
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        async with self._slot():
+            return await self._run_process(command, input, timeout)
+
+    async def stream(
+        self,
+        command: List[str],
+        chunks: AsyncIterator[bytes],
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Exécute `command` en flux : les blocs de `chunks` sont écrits sur l'entrée standard au fur
+        et à mesure de leur arrivée et la sortie standard est rendue par blocs dès sa production.
+
+        Le processus est tué si le consommateur abandonne le flux, si le délai est dépassé ou si
+        rien n'est reçu ni produit pendant `idle_timeout` secondes (client qui n'envoie plus rien).
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        async with self._slot():
+            deadline = time.monotonic() + timeout if timeout is not None else None
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            progress = {"at": time.monotonic()}
+            writer = asyncio.create_task(self._feed_stdin(process, chunks, progress))
+            stderr_reader = asyncio.create_task(process.stderr.read())
+            finished = False
+            try:
+                while True:
+                    now = time.monotonic()
+                    waits = []
+                    if deadline is not None:
+                        if now >= deadline:
+                            raise FFmpegTimeoutError(command, None, f"délai de {timeout}s dépassé".encode("utf-8"))
+                        waits.append(deadline - now)
+                    if self.idle_timeout is not None:
+                        idle_deadline = progress["at"] + self.idle_timeout
+                        if now >= idle_deadline:
+                            raise FFmpegTimeoutError(
+                                command, None, f"aucune donnée depuis {self.idle_timeout}s".encode("utf-8")
+                            )
+                        waits.append(idle_deadline - now)
+                    try:
+                        block = await asyncio.wait_for(process.stdout.read(chunk_size), timeout=min(waits) if waits else None)
+                    except asyncio.TimeoutError:
+                        # Délais réévalués : l'entrée a pu progresser entre-temps
+                        continue
+                    if not block:
+                        break
+                    yield block
+                    # Le temps passé chez le consommateur ne compte pas comme inactivité
+                    progress["at"] = time.monotonic()
+                # Une erreur de lecture de l'entrée prime sur le code de retour d'ffmpeg
+                await writer
+                await process.wait()
+                stderr = await stderr_reader
+                finished = True
+            except FFmpegTimeoutError:
+                self.timed_out += 1
+                raise
+            except (asyncio.CancelledError, GeneratorExit):
+                self.cancelled += 1
+                raise
+            except BaseException:
+                self.failed += 1
+                raise
+            finally:
+                if not finished:
+                    writer.cancel()
+                    stderr_reader.cancel()
+                    await self._kill(process)
+
+            if process.returncode != 0:
+                self.failed += 1
+                raise FFmpegError(command, process.returncode, stderr)
+            self.completed += 1
+
+    @staticmethod
+    async def _feed_stdin(process: asyncio.subprocess.Process, chunks: AsyncIterator[bytes], progress: dict) -> None:
+        try:
+            async for chunk in chunks:
+                process.stdin.write(chunk)
+                await process.stdin.drain()
+                progress["at"] = time.monotonic()
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg a fermé son entrée (erreur de décodage) : le code de retour le signalera
+            return
+        finally:
+            if not process.stdin.is_closing():
+                process.stdin.close()
+
+    async def _run_process(self, command: List[str], input: Optional[bytes], timeout: Optional[float]) -> bytes:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(input), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            await self._kill(process)
+            raise FFmpegTimeoutError(command, None, f"délai de {timeout}s dépassé".encode("utf-8"))
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            await self._kill(process)
+            raise
+
+        if process.returncode != 0:
+            self.failed += 1
+            raise FFmpegError(command, process.returncode, stderr)
+        self.completed += 1
+        return stdout
+
+    @staticmethod
+    async def _kill(process: asyncio.subprocess.Process) -> None:
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            # Récupérer le processus pour ne pas laisser de zombie
+            await asyncio.shield(process.wait())
+
+    def metrics(self) -> dict:
+        finished = self.completed + self.failed + self.timed_out + self.cancelled
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+            "avg_wait_seconds": round(self.total_wait_seconds / finished, 3) if finished else 0.0,
+            "avg_run_seconds": round(self.total_run_seconds / finished, 3) if finished else 0.0
+        }
+
+
+ffmpeg_runner = FFmpegRunner(
+    max_concurrency=settings.FFMPEG_MAX_CONCURRENCY or os.cpu_count() or 1,
+    timeout=settings.FFMPEG_TIMEOUT_SECONDS,
+    max_queue_depth=settings.FFMPEG_MAX_QUEUE_DEPTH
+)
+
+# Extractions en flux : la durée d'un processus suit le débit du client, d'où un pool distinct
+# (sans file : le client attendrait en envoyant déjà sa vidéo) et un délai d'inactivité
+ffmpeg_stream_runner = FFmpegRunner(
+    max_concurrency=settings.FFMPEG_STREAM_MAX_CONCURRENCY or max(1, ffmpeg_runner.max_concurrency // 2),
+    timeout=settings.FFMPEG_TIMEOUT_SECONDS,
+    max_queue_depth=0,
+    idle_timeout=settings.FFMPEG_STREAM_IDLE_TIMEOUT_SECONDS
+)
+
+
+async def run_ffmpeg(command: List[str], input: Optional[bytes] = None, timeout: Optional[float] = None) -> bytes:
+    """Exécute une commande ffmpeg/ffprobe via le pool partagé et retourne sa sortie standard."""
+    return await ffmpeg_runner.run(command, input=input, timeout=timeout)
+
+
+def stream_ffmpeg(command: List[str], chunks: AsyncIterator[bytes], timeout: Optional[float] = None) -> AsyncIterator[bytes]:
+    """Exécute une commande ffmpeg en flux (entrée standard -> sortie standard) via le pool des flux."""
+    return ffmpeg_stream_runner.stream(command, chunks, timeout=timeout)
+
+
+def get_ffmpeg_metrics() -> dict:
+    return {**ffmpeg_runner.metrics(), "streaming": ffmpeg_stream_runner.metrics()}
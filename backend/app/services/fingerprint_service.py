@@ -0,0 +1,192 @@
+# Empreinte audio perceptuelle pour détecter les Pods en double (réencodages d'un même enregistrement)
+#
+# Algorithme inspiré de Haitsma & Kalker : pour chaque trame, on calcule l'énergie dans 33 bandes
+# logarithmiques entre 300 et 2000 Hz ; chaque bit de la sous-empreinte 32 bits est le signe de la
+# différence d'énergie entre bandes voisines, différenciée dans le temps. Ces bits résistent bien
+# aux changements de codec et de débit, contrairement à un hash exact du fichier.
+
+import logging
+from collections import Counter
+from typing import Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.pod_model import Pod
+from ..models.audio_fingerprint_model import AudioFingerprintHash
+from . import audio_service, transcript_service, media_cache_service
+
+logger = logging.getLogger("fingerprint_service")
+
+FINGERPRINT_SAMPLE_RATE = 8000
+FRAME_LENGTH = 1024  # 128 ms à 8 kHz
+HOP_LENGTH = 512  # 64 ms entre deux sous-empreintes
+BAND_COUNT = 33
+MIN_FREQUENCY = 300.0
+MAX_FREQUENCY = 2000.0
+# Écart de durée maximal (en proportion) entre deux enregistrements considérés comme identiques
+MAX_DURATION_DIFFERENCE = 0.02
+# Nombre minimal de sous-empreintes communes et alignées pour qu'un Pod soit un candidat
+MIN_ALIGNED_MATCHES = 5
+
+_BIT_WEIGHTS = (1 << np.arange(32, dtype=np.uint64)).astype(np.uint64)
+
+
+def _band_edges() -> np.ndarray:
+    frequencies = np.geomspace(MIN_FREQUENCY, MAX_FREQUENCY, BAND_COUNT + 1)
+    bins = np.round(frequencies * FRAME_LENGTH / FINGERPRINT_SAMPLE_RATE).astype(int)
+    # Garantir au moins un bin FFT par bande
+    for index in range(1, len(bins)):
+        bins[index] = max(bins[index], bins[index - 1] + 1)
+    return bins
+
+
+def compute_fingerprint(samples: np.ndarray) -> np.ndarray:
+    """
+    Calcule l'empreinte d'un signal PCM mono échantillonné à FINGERPRINT_SAMPLE_RATE.
+    Retourne un tableau de sous-empreintes uint32 (une toutes les 64 ms).
+    """
+    if len(samples) < FRAME_LENGTH + HOP_LENGTH:
+        return np.zeros(0, dtype=np.uint32)
+
+    frame_count = 1 + (len(samples) - FRAME_LENGTH) // HOP_LENGTH
+    indices = np.arange(FRAME_LENGTH)[None, :] + HOP_LENGTH * np.arange(frame_count)[:, None]
+    frames = samples[indices] * np.hanning(FRAME_LENGTH).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+
+    edges = _band_edges()
+    band_energy = np.add.reduceat(power, edges, axis=1)[:, :BAND_COUNT]
+
+    # Bits = signe de la différence spectrale (bande m vs m+1) différenciée dans le temps
+    spectral_diff = band_energy[:, :-1] - band_energy[:, 1:]
+    bits = (spectral_diff[1:] - spectral_diff[:-1]) > 0
+    return (bits.astype(np.uint64) @ _BIT_WEIGHTS).astype(np.uint32)
+
+
+async def fingerprint_media_file(media_file_path: str) -> np.ndarray:
+    """Décode un fichier audio/vidéo et calcule son empreinte."""
+    samples = await audio_service.decode_to_pcm(media_file_path, sample_rate=FINGERPRINT_SAMPLE_RATE)
+    return compute_fingerprint(samples)
+
+
+async def fingerprint_pod(db: Session, pod: Pod) -> np.ndarray:
+    """
+    Calcule et indexe l'empreinte d'un Pod existant à partir de son audio stocké
+    (rattrapage du catalogue). L'audio est lu via le cache disque des médias.
+    """
+    audio_path = await media_cache_service.fetch_media(pod.audio_file_url)
+    fingerprint = await fingerprint_media_file(audio_path)
+    index_pod_fingerprint(db, pod, fingerprint)
+    return fingerprint
+
+
+def fingerprint_to_bytes(fingerprint: np.ndarray) -> bytes:
+    return fingerprint.astype("<u4").tobytes()
+
+
+def fingerprint_from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<u4").astype(np.uint32)
+
+
+def bit_error_rate(first: np.ndarray, second: np.ndarray, offset: int = 0) -> float:
+    """
+    Taux de bits différents entre deux empreintes, `second` étant décalée de `offset` trames
+    par rapport à `first`. Retourne 1.0 s'il n'y a pas de recouvrement.
+    """
+    start_first, start_second = max(offset, 0), max(-offset, 0)
+    length = min(len(first) - start_first, len(second) - start_second)
+    if length <= 0:
+        return 1.0
+    xor = np.bitwise_xor(first[start_first:start_first + length], second[start_second:start_second + length])
+    differing_bits = np.unpackbits(xor.astype("<u4").view(np.uint8)).sum()
+    return float(differing_bits) / (length * 32)
+
+
+def _index_frame_count() -> int:
+    return int(settings.FINGERPRINT_INDEX_SECONDS * FINGERPRINT_SAMPLE_RATE / HOP_LENGTH)
+
+
+def index_pod_fingerprint(db: Session, pod: Pod, fingerprint: np.ndarray, commit: bool = True) -> None:
+    """
+    Enregistre l'empreinte complète sur le Pod et indexe les sous-empreintes
+    distinctes du début de l'audio dans `audio_fingerprint_hashes`.
+    """
+    pod.audio_fingerprint = fingerprint_to_bytes(fingerprint)
+    db.query(AudioFingerprintHash).filter(AudioFingerprintHash.pod_id == pod.id).delete(synchronize_session=False)
+
+    first_offsets = {}
+    for offset, value in enumerate(fingerprint[:_index_frame_count()].tolist()):
+        first_offsets.setdefault(value, offset)
+    db.bulk_save_objects([
+        AudioFingerprintHash(pod_id=pod.id, hash=value, offset=offset)
+        for value, offset in first_offsets.items()
+    ])
+    if commit:
+        db.commit()
+
+
+def find_duplicate_pod(db: Session, fingerprint: np.ndarray, exclude_pod_id: Optional[int] = None) -> Optional[Tuple[Pod, float]]:
+    """
+    Cherche un Pod existant dont l'audio est perceptuellement identique.
+
+    Les candidats sont obtenus par l'index des sous-empreintes (vote sur le décalage d'alignement),
+    puis vérifiés par le taux d'erreur binaire sur toute la durée. Retourne (pod, taux d'erreur) ou None.
+    """
+    query_frames = fingerprint[:_index_frame_count()]
+    if len(query_frames) == 0:
+        return None
+
+    query_offsets = {}
+    for offset, value in enumerate(query_frames.tolist()):
+        query_offsets.setdefault(value, offset)
+
+    # Vote (pod, décalage) : un vrai doublon accumule ses correspondances sur un décalage constant
+    votes = Counter()
+    hashes = list(query_offsets)
+    for batch_start in range(0, len(hashes), 500):
+        batch = hashes[batch_start:batch_start + 500]
+        rows = (
+            db.query(AudioFingerprintHash.pod_id, AudioFingerprintHash.hash, AudioFingerprintHash.offset)
+            .filter(AudioFingerprintHash.hash.in_(batch))
+            .all()
+        )
+        for pod_id, value, offset in rows:
+            if pod_id != exclude_pod_id:
+                votes[(pod_id, query_offsets[value] - offset)] += 1
+
+    checked = set()
+    for (pod_id, offset), count in votes.most_common(10):
+        if count < MIN_ALIGNED_MATCHES or pod_id in checked:
+            continue
+        checked.add(pod_id)
+        candidate = db.query(Pod).filter(Pod.id == pod_id).first()
+        if not candidate or not candidate.audio_fingerprint:
+            continue
+        reference = fingerprint_from_bytes(candidate.audio_fingerprint)
+        if abs(len(reference) - len(fingerprint)) > MAX_DURATION_DIFFERENCE * max(len(reference), len(fingerprint)):
+            continue
+        error_rate = bit_error_rate(fingerprint, reference, offset)
+        if error_rate <= settings.FINGERPRINT_MAX_BIT_ERROR_RATE:
+            logger.info(f"Doublon détecté: Pod {pod_id} (taux d'erreur binaire {error_rate:.3f})")
+            return candidate, error_rate
+    return None
+
+
+def reuse_processing_results(db: Session, pod: Pod, original: Pod, commit: bool = True) -> Pod:
+    """
+    Marque `pod` comme doublon de `original` et réutilise sa transcription,
+    ses segments horodatés et son embedding au lieu de les recalculer.
+    """
+    pod.duplicate_of_id = original.duplicate_of_id or original.id
+    pod.transcription = original.transcription
+    pod.embedding = original.embedding
+    segments = [
+        {"start": segment.start, "end": segment.end, "text": segment.text}
+        for segment in transcript_service.get_pod_segments(db, original.id)
+    ]
+    transcript_service.replace_pod_segments(db, pod.id, segments, commit=False)
+    if commit:
+        db.commit()
+        db.refresh(pod)
+    return pod
@@ -0,0 +1,580 @@
+# Pipeline d'ingestion des Pods : étapes déclaratives exécutées en arrière-plan
+#
+# analyze ──┬── transcode ── upload ──────────┐
+#           ├── renditions                    │
+#           └── transcribe ── embed ──────────┴── index
+#
+# Les étapes indépendantes s'exécutent en parallèle (le téléversement de l'audio pendant la
+# transcription). Chaque étape a ses propres tentatives et sa durée mesurée. L'état est enregistré
+# sur le Pod après chaque étape : une ingestion interrompue reprend là où elle s'était arrêtée.
+
+import asyncio
+import copy
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.pod_model import Pod
+from . import (
+    fingerprint_service,
+    ia_service,
+    media_analysis_service,
+    media_cache_service,
+    media_store_service,
+    pod_service,
+    rendition_service,
+    storage_service,
+    video_service
+)
+
+logger = logging.getLogger("ingest_service")
+
+# Statuts d'une étape dans l'état enregistré
+STAGE_DONE = "done"
+STAGE_SKIPPED = "skipped"
+STAGE_FAILED = "failed"
+STAGE_BLOCKED = "blocked"  # Une dépendance a échoué
+
+# Statuts d'ingestion d'un Pod (colonne `ingest_status`)
+INGEST_PROCESSING = "processing"
+INGEST_READY = "ready"
+INGEST_FAILED = "failed"
+
+
+class StageSkipped(Exception):
+    """Levée par une étape qui n'a rien à faire (ex. transcription non demandée)."""
+
+
+class Stage:
+    """
+    Étape du pipeline.
+
+    `func(context)` retourne un dictionnaire sérialisable en JSON (conservé dans l'état et
+    accessible aux étapes suivantes via `context.outputs[nom]`). Une étape `ephemeral` produit
+    des fichiers locaux : elle est rejouée à la reprise si ses étapes dépendantes ne sont pas terminées.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[["IngestContext"], Awaitable[Optional[dict]]],
+        depends_on: Iterable[str] = (),
+        retries: int = 2,
+        retry_delay: float = 1.0,
+        ephemeral: bool = False
+    ):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.ephemeral = ephemeral
+
+    def __repr__(self):
+        return f"<Stage(name='{self.name}', depends_on={list(self.depends_on)})>"
+
+
+class StageMetrics:
+    """Compteurs cumulés par étape, exposés par /health."""
+
+    def __init__(self):
+        self.stages: Dict[str, dict] = {}
+
+    def record(self, name: str, status: str, attempts: int, duration: float) -> None:
+        metrics = self.stages.setdefault(name, {
+            "runs": 0, "done": 0, "skipped": 0, "failed": 0, "retries": 0, "total_seconds": 0.0, "max_seconds": 0.0
+        })
+        metrics["runs"] += 1
+        metrics[status] += 1
+        metrics["retries"] += max(attempts - 1, 0)
+        metrics["total_seconds"] += duration
+        metrics["max_seconds"] = max(metrics["max_seconds"], duration)
+
+    def snapshot(self) -> dict:
+        return {
+            name: {
+                **{key: value for key, value in metrics.items() if key != "total_seconds"},
+                "max_seconds": round(metrics["max_seconds"], 3),
+                "avg_seconds": round(metrics["total_seconds"] / metrics["runs"], 3) if metrics["runs"] else 0.0
+            }
+            for name, metrics in self.stages.items()
+        }
+
+
+class Pipeline:
+    """Graphe d'étapes ; une étape démarre dès que toutes ses dépendances sont terminées ou ignorées."""
+
+    def __init__(self, stages: List[Stage], metrics: Optional[StageMetrics] = None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.metrics = metrics or StageMetrics()
+        for stage in stages:
+            unknown = [name for name in stage.depends_on if name not in self.stages]
+            if unknown:
+                raise ValueError(f"Étape '{stage.name}': dépendances inconnues {unknown}")
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        visiting, visited = set(), set()
+
+        def visit(name: str) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle dans le pipeline autour de l'étape '{name}'")
+            visiting.add(name)
+            for dependency in self.stages[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def reset_ephemeral_stages(self, state: dict) -> None:
+        """Rejoue les étapes éphémères dont les fichiers ont pu disparaître avec le processus précédent."""
+        stage_states = state.setdefault("stages", {})
+        for stage in self.stages.values():
+            if not stage.ephemeral or stage_states.get(stage.name, {}).get("status") != STAGE_DONE:
+                continue
+            dependents = [other.name for other in self.stages.values() if stage.name in other.depends_on]
+            if any(stage_states.get(name, {}).get("status") != STAGE_DONE for name in dependents):
+                del stage_states[stage.name]
+
+    async def run(self, context: "IngestContext", state: dict, save_state: Callable[[dict], None]) -> dict:
+        """
+        Exécute les étapes non terminées de `state` et retourne l'état final.
+        `save_state` est appelé après chaque étape (persistance pour la reprise).
+        """
+        stage_states = state.setdefault("stages", {})
+        # Les étapes en échec lors d'une exécution précédente sont retentées
+        for name in list(stage_states):
+            if stage_states[name]["status"] in (STAGE_FAILED, STAGE_BLOCKED):
+                del stage_states[name]
+        for name, stage_state in stage_states.items():
+            context.outputs[name] = stage_state.get("output") or {}
+
+        running: Dict[str, asyncio.Task] = {}
+        try:
+            while True:
+                self._schedule(context, stage_states, running)
+
+                if not running:
+                    break
+                done, _ = await asyncio.wait(running.values(), return_when=asyncio.FIRST_COMPLETED)
+                for name, task in list(running.items()):
+                    if task in done:
+                        del running[name]
+                        stage_states[name] = task.result()
+                        context.outputs[name] = stage_states[name].get("output") or {}
+                save_state(state)
+        finally:
+            for task in running.values():
+                task.cancel()
+
+        statuses = [stage_state["status"] for stage_state in stage_states.values()]
+        state["status"] = INGEST_FAILED if any(status in (STAGE_FAILED, STAGE_BLOCKED) for status in statuses) else INGEST_READY
+        save_state(state)
+        return state
+
+    def _schedule(self, context: "IngestContext", stage_states: dict, running: Dict[str, asyncio.Task]) -> None:
+        """Démarre les étapes prêtes et bloque celles dont une dépendance a échoué (de proche en proche)."""
+        changed = True
+        while changed:
+            changed = False
+            for stage in self.stages.values():
+                if stage.name in stage_states or stage.name in running:
+                    continue
+                dependency_statuses = [stage_states.get(name, {}).get("status") for name in stage.depends_on]
+                if any(status in (STAGE_FAILED, STAGE_BLOCKED) for status in dependency_statuses):
+                    stage_states[stage.name] = {"status": STAGE_BLOCKED}
+                    changed = True
+                elif all(status in (STAGE_DONE, STAGE_SKIPPED) for status in dependency_statuses):
+                    running[stage.name] = asyncio.create_task(self._run_stage(stage, context))
+
+    async def _run_stage(self, stage: Stage, context: "IngestContext") -> dict:
+        started_at = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                output = await stage.func(context)
+                result = {"status": STAGE_DONE, "output": output or {}}
+                break
+            except StageSkipped as skipped:
+                result = {"status": STAGE_SKIPPED, "reason": str(skipped)}
+                break
+            except Exception as e:
+                if attempt > stage.retries:
+                    logger.error(f"Étape '{stage.name}' en échec après {attempt} tentative(s): {str(e)}")
+                    result = {"status": STAGE_FAILED, "error": str(e)[:500]}
+                    break
+                delay = stage.retry_delay * 2 ** (attempt - 1)
+                logger.warning(f"Étape '{stage.name}' en échec (tentative {attempt}), nouvel essai dans {delay:.1f}s: {str(e)}")
+                await asyncio.sleep(delay)
+
+        duration = time.monotonic() - started_at
+        result.update({"attempts": attempt, "duration_seconds": round(duration, 3)})
+        self.metrics.record(stage.name, result["status"], attempt, duration)
+        return result
+
+
+class IngestContext:
+    """Paramètres d'ingestion d'un Pod et sorties des étapes déjà exécutées."""
+
+    def __init__(
+        self,
+        db: Session,
+        pod_id: int,
+        source_path: str,
+        audio_filename: str,
+        user_id: int,
+        transcribe: bool = False,
+        streamed_audio_url: Optional[str] = None,
+        source_key: Optional[str] = None
+    ):
+        self.db = db
+        self.pod_id = pod_id
+        self.source_path = source_path
+        self.audio_filename = audio_filename
+        self.user_id = user_id
+        self.transcribe = transcribe
+        self.streamed_audio_url = streamed_audio_url
+        # Vidéo envoyée directement dans le stockage (URL signée) : recopiée localement au besoin
+        self.source_key = source_key
+        self.outputs: Dict[str, dict] = {}
+
+    def pod(self) -> Pod:
+        return self.db.query(Pod).filter(Pod.id == self.pod_id).first()
+
+    def duplicate_pod(self) -> Optional[Pod]:
+        duplicate_of_id = self.outputs.get("analyze", {}).get("duplicate_of_id")
+        if not duplicate_of_id:
+            return None
+        return self.db.query(Pod).filter(Pod.id == duplicate_of_id).first()
+
+    def to_dict(self) -> dict:
+        return {
+            "source_path": self.source_path,
+            "audio_filename": self.audio_filename,
+            "user_id": self.user_id,
+            "transcribe": self.transcribe,
+            "streamed_audio_url": self.streamed_audio_url,
+            "source_key": self.source_key
+        }
+
+
+# --- Étapes de l'ingestion d'un Pod ---
+def _media_urls(renditions: Optional[List[dict]], preview_url: Optional[str]) -> List[str]:
+    urls = [rendition["url"] for rendition in renditions or []]
+    return urls + [preview_url] if preview_url else urls
+
+
+def _attach_stored_media(
+    context: IngestContext,
+    pod: Pod,
+    values: dict,
+    stored_urls: List[str],
+    previous_urls: List[Optional[str]]
+) -> None:
+    """
+    Enregistre sur le Pod des médias qui viennent d'être stockés (une référence chacun). Si
+    l'enregistrement échoue, ces références sont retirées : une nouvelle tentative ne les compte
+    pas deux fois. Celles d'une tentative précédente interrompue (`previous_urls`) sont retirées après coup.
+    """
+    try:
+        for name, value in values.items():
+            setattr(pod, name, value)
+        context.db.commit()
+    except Exception:
+        context.db.rollback()
+        for url in stored_urls:
+            media_store_service.release_media(context.db, url)
+        raise
+    for url in previous_urls:
+        media_store_service.release_media(context.db, url)
+
+
+async def analyze_stage(context: IngestContext) -> dict:
+    """Décodage unique : durée, forme d'onde, empreinte et détection des doublons."""
+    pod = context.pod()
+    analysis = await media_analysis_service.analyze_media_file(context.source_path)
+    media_analysis_service.save_pod_analysis(context.db, pod, analysis, commit=False)
+
+    duplicate_of_id = None
+    if settings.FINGERPRINT_ENABLED:
+        fingerprint = fingerprint_service.compute_fingerprint(analysis.samples)
+        pod.audio_fingerprint = fingerprint_service.fingerprint_to_bytes(fingerprint)
+        match = fingerprint_service.find_duplicate_pod(context.db, fingerprint, exclude_pod_id=pod.id)
+        if match and match[0].audio_file_url:
+            duplicate_of_id = match[0].id
+    context.db.commit()
+    return {"duplicate_of_id": duplicate_of_id}
+
+
+async def transcode_stage(context: IngestContext) -> dict:
+    """Extraction de la copie d'écoute (recopie de la piste ou réencodage)."""
+    if context.duplicate_pod():
+        raise StageSkipped("audio du Pod d'origine réutilisé")
+    if context.streamed_audio_url:
+        raise StageSkipped("audio déjà extrait en flux")
+    return {"audio_path": await video_service.extract_audio_from_video(context.source_path)}
+
+
+async def upload_stage(context: IngestContext) -> dict:
+    """Téléversement de la copie d'écoute (ou réutilisation de l'audio du Pod d'origine)."""
+    pod = context.pod()
+    duplicate_pod = context.duplicate_pod()
+    if duplicate_pod:
+        audio_url = duplicate_pod.audio_file_url
+        if pod.audio_file_url != audio_url:
+            media_store_service.acquire_media(context.db, audio_url)
+            # Audio extrait en flux pendant la réception : inutile, le contenu d'origine est réutilisé
+            media_store_service.release_media(context.db, pod.audio_file_url)
+        pod.audio_bitrate = duplicate_pod.audio_bitrate
+        pod.audio_sample_rate = duplicate_pod.audio_sample_rate
+        pod.audio_channels = duplicate_pod.audio_channels
+    elif context.streamed_audio_url:
+        audio_url = context.streamed_audio_url
+        audio_stream = await media_analysis_service.probe_audio_stream(
+            await media_cache_service.fetch_media(audio_url)
+        )
+        media_analysis_service.apply_audio_format(pod, audio_stream)
+    else:
+        audio_path = context.outputs["transcode"]["audio_path"]
+        audio_stream = await media_analysis_service.probe_audio_stream(audio_path)
+        media_object = await media_store_service.store_media_file(
+            context.db,
+            audio_path,
+            # Extension réelle : la piste d'origine peut avoir été recopiée sans réencodage
+            filename=f"{os.path.splitext(context.audio_filename)[0]}{os.path.splitext(audio_path)[1]}"
+        )
+        media_analysis_service.apply_audio_format(pod, audio_stream)
+        _attach_stored_media(
+            context, pod, {"audio_file_url": media_object.url},
+            stored_urls=[media_object.url],
+            previous_urls=[pod.audio_file_url]
+        )
+        os.unlink(audio_path)
+        return {"audio_url": media_object.url}
+
+    pod.audio_file_url = audio_url
+    context.db.commit()
+    return {"audio_url": audio_url}
+
+
+async def renditions_stage(context: IngestContext) -> dict:
+    """Déclinaisons de débit et extrait de prévisualisation (ou réutilisation de ceux du Pod d'origine)."""
+    pod = context.pod()
+    duplicate_pod = context.duplicate_pod()
+    if duplicate_pod and duplicate_pod.audio_renditions:
+        result = {"renditions": duplicate_pod.audio_renditions, "preview_url": duplicate_pod.preview_url}
+        if pod.audio_renditions is None:
+            for url in _media_urls(duplicate_pod.audio_renditions, duplicate_pod.preview_url):
+                media_store_service.acquire_media(context.db, url)
+    elif not settings.RENDITIONS_ENABLED:
+        raise StageSkipped("déclinaisons désactivées")
+    else:
+        result = await rendition_service.create_pod_renditions(
+            context.db, context.source_path, context.audio_filename
+        )
+        _attach_stored_media(
+            context, pod, {"audio_renditions": result["renditions"], "preview_url": result["preview_url"]},
+            stored_urls=_media_urls(result["renditions"], result["preview_url"]),
+            previous_urls=_media_urls(pod.audio_renditions, pod.preview_url)
+        )
+        return {"renditions": len(result["renditions"])}
+    pod.audio_renditions = result["renditions"]
+    pod.preview_url = result["preview_url"]
+    context.db.commit()
+    return {"renditions": len(result["renditions"])}
+
+
+async def transcribe_stage(context: IngestContext) -> dict:
+    """Transcription depuis la vidéo locale, en parallèle du transcodage et du téléversement."""
+    duplicate_pod = context.duplicate_pod()
+    if duplicate_pod:
+        fingerprint_service.reuse_processing_results(context.db, context.pod(), duplicate_pod)
+        return {"reused_from": duplicate_pod.id}
+    if not context.transcribe:
+        raise StageSkipped("transcription non demandée")
+    pod = await video_service.transcribe_pod_from_file(context.db, context.pod_id, context.source_path)
+    return {"characters": len(pod.transcription or "")}
+
+
+async def embed_stage(context: IngestContext) -> dict:
+    """Embedding de la transcription (utilisé par le matching)."""
+    pod = context.pod()
+    if pod.embedding:
+        raise StageSkipped("embedding déjà disponible")
+    if not pod.transcription:
+        raise StageSkipped("pas de transcription")
+    # Le calcul SBERT est bloquant : exécuté hors de la boucle d'événements
+    embedding = await asyncio.to_thread(ia_service.get_embedding_sbert, pod.transcription)
+    if not embedding:
+        raise StageSkipped("modèle d'embedding indisponible")
+    pod.embedding = embedding
+    context.db.commit()
+    return {"dimensions": len(embedding)}
+
+
+async def index_stage(context: IngestContext) -> dict:
+    """Indexation de l'empreinte audio, une fois l'audio du Pod disponible."""
+    pod = context.pod()
+    if not pod.audio_fingerprint:
+        raise StageSkipped("pas d'empreinte audio")
+    fingerprint = fingerprint_service.fingerprint_from_bytes(pod.audio_fingerprint)
+    fingerprint_service.index_pod_fingerprint(context.db, pod, fingerprint)
+    return {"frames": len(fingerprint)}
+
+
+INGEST_PIPELINE = Pipeline([
+    Stage("analyze", analyze_stage),
+    Stage("transcode", transcode_stage, depends_on=["analyze"], ephemeral=True),
+    Stage("upload", upload_stage, depends_on=["transcode"]),
+    Stage("renditions", renditions_stage, depends_on=["analyze"]),
+    Stage("transcribe", transcribe_stage, depends_on=["analyze"]),
+    Stage("embed", embed_stage, depends_on=["transcribe"], retries=1),
+    Stage("index", index_stage, depends_on=["upload", "embed"])
+])
+
+
+# --- Exécution ---
+def _save_pod_state(db: Session, pod_id: int, state: dict) -> None:
+    pod = db.query(Pod).filter(Pod.id == pod_id).first()
+    if not pod:
+        return
+    # Copie : la colonne JSON n'est marquée modifiée que si l'objet change
+    pod.ingest_state = copy.deepcopy(state)
+    if state.get("status") in (INGEST_READY, INGEST_FAILED):
+        pod.ingest_status = state["status"]
+    db.commit()
+
+
+def _mark_ingest_failed(db: Session, pod_id: int, error: str) -> None:
+    # Ingestion interrompue par une erreur hors des étapes : le Pod ne reste pas « en cours »
+    db.rollback()
+    pod = db.query(Pod).filter(Pod.id == pod_id).first()
+    if not pod or pod.ingest_status != INGEST_PROCESSING:
+        return
+    state = copy.deepcopy(pod.ingest_state or {})
+    state["status"] = INGEST_FAILED
+    state["error"] = error
+    _save_pod_state(db, pod_id, state)
+
+
+def create_ingesting_pod(
+    db: Session,
+    owner_id: int,
+    title: str,
+    description: Optional[str],
+    tags: List[str],
+    source_path: str,
+    audio_filename: str,
+    transcribe: bool = False,
+    streamed_audio_url: Optional[str] = None,
+    source_key: Optional[str] = None
+) -> Pod:
+    """
+    Crée un Pod à partir d'une vidéo reçue et enregistre son ingestion, à lancer ensuite
+    en arrière-plan avec `run_pod_ingest(pod.id)`. Le pipeline devient responsable de `source_path`.
+    """
+    pod = pod_service.create_pod(
+        db=db,
+        title=title,
+        description=description,
+        tags=tags,
+        audio_url=streamed_audio_url,
+        owner_id=owner_id
+    )
+    context = IngestContext(
+        db=db,
+        pod_id=pod.id,
+        source_path=source_path,
+        audio_filename=audio_filename,
+        user_id=owner_id,
+        transcribe=transcribe,
+        streamed_audio_url=streamed_audio_url,
+        source_key=source_key
+    )
+    return start_pod_ingest(db, pod, context)
+
+
+def start_pod_ingest(db: Session, pod: Pod, context: IngestContext) -> Pod:
+    """Enregistre l'état initial de l'ingestion sur le Pod (avant son exécution en arrière-plan)."""
+    pod.ingest_status = INGEST_PROCESSING
+    pod.ingest_state = {"status": INGEST_PROCESSING, "context": context.to_dict(), "stages": {}}
+    db.commit()
+    db.refresh(pod)
+    return pod
+
+
+async def run_pod_ingest(pod_id: int, resumed: bool = False) -> Optional[dict]:
+    """
+    Exécute (ou reprend) l'ingestion d'un Pod avec sa propre session de base de données,
+    puis supprime la vidéo source.
+    """
+    db = SessionLocal()
+    try:
+        pod = db.query(Pod).filter(Pod.id == pod_id).first()
+        if not pod or not pod.ingest_state:
+            return None
+        state = copy.deepcopy(pod.ingest_state)
+        context = IngestContext(db=db, pod_id=pod_id, **state["context"])
+
+        if resumed:
+            INGEST_PIPELINE.reset_ephemeral_stages(state)
+        source_needed = any(
+            state["stages"].get(name, {}).get("status") not in (STAGE_DONE, STAGE_SKIPPED)
+            for name in ("analyze", "transcode", "transcribe")
+        )
+        if source_needed and not os.path.exists(context.source_path) and context.source_key:
+            try:
+                await storage_service.get_storage_backend().download_to_path(context.source_key, context.source_path)
+            except storage_service.StorageError as e:
+                logger.error(f"Récupération de la vidéo du Pod {pod_id} depuis le stockage impossible: {e}")
+        if source_needed and not os.path.exists(context.source_path):
+            logger.error(f"Ingestion du Pod {pod_id} impossible: vidéo source absente ({context.source_path})")
+            state["status"] = INGEST_FAILED
+            _save_pod_state(db, pod_id, state)
+            return state
+
+        started_at = time.monotonic()
+        state = await INGEST_PIPELINE.run(context, state, lambda current: _save_pod_state(db, pod_id, current))
+        logger.info(f"Ingestion du Pod {pod_id}: {state['status']} en {time.monotonic() - started_at:.1f}s")
+
+        # En cas d'échec définitif (tentatives épuisées), la vidéo source n'est pas conservée non plus
+        if os.path.exists(context.source_path):
+            os.unlink(context.source_path)
+        if context.source_key:
+            await storage_service.get_storage_backend().delete(context.source_key)
+        return state
+    except Exception as e:
+        logger.error(f"Erreur inattendue pendant l'ingestion du Pod {pod_id}: {str(e)}", exc_info=True)
+        try:
+            _mark_ingest_failed(db, pod_id, str(e))
+        except Exception as save_error:
+            logger.error(f"Échec de l'ingestion du Pod {pod_id} non enregistré: {str(save_error)}")
+        return None
+    finally:
+        db.close()
+
+
+async def resume_pending_ingests() -> int:
+    """Reprend les ingestions interrompues (redémarrage du serveur). Retourne le nombre de Pods repris."""
+    db = SessionLocal()
+    try:
+        pod_ids = [pod_id for (pod_id,) in db.query(Pod.id).filter(Pod.ingest_status == INGEST_PROCESSING).all()]
+    finally:
+        db.close()
+    for pod_id in pod_ids:
+        await run_pod_ingest(pod_id, resumed=True)
+    return len(pod_ids)
+
+
+def get_ingest_metrics() -> dict:
+    return INGEST_PIPELINE.metrics.snapshot()
@@ -0,0 +1,91 @@
+# Analyse de l'audio d'un Pod à l'ingestion : métadonnées (ffprobe) et forme d'onde précalculée
+#
+# L'audio est décodé une seule fois, à la fréquence de l'empreinte audio : le même signal sert
+# à l'empreinte (détection des doublons) et à la forme d'onde. Les lecteurs obtiennent ainsi
+# durée et forme d'onde sans télécharger le fichier audio.
+#
+# Débit, fréquence d'échantillonnage et canaux décrivent la copie d'écoute : ils sont lus sur
+# l'audio stocké (apply_audio_format), pas sur la piste de la vidéo d'origine.
+
+import logging
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..models.pod_model import Pod
+from . import audio_service, media_cache_service
+from .ffmpeg_service import FFmpegError
+from .fingerprint_service import FINGERPRINT_SAMPLE_RATE
+
+logger = logging.getLogger("media_analysis_service")
+
+
+class MediaAnalysis:
+    """Résultat de l'analyse d'un fichier média : signal décodé, piste audio (ffprobe) et forme d'onde."""
+
+    def __init__(self, samples: np.ndarray, sample_rate: int, audio_stream: Optional[dict]):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.audio_stream = audio_stream or {}
+        self.waveform_peaks = audio_service.compute_waveform_peaks(samples)
+
+    @property
+    def duration_seconds(self) -> float:
+        # La durée annoncée par le conteneur est plus précise que celle du signal rééchantillonné
+        return self.audio_stream.get("duration") or len(self.samples) / self.sample_rate
+
+    def apply_to_pod(self, pod: Pod) -> Pod:
+        pod.duration_seconds = self.duration_seconds
+        pod.waveform_peaks = audio_service.waveform_to_bytes(self.waveform_peaks)
+        return pod
+
+    def __repr__(self):
+        return f"<MediaAnalysis(duration={self.duration_seconds:.1f}s, peaks={len(self.waveform_peaks)})>"
+
+
+async def analyze_media_file(media_file_path: str, sample_rate: int = FINGERPRINT_SAMPLE_RATE) -> MediaAnalysis:
+    """Inspecte (ffprobe) et décode un fichier audio/vidéo, puis calcule sa forme d'onde."""
+    audio_stream = audio_service.first_audio_stream(await audio_service.probe_media(media_file_path))
+    samples = await audio_service.decode_to_pcm(media_file_path, sample_rate=sample_rate)
+    return MediaAnalysis(samples, sample_rate, audio_stream)
+
+
+async def probe_audio_stream(audio_file_path: str) -> Optional[dict]:
+    """Caractéristiques (ffprobe) de la piste d'un fichier audio ; None si l'inspection échoue."""
+    try:
+        return audio_service.first_audio_stream(await audio_service.probe_media(audio_file_path))
+    except (FFmpegError, ValueError) as e:
+        logger.warning(f"Inspection ffprobe de {audio_file_path} impossible: {str(e)}")
+        return None
+
+
+def apply_audio_format(pod: Pod, audio_stream: Optional[dict]) -> Pod:
+    """Renseigne débit, fréquence d'échantillonnage et canaux de l'audio stocké du Pod."""
+    audio_stream = audio_stream or {}
+    pod.audio_bitrate = audio_stream.get("bitrate")
+    pod.audio_sample_rate = audio_stream.get("sample_rate")
+    pod.audio_channels = audio_stream.get("channels")
+    return pod
+
+
+def save_pod_analysis(db: Session, pod: Pod, analysis: MediaAnalysis, commit: bool = True) -> Pod:
+    analysis.apply_to_pod(pod)
+    if commit:
+        db.commit()
+        db.refresh(pod)
+    return pod
+
+
+async def analyze_pod(db: Session, pod: Pod) -> MediaAnalysis:
+    """
+    Analyse un Pod existant à partir de son audio stocké (rattrapage du catalogue).
+    L'audio est lu via le cache disque des médias.
+    """
+    audio_path = await media_cache_service.fetch_media(pod.audio_file_url)
+    analysis = await analyze_media_file(audio_path)
+    # Fichier analysé = audio stocké : ses caractéristiques sont celles de la copie d'écoute
+    apply_audio_format(pod, analysis.audio_stream)
+    save_pod_analysis(db, pod, analysis)
+    logger.info(f"Pod {pod.id} analysé: {analysis}")
+    return analysis
@@ -0,0 +1,202 @@
+# Cache disque local (LRU borné en octets) pour les médias distants relus par les traitements
+#
+# Les retranscriptions, calculs d'empreinte ou de forme d'onde relisent souvent le même
+# `audio_file_url`. Le cache évite de retélécharger le fichier : chaque URL est revalidée
+# avec son ETag (If-None-Match) et le contenu n'est retransféré que s'il a changé. Les
+# téléchargements passent par media_fetch_service (requêtes couvertes, nouvelles tentatives).
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Dict, Optional
+
+import httpx
+
+from ..config import settings
+from . import media_fetch_service
+
+logger = logging.getLogger("media_cache_service")
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class MediaCache:
+    """
+    Cache de fichiers distants sur disque.
+
+    - Clé : URL + ETag (une nouvelle version de l'objet produit une nouvelle entrée).
+    - Éviction LRU sur la taille totale des fichiers (la date de modification sert de date d'accès).
+    - Écritures atomiques (fichier temporaire puis `os.replace`) et verrou par URL, partagé entre
+      coroutines et entre processus du même worker : un seul téléchargement par fichier.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        revalidate_seconds: int = 300,
+        client: Optional[httpx.AsyncClient] = None,
+        reader: Optional[media_fetch_service.HedgedReader] = None
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        # Un client imposé (tests) est utilisé sans nouvelles tentatives ni couverture
+        self.reader = reader or (media_fetch_service.HedgedReader(max_retries=0, client=client) if client else media_fetch_service.media_reader)
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Les contenus sont rangés à part des métadonnées et verrous pour faciliter l'éviction
+        self.data_directory = os.path.join(directory, "data")
+        os.makedirs(self.data_directory, exist_ok=True)
+
+    # --- Chemins ---
+    @staticmethod
+    def _url_key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _data_name(url: str, etag: Optional[str]) -> str:
+        # L'extension d'origine est conservée : certains consommateurs (Whisper) en déduisent le format
+        extension = os.path.splitext(httpx.URL(url).path)[1][:10]
+        return hashlib.sha256(f"{url}\0{etag or ''}".encode("utf-8")).hexdigest() + extension
+
+    def _meta_path(self, url_key: str) -> str:
+        return os.path.join(self.directory, f"{url_key}.json")
+
+    def _lock_path(self, url_key: str) -> str:
+        return os.path.join(self.directory, f"{url_key}.lock")
+
+    # --- Métadonnées ---
+    def _read_meta(self, url_key: str) -> Optional[dict]:
+        try:
+            with open(self._meta_path(url_key), "r") as meta_file:
+                return json.load(meta_file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_meta(self, url_key: str, meta: dict) -> None:
+        tmp_path = os.path.join(self.directory, f".{url_key}.{uuid.uuid4().hex}.json.tmp")
+        with open(tmp_path, "w") as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(tmp_path, self._meta_path(url_key))
+
+    # --- API publique ---
+    async def fetch(self, url: str) -> str:
+        """
+        Retourne le chemin local d'une copie à jour du fichier distant, en le téléchargeant si nécessaire.
+
+        Le fichier retourné peut être évincé par un autre traitement : il doit être ouvert
+        immédiatement (un fichier ouvert reste lisible après sa suppression).
+        """
+        url_key = self._url_key(url)
+        lock = self._locks.setdefault(url_key, asyncio.Lock())
+        async with lock:
+            lock_file = await asyncio.to_thread(self._acquire_process_lock, url_key)
+            try:
+                return await self._fetch_locked(url, url_key)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+
+    def _acquire_process_lock(self, url_key: str):
+        lock_file = open(self._lock_path(url_key), "a+")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    async def _fetch_locked(self, url: str, url_key: str) -> str:
+        meta = self._read_meta(url_key)
+        cached_path = os.path.join(self.data_directory, meta["data"]) if meta else None
+        if cached_path and not os.path.exists(cached_path):
+            meta, cached_path = None, None
+
+        if meta and time.time() - meta.get("validated_at", 0) < self.revalidate_seconds:
+            self._touch(cached_path)
+            return cached_path
+
+        headers = {"If-None-Match": meta["etag"]} if meta and meta.get("etag") else {}
+        response = await self.reader.get(url, headers=headers)
+        try:
+            if response.status_code == 304 and cached_path:
+                meta["validated_at"] = time.time()
+                self._write_meta(url_key, meta)
+                self._touch(cached_path)
+                return cached_path
+            response.raise_for_status()
+
+            etag = response.headers.get("etag")
+            data_name = self._data_name(url, etag)
+            data_path = os.path.join(self.data_directory, data_name)
+            tmp_path = os.path.join(self.directory, f".{data_name}.{uuid.uuid4().hex}.tmp")
+            size = 0
+            try:
+                with open(tmp_path, "wb") as tmp_file:
+                    async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                        tmp_file.write(chunk)
+                        size += len(chunk)
+                os.replace(tmp_path, data_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+        finally:
+            await response.aclose()
+
+        # L'ancienne version de l'objet n'est plus référencée
+        if cached_path and cached_path != data_path and os.path.exists(cached_path):
+            os.unlink(cached_path)
+        self._write_meta(url_key, {"url": url, "etag": etag, "data": data_name, "size": size, "validated_at": time.time()})
+        logger.info(f"Média mis en cache: {url} ({size} octets)")
+
+        self.evict(keep=data_path)
+        return data_path
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        try:
+            os.utime(path, None)
+        except FileNotFoundError:
+            pass
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Supprime les fichiers les moins récemment utilisés jusqu'à repasser sous `max_bytes`.
+        Retourne le nombre d'octets libérés.
+        """
+        entries = []
+        for entry in os.scandir(self.data_directory):
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.unlink(path)
+                total -= size
+                freed += size
+            except FileNotFoundError:
+                pass
+        return freed
+
+    async def aclose(self) -> None:
+        await self.reader.aclose()
+
+
+media_cache = MediaCache(
+    directory=settings.MEDIA_CACHE_DIR,
+    max_bytes=settings.MEDIA_CACHE_MAX_BYTES,
+    revalidate_seconds=settings.MEDIA_CACHE_REVALIDATE_SECONDS
+)
+
+
+async def fetch_media(url: str) -> str:
+    """Retourne le chemin local (mis en cache) du média situé à `url`."""
+    return await media_cache.fetch(url)
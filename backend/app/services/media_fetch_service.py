@@ -0,0 +1,217 @@
+# Lectures HTTP des médias stockés (téléchargements pour transcription, empreintes, formes d'onde)
+#
+# - Requêtes « couvertes » (hedging) : si la réponse tarde au-delà du p95 observé pour l'hôte, une
+#   seconde requête identique est envoyée et la première réponse reçue est gardée. Environ 5 % des
+#   lectures en déclenchent une : la latence extrême baisse sans doubler la charge.
+# - Nouvelles tentatives bornées, avec attente exponentielle et aléa, sur erreurs réseau et 429/5xx.
+# - Un pool de connexions par hôte : un stockage lent ne monopolise pas les connexions des autres.
+# La latence mesurée est celle de l'arrivée des en-têtes : la durée du transfert dépend de la taille.
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger("media_fetch_service")
+
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class LatencyTracker:
+    """Fenêtre glissante des dernières latences d'un hôte, pour estimer ses percentiles."""
+
+    def __init__(self, window: int = 500):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class HedgedReader:
+    """Client de lecture (GET en flux) avec couverture des requêtes lentes et nouvelles tentatives."""
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 10,
+        hedge_percentile: float = 0.95,
+        hedge_min_samples: int = 20,
+        max_hedge_ratio: float = 0.1,
+        max_retries: int = 2,
+        backoff_base_seconds: float = 0.2,
+        backoff_max_seconds: float = 2.0,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        self.max_connections_per_host = max_connections_per_host
+        self.hedge_percentile = hedge_percentile
+        # Pas de couverture tant que l'hôte n'a pas assez de mesures pour estimer son p95
+        self.hedge_min_samples = hedge_min_samples
+        # Plafond de requêtes supplémentaires : si tout le stockage ralentit, le p95 passé est
+        # dépassé partout et la couverture doublerait la charge au pire moment
+        self.max_hedge_ratio = max_hedge_ratio
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        # Client imposé (tests) : utilisé pour tous les hôtes
+        self._client = client
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._latencies: Dict[str, LatencyTracker] = {}
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    @staticmethod
+    def _host(url: httpx.URL) -> str:
+        return f"{url.scheme}://{url.netloc.decode('ascii')}"
+
+    def _client_for(self, host: str) -> httpx.AsyncClient:
+        if self._client is not None:
+            return self._client
+        if host not in self._clients:
+            self._clients[host] = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0, read=120.0),
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections_per_host,
+                    max_keepalive_connections=self.max_connections_per_host
+                )
+            )
+        return self._clients[host]
+
+    def hedge_delay(self, host: str) -> Optional[float]:
+        """Délai au-delà duquel une seconde requête est envoyée (None : pas de couverture)."""
+        tracker = self._latencies.get(host)
+        if tracker is None or len(tracker.samples) < self.hedge_min_samples:
+            return None
+        if self.hedges_fired >= self.max_hedge_ratio * self.requests:
+            return None
+        return tracker.percentile(self.hedge_percentile)
+
+    def backoff_delay(self, attempt: int) -> float:
+        # « Full jitter » : les clients en échec ne relancent pas tous au même instant
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+
+    async def get(self, url: str, headers: Optional[dict] = None) -> httpx.Response:
+        """
+        Envoie un GET et retourne la réponse dès réception des en-têtes, corps non lu : l'appelant
+        la lit en flux (`aiter_bytes`) puis la ferme (`aclose`). Les statuts d'erreur non
+        retentés sont retournés tels quels.
+        """
+        parsed = httpx.URL(url)
+        host = self._host(parsed)
+        self.requests += 1
+        attempt = 0
+        while True:
+            try:
+                response = await self._hedged_send(host, parsed, headers or {})
+                if response.status_code not in RETRYABLE_STATUSES:
+                    return response
+                if attempt >= self.max_retries:
+                    self.failures += 1
+                    return response
+                await response.aclose()
+                reason = f"statut {response.status_code}"
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    self.failures += 1
+                    raise
+                reason = f"{type(e).__name__}"
+            delay = self.backoff_delay(attempt)
+            attempt += 1
+            self.retries += 1
+            logger.info(f"Lecture de {url} relancée dans {delay:.2f}s (tentative {attempt + 1}, {reason})")
+            await asyncio.sleep(delay)
+
+    async def _send(self, host: str, url: httpx.URL, headers: dict) -> Tuple[httpx.Response, float]:
+        client = self._client_for(host)
+        started_at = time.monotonic()
+        response = await client.send(client.build_request("GET", url, headers=headers), stream=True)
+        return response, time.monotonic() - started_at
+
+    async def _hedged_send(self, host: str, url: httpx.URL, headers: dict) -> httpx.Response:
+        tracker = self._latencies.setdefault(host, LatencyTracker())
+        primary = asyncio.create_task(self._send(host, url, headers))
+        tasks = [primary]
+        winner = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay(host))
+            if not done:
+                self.hedges_fired += 1
+                tasks.append(asyncio.create_task(self._send(host, url, headers)))
+
+            pending = set(tasks)
+            error = None
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif winner is None:
+                        winner = task
+            if winner is None:
+                raise error
+
+            response, latency = winner.result()
+            tracker.record(latency)
+            if winner is not primary:
+                self.hedges_won += 1
+            return response
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif task is not winner and not task.cancelled() and task.exception() is None:
+                    # Réponse perdante déjà reçue : sa connexion est rendue au pool
+                    await task.result()[0].aclose()
+
+    def metrics(self) -> dict:
+        latencies = sorted(sample for tracker in self._latencies.values() for sample in tracker.samples)
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))], 4)
+
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "hosts": len(self._latencies),
+            "p50_seconds": percentile(0.5),
+            "p95_seconds": percentile(0.95),
+            "p99_seconds": percentile(0.99)
+        }
+
+    async def aclose(self) -> None:
+        for client in list(self._clients.values()) + ([self._client] if self._client else []):
+            await client.aclose()
+        self._clients.clear()
+
+
+media_reader = HedgedReader(
+    max_connections_per_host=settings.STORAGE_READ_CONNECTIONS_PER_HOST,
+    hedge_percentile=settings.STORAGE_HEDGE_PERCENTILE,
+    max_hedge_ratio=settings.STORAGE_HEDGE_MAX_RATIO,
+    max_retries=settings.STORAGE_READ_MAX_RETRIES,
+    backoff_base_seconds=settings.STORAGE_READ_BACKOFF_SECONDS,
+    backoff_max_seconds=settings.STORAGE_READ_BACKOFF_MAX_SECONDS
+)
+
+
+def get_media_fetch_metrics() -> dict:
+    return media_reader.metrics()
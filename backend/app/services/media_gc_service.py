@@ -0,0 +1,198 @@
+# Ramasse-miettes du stockage des médias
+#
+# La suppression d'un Pod ne fait que libérer ses références (media_store_service.release_media) :
+# les fichiers sont supprimés ici, en arrière-plan. Chaque passage :
+# - supprime les objets suivis (media_objects) sans référence depuis MEDIA_GC_GRACE_SECONDS ;
+# - compare le contenu du stockage aux URLs référencées par les Pods et les profils, et supprime
+#   les objets orphelins (envois interrompus, suppressions échouées) plus anciens que le délai de grâce ;
+# - supprime les fichiers temporaires abandonnés des téléversements reprenables.
+# Les suppressions se font par lots de MEDIA_GC_BATCH_SIZE, espacés de MEDIA_GC_BATCH_PAUSE_SECONDS,
+# pour ne pas saturer le stockage. Le délai de grâce protège les envois en cours.
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.media_object_model import MediaObject
+from ..models.pod_model import Pod
+from ..models.profile_model import Profile
+from ..models.upload_session_model import UploadSession
+from . import ingest_service, storage_service, upload_session_service
+
+logger = logging.getLogger("media_gc_service")
+
+# Préfixes des clés gérées par l'application dans le stockage
+GC_PREFIXES = ("media/", "audio/", "uploads/")
+# Lignes lues par lot lors du parcours des URLs référencées
+GC_SCAN_BATCH_SIZE = 1000
+
+_last_report: Optional[dict] = None
+
+
+def get_gc_report() -> Optional[dict]:
+    """Bilan du dernier passage (exposé par /health)."""
+    return _last_report
+
+
+def collect_referenced_urls(db: Session) -> Set[str]:
+    """
+    URLs des médias référencés par les Pods et les profils. Seules les colonnes d'URL sont lues,
+    par lots : ni transcriptions, ni embeddings, ni formes d'onde en mémoire.
+    """
+    urls = set()
+    pod_rows = db.query(Pod.audio_file_url, Pod.preview_url, Pod.audio_renditions).yield_per(GC_SCAN_BATCH_SIZE)
+    for audio_file_url, preview_url, audio_renditions in pod_rows:
+        urls.update((audio_file_url, preview_url))
+        urls.update(rendition.get("url") for rendition in audio_renditions or [])
+    profile_rows = db.query(Profile.profile_picture_url, Profile.avatar_variants).yield_per(GC_SCAN_BATCH_SIZE)
+    for profile_picture_url, avatar_variants in profile_rows:
+        urls.add(profile_picture_url)
+        urls.update((avatar_variants or {}).values())
+    urls.discard(None)
+    return urls
+
+
+def collect_protected_keys(db: Session, backend: storage_service.StorageBackend) -> Set[str]:
+    """Clés à ne jamais supprimer : objets référencés ou suivis, envois directs en cours."""
+    keys = {backend.key_from_url(url) for url in collect_referenced_urls(db)}
+    keys.update(key for (key,) in db.query(MediaObject.key).all())
+    keys.update(key for (key,) in db.query(UploadSession.storage_key).filter(UploadSession.storage_key.isnot(None)).all())
+    keys.discard(None)
+    return keys
+
+
+def collect_protected_paths(db: Session) -> Set[str]:
+    """Fichiers temporaires encore utiles : sessions de téléversement et ingestions en cours."""
+    paths = {path for (path,) in db.query(UploadSession.spool_path).all()}
+    for (state,) in db.query(Pod.ingest_state).filter(Pod.ingest_status == ingest_service.INGEST_PROCESSING).all():
+        source_path = ((state or {}).get("context") or {}).get("source_path")
+        if source_path:
+            paths.add(source_path)
+    return {os.path.abspath(path) for path in paths}
+
+
+async def _delete_in_batches(items: List, delete: Callable[[object], Awaitable[int]]) -> Dict[str, int]:
+    """Supprime `items` par lots ; `delete` retourne le nombre d'octets libérés."""
+    deleted = 0
+    reclaimed = 0
+    errors = 0
+    batch_size = max(1, settings.MEDIA_GC_BATCH_SIZE)
+    for start in range(0, len(items), batch_size):
+        if start:
+            await asyncio.sleep(settings.MEDIA_GC_BATCH_PAUSE_SECONDS)
+        results = await asyncio.gather(*(delete(item) for item in items[start:start + batch_size]), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                errors += 1
+                logger.warning(f"Suppression par le ramasse-miettes impossible: {str(result)}")
+            elif result is not None:
+                deleted += 1
+                reclaimed += result
+    return {"deleted": deleted, "bytes": reclaimed, "errors": errors}
+
+
+async def collect_unreferenced_objects(db: Session, cutoff: datetime) -> Dict[str, int]:
+    """Supprime les objets suivis sans référence depuis `cutoff`."""
+    backend = storage_service.get_storage_backend()
+    candidates = (
+        db.query(MediaObject.sha256, MediaObject.key, MediaObject.size)
+        .filter(MediaObject.ref_count == 0, MediaObject.updated_at < cutoff)
+        .all()
+    )
+
+    async def delete(candidate) -> Optional[int]:
+        sha256, key, size = candidate
+        # Suppression conditionnelle : une référence ajoutée entre-temps la fait échouer
+        removed = (
+            db.query(MediaObject)
+            .filter(MediaObject.sha256 == sha256, MediaObject.ref_count == 0)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        if not removed:
+            return None
+        # En cas d'échec, l'objet devient orphelin et sera supprimé au prochain passage
+        await backend.delete(key)
+        return size
+
+    return await _delete_in_batches(candidates, delete)
+
+
+async def collect_orphaned_objects(db: Session, cutoff: datetime) -> Dict[str, int]:
+    """Supprime les objets du stockage que rien ne référence, modifiés avant `cutoff`."""
+    backend = storage_service.get_storage_backend()
+    # Parcours des tables bloquant : exécuté hors de la boucle d'événements
+    protected_keys = await asyncio.to_thread(collect_protected_keys, db, backend)
+    orphans = []
+    for prefix in GC_PREFIXES:
+        async for stored_object in backend.list_objects(prefix):
+            if stored_object.key not in protected_keys and stored_object.last_modified < cutoff:
+                orphans.append(stored_object)
+
+    async def delete(stored_object: storage_service.StoredObject) -> int:
+        await backend.delete(stored_object.key)
+        return stored_object.size
+
+    return await _delete_in_batches(orphans, delete)
+
+
+async def collect_temp_files(db: Session, cutoff: datetime) -> Dict[str, int]:
+    """Supprime les fichiers abandonnés du répertoire des téléversements reprenables."""
+    directory = upload_session_service._spool_directory()
+    protected_paths = await asyncio.to_thread(collect_protected_paths, db)
+    stale = []
+    for entry in os.scandir(directory):
+        if not entry.is_file() or os.path.abspath(entry.path) in protected_paths:
+            continue
+        stat_result = entry.stat()
+        if datetime.utcfromtimestamp(stat_result.st_mtime) < cutoff:
+            stale.append((entry.path, stat_result.st_size))
+
+    async def delete(item) -> int:
+        path, size = item
+        await asyncio.to_thread(os.unlink, path)
+        return size
+
+    return await _delete_in_batches(stale, delete)
+
+
+async def run_media_gc(db: Session) -> dict:
+    """Effectue un passage complet et retourne son bilan (objets supprimés, octets libérés)."""
+    global _last_report
+    started_at = time.monotonic()
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.MEDIA_GC_GRACE_SECONDS)
+    report = {
+        "unreferenced": await collect_unreferenced_objects(db, cutoff),
+        "orphaned": await collect_orphaned_objects(db, cutoff),
+        "temp_files": await collect_temp_files(db, cutoff)
+    }
+    report["bytes_reclaimed"] = sum(part["bytes"] for part in report.values())
+    report["duration_seconds"] = round(time.monotonic() - started_at, 2)
+    report["finished_at"] = datetime.utcnow().isoformat()
+    _last_report = report
+    logger.info(
+        f"Ramasse-miettes: {report['unreferenced']['deleted']} objets sans référence, "
+        f"{report['orphaned']['deleted']} orphelins, {report['temp_files']['deleted']} fichiers temporaires supprimés, "
+        f"{report['bytes_reclaimed']} octets libérés en {report['duration_seconds']}s"
+    )
+    return report
+
+
+async def media_gc_loop() -> None:
+    """Passages périodiques (tâche lancée au démarrage de l'application)."""
+    while True:
+        db = SessionLocal()
+        try:
+            await run_media_gc(db)
+        except Exception as e:
+            logger.error(f"Erreur pendant le passage du ramasse-miettes: {str(e)}", exc_info=True)
+        finally:
+            db.close()
+        await asyncio.sleep(settings.MEDIA_GC_INTERVAL_SECONDS)
@@ -0,0 +1,103 @@
+# Service des fichiers médias locaux (audio, déclinaisons, avatars) sous /static
+#
+# - Requêtes partielles (Range / If-Range) : la lecture reprend à la position demandée.
+# - ETag fort et réponses 304 (If-None-Match).
+# - Fichiers nommés d'après leur empreinte : « Cache-Control: immutable », cachés sans limite par
+#   les navigateurs et les CDN.
+# - Envoi sans copie : extension ASGI `http.response.pathsend` si le serveur la propose, ou
+#   délégation à nginx (X-Accel-Redirect, sendfile) si MEDIA_ACCEL_REDIRECT_PREFIX est défini.
+
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request, status
+from starlette.responses import FileResponse, Response
+
+from ..config import settings
+
+# Noms dérivés du contenu : empreinte SHA-256 complète (media_store_service) ou tronquée (avatar_service)
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{24,64}(-\d+)?\.[0-9a-z]+$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Autres fichiers (noms choisis à l'envoi) : mis en cache brièvement puis revalidés par ETag
+REVALIDATED_CACHE_CONTROL = "public, max-age=300"
+
+# Types absents de certaines tables mimetypes
+AUDIO_MEDIA_TYPES = {".opus": "audio/ogg", ".ogg": "audio/ogg", ".webm": "audio/webm", ".m4a": "audio/mp4", ".aac": "audio/aac"}
+
+
+def get_media_directories() -> Dict[str, str]:
+    """Zones servies sous /static/{zone}/ et leur répertoire sur disque."""
+    return {
+        "media": settings.STORAGE_LOCAL_DIR,
+        "audio": "./static/audio",
+        "avatars": settings.AVATAR_DIR
+    }
+
+
+def resolve_media_path(area: str, path: str) -> str:
+    """Chemin sur disque d'un fichier servi ; 404 si la zone est inconnue ou si le chemin en sort."""
+    directory = get_media_directories().get(area)
+    if directory is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fichier non trouvé")
+    root = os.path.realpath(directory)
+    full_path = os.path.realpath(os.path.join(root, path))
+    if not full_path.startswith(root + os.sep) or not os.path.isfile(full_path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Fichier non trouvé")
+    return full_path
+
+
+def is_content_addressed(filename: str) -> bool:
+    return bool(CONTENT_ADDRESSED_NAME.match(filename))
+
+
+def compute_etag(filename: str, stat_result: os.stat_result) -> str:
+    """
+    ETag fort : l'empreinte elle-même pour un fichier nommé d'après son contenu, sinon dérivé
+    de l'inode, de la taille et de la date de modification (remplacement atomique = nouvel inode).
+    """
+    if is_content_addressed(filename):
+        return f'"{os.path.splitext(filename)[0]}"'
+    version = f"{stat_result.st_ino}-{stat_result.st_size}-{stat_result.st_mtime_ns}"
+    return f'"{hashlib.sha256(version.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparaison faible (RFC 9110) d'un en-tête If-None-Match avec l'ETag courant."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def media_type_for(filename: str) -> str:
+    extension = os.path.splitext(filename)[1].lower()
+    return AUDIO_MEDIA_TYPES.get(extension) or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+def build_media_response(request: Request, area: str, path: str) -> Response:
+    full_path = resolve_media_path(area, path)
+    stat_result = os.stat(full_path)
+    filename = os.path.basename(full_path)
+    etag = compute_etag(filename, stat_result)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if is_content_addressed(filename) else REVALIDATED_CACHE_CONTROL,
+        "Accept-Ranges": "bytes"
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+        # nginx envoie le fichier (sendfile) et traite lui-même les requêtes partielles
+        headers["X-Accel-Redirect"] = f"{settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{area}/{path}"
+        return Response(headers=headers, media_type=media_type_for(filename))
+
+    # FileResponse gère Range / If-Range (206, 416) et utilise `pathsend` quand le serveur le permet
+    return FileResponse(full_path, headers=headers, media_type=media_type_for(filename), stat_result=stat_result)
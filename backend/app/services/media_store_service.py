@@ -0,0 +1,152 @@
+# Stockage des médias adressé par contenu, avec déduplication et comptage de références
+#
+# Chaque fichier est identifié par l'empreinte SHA-256 de son contenu (table media_objects).
+# Un contenu déjà stocké n'est pas renvoyé : on ajoute seulement une référence. Un objet sans
+# référence est supprimé du stockage plus tard, par le ramasse-miettes (media_gc_service).
+
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import uuid
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.media_object_model import MediaObject
+from . import storage_service
+
+logger = logging.getLogger("media_store_service")
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as media_file:
+        while chunk := media_file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_key(sha256: str, filename: str) -> str:
+    # Deux niveaux de préfixe pour répartir les objets (listings et systèmes de fichiers)
+    return f"media/{sha256[:2]}/{sha256}{os.path.splitext(filename)[1].lower()[:10]}"
+
+
+def get_media_object_by_url(db: Session, url: str) -> Optional[MediaObject]:
+    return db.query(MediaObject).filter(MediaObject.url == url).first()
+
+
+def _add_reference(db: Session, sha256: str) -> Optional[MediaObject]:
+    """Incrémente atomiquement le compteur de l'objet ; None s'il n'existe pas (ou plus)."""
+    updated = (
+        db.query(MediaObject)
+        .filter(MediaObject.sha256 == sha256)
+        .update({MediaObject.ref_count: MediaObject.ref_count + 1}, synchronize_session=False)
+    )
+    if not updated:
+        return None
+    return db.query(MediaObject).filter(MediaObject.sha256 == sha256).populate_existing().first()
+
+
+def _register(db: Session, sha256: str, key: str, url: str, size: int, content_type: Optional[str]) -> Optional[MediaObject]:
+    """
+    Enregistre un nouvel objet avec une référence. Retourne None si un envoi concurrent du même
+    contenu l'a enregistré entre-temps (il suffit alors d'ajouter une référence).
+    """
+    media_object = MediaObject(sha256=sha256, key=key, url=url, size=size, content_type=content_type, ref_count=1)
+    try:
+        with db.begin_nested():
+            db.add(media_object)
+    except IntegrityError:
+        return None
+    return media_object
+
+
+async def store_media_file(db: Session, file_path: str, filename: str, commit: bool = True) -> MediaObject:
+    """
+    Stocke un fichier local et retourne son MediaObject (avec une référence de plus).
+    Si le même contenu est déjà stocké, rien n'est envoyé.
+    """
+    sha256 = await asyncio.to_thread(hash_file, file_path)
+    media_object = _add_reference(db, sha256)
+    if media_object is None:
+        key = content_key(sha256, filename)
+        content_type = mimetypes.guess_type(filename)[0]
+        with open(file_path, "rb") as media_file:
+            url = await storage_service.get_storage_backend().upload_fileobj(media_file, key, content_type)
+        media_object = _register(db, sha256, key, url, os.path.getsize(file_path), content_type) or _add_reference(db, sha256)
+    else:
+        logger.info(f"Contenu déjà stocké, envoi évité: {media_object}")
+    if commit:
+        db.commit()
+    return media_object
+
+
+async def store_media_stream(db: Session, chunks: AsyncIterator[bytes], filename: str, commit: bool = True) -> MediaObject:
+    """
+    Stocke un flux de taille inconnue (ex. sortie d'ffmpeg), envoyé au fil de l'eau.
+
+    L'empreinte n'est connue qu'à la fin : le flux est envoyé sous une clé provisoire, puis
+    supprimé si le même contenu était déjà stocké (seule une référence est alors ajoutée).
+    """
+    digest = hashlib.sha256()
+    size = 0
+
+    async def hashed_chunks():
+        nonlocal size
+        async for chunk in chunks:
+            digest.update(chunk)
+            size += len(chunk)
+            yield chunk
+
+    backend = storage_service.get_storage_backend()
+    content_type = mimetypes.guess_type(filename)[0]
+    key = f"media/incoming/{uuid.uuid4().hex}{os.path.splitext(filename)[1].lower()[:10]}"
+    url = await backend.upload_stream(hashed_chunks(), key, content_type)
+    sha256 = digest.hexdigest()
+
+    media_object = _add_reference(db, sha256) or _register(db, sha256, key, url, size, content_type)
+    if media_object is None:
+        media_object = _add_reference(db, sha256)
+    if media_object.key != key:
+        logger.info(f"Contenu déjà stocké, copie provisoire supprimée: {media_object}")
+        await backend.delete(key)
+    if commit:
+        db.commit()
+    return media_object
+
+
+def acquire_media(db: Session, url: str, commit: bool = True) -> Optional[MediaObject]:
+    """Ajoute une référence à un média déjà stocké (ex. Pod doublon réutilisant l'audio d'origine)."""
+    media_object = get_media_object_by_url(db, url)
+    if media_object is None:
+        return None
+    media_object = _add_reference(db, media_object.sha256)
+    if commit:
+        db.commit()
+    return media_object
+
+
+def release_media(db: Session, url: Optional[str]) -> bool:
+    """
+    Retire une référence au média situé à `url`, sans attendre le stockage : l'objet devenu
+    inutilisé est supprimé plus tard par media_gc_service (après un délai de grâce).
+    Retourne True s'il n'a plus de référence. Les URLs inconnues (médias antérieurs) sont ignorées.
+    """
+    if not url:
+        return False
+    media_object = get_media_object_by_url(db, url)
+    if media_object is None:
+        logger.info(f"Média hors du stockage adressé par contenu, conservé: {url}")
+        return False
+
+    db.query(MediaObject).filter(MediaObject.sha256 == media_object.sha256, MediaObject.ref_count > 0).update(
+        {MediaObject.ref_count: MediaObject.ref_count - 1}, synchronize_session=False
+    )
+    db.commit()
+    db.refresh(media_object)
+    return media_object.ref_count == 0
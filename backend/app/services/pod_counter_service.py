@@ -0,0 +1,281 @@
+# Compteurs d'écoutes et de likes des Pods, écrits en différé
+#
+# Un événement (écoute, like, retrait de like) ne touche pas la ligne du Pod : il incrémente un
+# tampon en mémoire (par Pod) et est ajouté au segment courant d'un journal sur disque. Toutes les
+# COUNTER_FLUSH_INTERVAL_SECONDS, le tampon est reporté en une transaction, avec un seul UPDATE
+# relatif par Pod (play_count = play_count + n) quel que soit le nombre d'événements : un Pod très
+# écouté ne devient pas un point de contention sur le verrou de sa ligne.
+#
+# Reprise après un arrêt brutal : chaque processus écrit dans ses propres segments, verrouillés
+# (flock) tant qu'il est actif. Les identifiants des segments reportés sont enregistrés
+# (counter_batches) dans la transaction des UPDATE, puis les segments sont supprimés. Au démarrage,
+# les segments non verrouillés (processus disparus) sont rejoués, sauf ceux déjà reportés.
+# Chaque ligne est transmise au système à l'écriture (pas de fsync) : un arrêt du processus ne
+# perd rien, une coupure de la machine peut perdre les dernières secondes.
+
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.counter_batch_model import CounterBatch
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou, un seul processus par répertoire de journal
+    fcntl = None
+
+logger = logging.getLogger("pod_counter_service")
+
+SEGMENT_SUFFIX = ".log"
+OPENING_SUFFIX = ".open"
+# Lots reportés dont le segment n'a pas pu être supprimé : oubliés après ce délai
+APPLIED_BATCH_RETENTION = timedelta(days=1)
+
+APPLY_COUNTS = text(
+    "UPDATE pods SET play_count = play_count + :plays, like_count = like_count + :likes WHERE id = :pod_id"
+)
+
+
+def _lock(file, blocking: bool = True) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        return True
+    except BlockingIOError:
+        return False
+
+
+class JournalSegment:
+    """Segment du journal en ajout seul : une ligne « pod_id écoutes likes » par événement."""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.id = uuid.uuid4().hex
+        self.path = os.path.join(directory, self.id + SEGMENT_SUFFIX)
+        opening_path = self.path + OPENING_SUFFIX
+        self.file = open(opening_path, "a", encoding="ascii")
+        _lock(self.file)
+        # Visible par la reprise seulement une fois verrouillé
+        os.rename(opening_path, self.path)
+
+    def append(self, pod_id: int, plays: int, likes: int) -> None:
+        self.file.write(f"{pod_id} {plays} {likes}\n")
+        self.file.flush()
+
+    def remove(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self.file.close()
+
+
+def parse_journal(lines) -> Dict[int, List[int]]:
+    """Agrège les lignes d'un segment ; une dernière ligne tronquée (arrêt en cours d'écriture) est ignorée."""
+    counts: Dict[int, List[int]] = {}
+    for line in lines:
+        if not line.endswith("\n"):
+            continue
+        try:
+            pod_id, plays, likes = (int(value) for value in line.split())
+        except ValueError:
+            continue
+        entry = counts.setdefault(pod_id, [0, 0])
+        entry[0] += plays
+        entry[1] += likes
+    return counts
+
+
+def apply_counts(db: Session, counts: Dict[int, List[int]], batch_ids: List[str]) -> int:
+    """
+    Reporte les compteurs agrégés et enregistre les lots correspondants, dans une transaction.
+    Retourne le nombre de Pods mis à jour.
+    """
+    # Ordre des identifiants : verrous des lignes pris dans le même ordre par tous les processus
+    rows = [
+        {"pod_id": pod_id, "plays": plays, "likes": likes}
+        for pod_id, (plays, likes) in sorted(counts.items())
+        if plays or likes
+    ]
+    try:
+        if rows:
+            db.execute(APPLY_COUNTS, rows)
+        db.add_all([CounterBatch(id=batch_id) for batch_id in batch_ids])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(rows)
+
+
+def _forget_batches(db: Session, batch_ids: List[str]) -> None:
+    # Segments supprimés : leurs identifiants ne servent plus à rien
+    if batch_ids:
+        db.query(CounterBatch).filter(CounterBatch.id.in_(batch_ids)).delete(synchronize_session=False)
+        db.commit()
+
+
+class CounterBuffer:
+    """Tampon des compteurs par Pod, journalisé sur disque ; sûr entre threads."""
+
+    def __init__(self, journal_dir: Optional[str] = None):
+        self.journal_dir = journal_dir
+        self._pending: Dict[int, List[int]] = {}
+        # Segments dont les événements sont dans le tampon, le dernier étant celui en cours d'écriture
+        self._segments: List[JournalSegment] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.events = 0
+        self.flushes = 0
+        self.rows_updated = 0
+        self.replayed_segments = 0
+        self.last_flush_at: Optional[datetime] = None
+
+    def record(self, pod_id: int, plays: int = 0, likes: int = 0) -> None:
+        with self._lock:
+            entry = self._pending.setdefault(pod_id, [0, 0])
+            entry[0] += plays
+            entry[1] += likes
+            if self.journal_dir:
+                if not self._segments:
+                    self._segments.append(JournalSegment(self.journal_dir))
+                self._segments[-1].append(pod_id, plays, likes)
+            self.events += 1
+
+    def pending(self, pod_id: int) -> Tuple[int, int]:
+        """Écoutes et likes du Pod pas encore reportés en base (par ce processus)."""
+        with self._lock:
+            plays, likes = self._pending.get(pod_id, (0, 0))
+            return plays, likes
+
+    def flush(self, db: Session) -> int:
+        """Reporte le tampon en base ; retourne le nombre de Pods mis à jour."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                segments, self._segments = self._segments, []
+            if not pending:
+                return 0
+            batch_ids = [segment.id for segment in segments]
+            try:
+                updated = apply_counts(db, pending, batch_ids)
+            except Exception:
+                # Remis dans le tampon (et ses segments conservés) pour le prochain report
+                with self._lock:
+                    for pod_id, (plays, likes) in pending.items():
+                        entry = self._pending.setdefault(pod_id, [0, 0])
+                        entry[0] += plays
+                        entry[1] += likes
+                    self._segments = segments + self._segments
+                raise
+            for segment in segments:
+                segment.remove()
+            _forget_batches(db, batch_ids)
+            self.flushes += 1
+            self.rows_updated += updated
+            self.last_flush_at = datetime.utcnow()
+            return updated
+
+    def recover(self, db: Session) -> int:
+        """Rejoue les segments laissés par des processus arrêtés ; retourne leur nombre."""
+        if not self.journal_dir or not os.path.isdir(self.journal_dir):
+            return 0
+        replayed = 0
+        for name in sorted(os.listdir(self.journal_dir)):
+            path = os.path.join(self.journal_dir, name)
+            if name.endswith(SEGMENT_SUFFIX + OPENING_SUFFIX):
+                # Création interrompue avant tout événement
+                self._remove_unlocked(path)
+                continue
+            if not name.endswith(SEGMENT_SUFFIX):
+                continue
+            try:
+                file = open(path, "r", encoding="ascii")
+            except FileNotFoundError:
+                continue
+            with file:
+                # Verrouillé : segment d'un processus actif. Plus de lien : déjà reporté et supprimé
+                if not _lock(file, blocking=False) or os.fstat(file.fileno()).st_nlink == 0:
+                    continue
+                batch_id = name[:-len(SEGMENT_SUFFIX)]
+                if db.get(CounterBatch, batch_id) is None:
+                    counts = parse_journal(file)
+                    apply_counts(db, counts, [batch_id])
+                    logger.info(f"Segment de compteurs {batch_id} rejoué ({len(counts)} Pods)")
+                    replayed += 1
+                os.remove(path)
+                _forget_batches(db, [batch_id])
+        db.query(CounterBatch).filter(
+            CounterBatch.applied_at < datetime.utcnow() - APPLIED_BATCH_RETENTION
+        ).delete(synchronize_session=False)
+        db.commit()
+        self.replayed_segments += replayed
+        return replayed
+
+    @staticmethod
+    def _remove_unlocked(path: str) -> None:
+        try:
+            with open(path, "r", encoding="ascii") as file:
+                if _lock(file, blocking=False):
+                    os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            pending_pods = len(self._pending)
+        return {
+            "events": self.events,
+            "pending_pods": pending_pods,
+            "flushes": self.flushes,
+            "rows_updated": self.rows_updated,
+            "replayed_segments": self.replayed_segments,
+            "last_flush_at": self.last_flush_at.isoformat() if self.last_flush_at else None
+        }
+
+
+counter_buffer = CounterBuffer(journal_dir=settings.COUNTER_JOURNAL_DIR or None)
+
+
+def flush_counters() -> int:
+    db = SessionLocal()
+    try:
+        return counter_buffer.flush(db)
+    finally:
+        db.close()
+
+
+def recover_counters() -> int:
+    db = SessionLocal()
+    try:
+        return counter_buffer.recover(db)
+    finally:
+        db.close()
+
+
+async def counter_flush_loop() -> None:
+    """Reprise du journal puis reports périodiques (tâche lancée au démarrage de l'application)."""
+    try:
+        await asyncio.to_thread(recover_counters)
+    except Exception as e:
+        logger.error(f"Erreur pendant la reprise du journal des compteurs: {str(e)}", exc_info=True)
+    while True:
+        await asyncio.sleep(settings.COUNTER_FLUSH_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(flush_counters)
+        except Exception as e:
+            logger.error(f"Erreur pendant le report des compteurs: {str(e)}", exc_info=True)
+
+
+def get_counter_metrics() -> dict:
+    return counter_buffer.get_metrics()
@@ -0,0 +1,205 @@
+# Recherche plein texte dans les Pods (titre, description, transcription)
+#
+# L'index est maintenu par la base elle-même, à chaque écriture d'un Pod (création, modification,
+# transcription), quel que soit le chemin de code :
+# - SQLite : table virtuelle FTS5 `pods_fts` (contenu externe, lu dans `pods`) et déclencheurs ;
+# - PostgreSQL : colonne générée `pods.search_vector` (tsvector pondéré) et index GIN.
+# Les résultats sont classés par pertinence (bm25 / ts_rank_cd, le titre pesant plus que la
+# description, elle-même plus que la transcription) avec un extrait surligné. Sur un autre
+# moteur, la recherche se rabat sur LIKE.
+
+import html
+import logging
+import re
+from typing import List, Optional
+
+from sqlalchemy import column, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..config import settings
+from ..models.pod_model import Pod
+
+logger = logging.getLogger("pod_search_service")
+
+# Délimiteurs internes du surlignage, remplacés par <mark> après échappement HTML de l'extrait
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+SNIPPET_TOKENS = 16
+
+SQLITE_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS pods_fts USING fts5(
+        title, description, transcription,
+        content='pods', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pods_fts_insert AFTER INSERT ON pods BEGIN
+        INSERT INTO pods_fts(rowid, title, description, transcription)
+        VALUES (new.id, new.title, new.description, new.transcription);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pods_fts_delete AFTER DELETE ON pods BEGIN
+        INSERT INTO pods_fts(pods_fts, rowid, title, description, transcription)
+        VALUES ('delete', old.id, old.title, old.description, old.transcription);
+    END
+    """,
+    # Seules les colonnes indexées déclenchent une mise à jour (pas l'état d'ingestion, etc.)
+    """
+    CREATE TRIGGER IF NOT EXISTS pods_fts_update AFTER UPDATE OF title, description, transcription ON pods BEGIN
+        INSERT INTO pods_fts(pods_fts, rowid, title, description, transcription)
+        VALUES ('delete', old.id, old.title, old.description, old.transcription);
+        INSERT INTO pods_fts(rowid, title, description, transcription)
+        VALUES (new.id, new.title, new.description, new.transcription);
+    END
+    """
+]
+
+
+def _text_config() -> str:
+    # Nom de configuration PostgreSQL (ex. "french") inséré dans le DDL : identifiant simple seulement
+    config = settings.SEARCH_TEXT_CONFIG
+    if not re.fullmatch(r"[a-z_]+", config):
+        raise ValueError(f"SEARCH_TEXT_CONFIG invalide: {config}")
+    return config
+
+
+def _postgres_schema() -> List[str]:
+    config = _text_config()
+    return [
+        f"""
+        ALTER TABLE pods ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('{config}'::regconfig, coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('{config}'::regconfig, coalesce(description, '')), 'B') ||
+            setweight(to_tsvector('{config}'::regconfig, coalesce(transcription, '')), 'C')
+        ) STORED
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_pods_search_vector ON pods USING GIN (search_vector)"
+    ]
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """Crée l'index plein texte s'il n'existe pas (appelé au démarrage, après create_all)."""
+    dialect = engine.dialect.name
+    with engine.begin() as connection:
+        if dialect == "sqlite":
+            created = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pods_fts'")
+            ).first() is None
+            for statement in SQLITE_SCHEMA:
+                connection.execute(text(statement))
+            if created:
+                # Indexation des Pods existants
+                connection.execute(text("INSERT INTO pods_fts(pods_fts) VALUES ('rebuild')"))
+                logger.info("Index plein texte FTS5 des Pods créé")
+        elif dialect == "postgresql":
+            for statement in _postgres_schema():
+                connection.execute(text(statement))
+        else:
+            logger.warning(f"Recherche plein texte non disponible sur {dialect} : recherche par LIKE")
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Requête FTS5 à partir d'une saisie libre : chaque mot est cité (la syntaxe FTS5 de
+    l'utilisateur n'est pas interprétée), tous doivent être présents, le dernier en préfixe
+    (recherche pendant la frappe).
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+    quoted = [f'"{word}"' for word in words]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def format_snippet(snippet: Optional[str]) -> Optional[str]:
+    """Échappe l'extrait et surligne les termes trouvés avec <mark>."""
+    if not snippet:
+        return None
+    escaped = html.escape(snippet)
+    return escaped.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_END, "</mark>")
+
+
+def search_filter(db: Session, query: str) -> ColumnElement:
+    """Condition « le Pod correspond à `query` », appuyée sur l'index (pour filtrer une liste)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        match_query = build_match_query(query)
+        if match_query is None:
+            return Pod.id.is_(None)
+        return Pod.id.in_(
+            text("SELECT rowid FROM pods_fts WHERE pods_fts MATCH :match_query")
+            .bindparams(match_query=match_query)
+            .columns(column("rowid"))
+        )
+    if dialect == "postgresql":
+        return text("pods.search_vector @@ websearch_to_tsquery(CAST(:config AS regconfig), :query)").bindparams(
+            config=_text_config(), query=query
+        )
+    pattern = f"%{query}%"
+    return or_(Pod.title.ilike(pattern), Pod.description.ilike(pattern), Pod.transcription.ilike(pattern))
+
+
+def search_pods(db: Session, query: str, limit: int = 20, offset: int = 0) -> List[dict]:
+    """
+    Pods correspondant à `query`, du plus pertinent au moins pertinent.
+    Retourne des dictionnaires {"pod", "rank", "snippet"} (extrait HTML surligné).
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        match_query = build_match_query(query)
+        if match_query is None:
+            return []
+        # bm25 : plus petit = plus pertinent ; poids titre 10, description 4, transcription 1
+        rows = db.execute(
+            text(
+                """
+                SELECT rowid AS pod_id,
+                       -bm25(pods_fts, 10.0, 4.0, 1.0) AS rank,
+                       snippet(pods_fts, -1, :start, :end, '…', :tokens) AS snippet
+                FROM pods_fts
+                WHERE pods_fts MATCH :match_query
+                ORDER BY bm25(pods_fts, 10.0, 4.0, 1.0)
+                LIMIT :limit OFFSET :offset
+                """
+            ),
+            {"match_query": match_query, "start": HIGHLIGHT_START, "end": HIGHLIGHT_END,
+             "tokens": SNIPPET_TOKENS, "limit": limit, "offset": offset}
+        ).all()
+    elif dialect == "postgresql":
+        # L'extrait (ts_headline, coûteux) n'est calculé que pour la page retenue
+        rows = db.execute(
+            text(
+                """
+                SELECT page.id AS pod_id, page.rank,
+                       ts_headline(CAST(:config AS regconfig),
+                                   coalesce(pods.transcription, pods.description, pods.title),
+                                   page.tsquery, :headline_options) AS snippet
+                FROM (
+                    SELECT id, ts_rank_cd(search_vector, tsquery) AS rank, tsquery
+                    FROM pods, websearch_to_tsquery(CAST(:config AS regconfig), :query) AS tsquery
+                    WHERE search_vector @@ tsquery
+                    ORDER BY rank DESC
+                    LIMIT :limit OFFSET :offset
+                ) AS page
+                JOIN pods ON pods.id = page.id
+                ORDER BY page.rank DESC
+                """
+            ),
+            {"config": _text_config(), "query": query, "limit": limit, "offset": offset,
+             "headline_options": f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords={SNIPPET_TOKENS * 2}, MinWords={SNIPPET_TOKENS // 2}"}
+        ).all()
+    else:
+        pods = db.query(Pod).filter(search_filter(db, query)).order_by(Pod.created_at.desc()).offset(offset).limit(limit).all()
+        return [{"pod": pod, "rank": 0.0, "snippet": None} for pod in pods]
+
+    pods = {pod.id: pod for pod in db.query(Pod).filter(Pod.id.in_([row.pod_id for row in rows])).all()}
+    return [
+        {"pod": pods[row.pod_id], "rank": float(row.rank), "snippet": format_snippet(row.snippet)}
+        for row in rows
+        if row.pod_id in pods
+    ]
@@ -1,30 +1,56 @@
 # Fonctions CRUD (Create, Read, Update, Delete) pour le modèle Pod
 
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
-from ..models import pod_model
-from ..schemas import pod_schema
+from ..models import pod_like_model, pod_model
+from ..utils.pagination import paginate
+from . import pod_counter_service, pod_search_service, tag_service
 
 def get_pod(db: Session, pod_id: int) -> Optional[pod_model.Pod]:
     return db.query(pod_model.Pod).filter(pod_model.Pod.id == pod_id).first()
 
 def get_pods_by_owner(db: Session, owner_id: int, skip: int = 0, limit: int = 100) -> List[pod_model.Pod]:
-    return db.query(pod_model.Pod).filter(pod_model.Pod.owner_id == owner_id).offset(skip).limit(limit).all()
+    return get_pods_page(db, limit=limit, skip=skip, owner_id=owner_id)[0]
 
 def get_all_pods(db: Session, skip: int = 0, limit: int = 100) -> List[pod_model.Pod]:
-    return db.query(pod_model.Pod).offset(skip).limit(limit).all()
+    return get_pods_page(db, limit=limit, skip=skip)[0]
+
+def get_pods_page(
+    db: Session,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    owner_id: Optional[int] = None,
+    search: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    match_all_tags: bool = False
+) -> Tuple[List[pod_model.Pod], Optional[str]]:
+    """
+    Pods du plus récent au plus ancien et curseur de la page suivante (voir utils.pagination).
+    `tags` retient les Pods portant au moins un des tags, ou tous si `match_all_tags`.
+    """
+    query = db.query(pod_model.Pod)
+    if owner_id is not None:
+        query = query.filter(pod_model.Pod.owner_id == owner_id)
+    if search:
+        query = query.filter(pod_search_service.search_filter(db, search))
+    if tags:
+        query = query.filter(tag_service.tag_filter(db, tags, match_all=match_all_tags))
+    return paginate(query, pod_model.Pod, limit, cursor=cursor, skip=skip)
 
 def create_pod(db: Session, title: str, description: Optional[str], tags: List[str], audio_url: str, owner_id: int) -> pod_model.Pod:
     # La logique de l'audio_file_url est gérée dans la route maintenant
     db_pod = pod_model.Pod(
         title=title,
         description=description,
-        tags=tags,
         audio_file_url=audio_url,
         owner_id=owner_id
     )
     db.add(db_pod)
+    tag_service.set_pod_tags(db, db_pod, tags)
     db.commit()
     db.refresh(db_pod)
     return db_pod
@@ -35,7 +61,11 @@ def update_pod(db: Session, pod_id: int, update_data: dict) -> Optional[pod_mode
         return None
 
     for key, value in update_data.items():
-        setattr(db_pod, key, value)
+        if key == "tags":
+            # Tags normalisés : compteurs mis à jour par tag_service
+            tag_service.set_pod_tags(db, db_pod, value)
+        else:
+            setattr(db_pod, key, value)
 
     db.commit()
     db.refresh(db_pod)
@@ -54,16 +84,68 @@ def update_pod_transcription(db: Session, pod_id: int, transcription: str) -> Op
     db.refresh(db_pod)
     return db_pod
 
+def get_media_urls(db_pod: pod_model.Pod) -> List[str]:
+    """URLs des médias stockés référencés par le Pod (une référence chacune, voir media_store_service)."""
+    urls = [db_pod.audio_file_url, db_pod.preview_url]
+    urls += [rendition.get("url") for rendition in db_pod.audio_renditions or []]
+    return [url for url in urls if url]
+
 def delete_pod(db: Session, pod_id: int) -> Optional[pod_model.Pod]:
     db_pod = get_pod(db, pod_id)
     if not db_pod:
         return None
-    # La suppression du fichier audio associé est gérée dans la route
+    # Les médias associés sont libérés par la route (get_media_urls) puis supprimés du stockage
+    # en arrière-plan par media_gc_service
+    tag_service.clear_pod_tags(db, db_pod)
     db.delete(db_pod)
     db.commit()
     # Retourner les données du pod supprimé peut être utile pour la confirmation ou le logging
     # Mais comme il est supprimé, on ne peut plus le rafraîchir. On retourne l'objet avant suppression.
     return db_pod
 
+def _get_pod_counts(db: Session, pod_id: int):
+    # Compteurs seuls (pas la ligne complète) ; 404 si le Pod n'existe pas
+    counts = db.query(pod_model.Pod.play_count, pod_model.Pod.like_count).filter(pod_model.Pod.id == pod_id).first()
+    if counts is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pod non trouvé")
+    return counts
+
+def record_play(db: Session, pod_id: int, user_id: int) -> dict:
+    """
+    Enregistre une écoute, reportée en base par lots (voir pod_counter_service).
+    Le total inclut les écoutes pas encore reportées par ce processus.
+    """
+    counts = _get_pod_counts(db, pod_id)
+    pod_counter_service.counter_buffer.record(pod_id, plays=1)
+    pending_plays, _ = pod_counter_service.counter_buffer.pending(pod_id)
+    return {"total_plays": counts.play_count + pending_plays}
+
+def toggle_like(db: Session, pod_id: int, user_id: int) -> dict:
+    """
+    Ajoute ou retire le like de l'utilisateur. Le like lui-même est écrit tout de suite
+    (ligne (user_id, pod_id) de pod_likes), le compteur du Pod par lots.
+    """
+    counts = _get_pod_counts(db, pod_id)
+    removed = db.query(pod_like_model.PodLike).filter(
+        pod_like_model.PodLike.user_id == user_id,
+        pod_like_model.PodLike.pod_id == pod_id
+    ).delete(synchronize_session=False)
+    if removed:
+        db.commit()
+        liked, delta = False, -1
+    else:
+        db.add(pod_like_model.PodLike(user_id=user_id, pod_id=pod_id))
+        try:
+            db.commit()
+            liked, delta = True, 1
+        except IntegrityError:
+            # Like simultané du même utilisateur, déjà compté
+            db.rollback()
+            liked, delta = True, 0
+    if delta:
+        pod_counter_service.counter_buffer.record(pod_id, likes=delta)
+    _, pending_likes = pod_counter_service.counter_buffer.pending(pod_id)
+    return {"liked": liked, "total_likes": max(counts.like_count + pending_likes, 0)}
+
 # Alias pour compatibilité
 get_pods = get_all_pods
@@ -0,0 +1,166 @@
+# Déclinaisons de débit (renditions) de l'audio d'un Pod et extrait de prévisualisation
+#
+# À l'ingestion, une seule commande ffmpeg décode la piste une fois et produit plusieurs copies
+# Opus à débit croissant, plus un extrait court. À la lecture, la déclinaison est choisie d'après
+# les indications du client (Save-Data, Downlink, ECT) : un auditeur en 3G reçoit 32 kbit/s
+# au lieu de la copie d'écoute complète.
+
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from . import audio_service, media_store_service
+from .ffmpeg_service import run_ffmpeg
+
+logger = logging.getLogger("rendition_service")
+
+PREVIEW_NAME = "preview"
+
+# Débit maximal (kbit/s) raisonnable selon le type de connexion effectif annoncé (en-tête ECT)
+ECT_MAX_BITRATES = {"slow-2g": 32, "2g": 32, "3g": 64, "4g": None}
+
+# Part du débit descendant annoncé (en-tête Downlink) réservée à l'audio
+DOWNLINK_AUDIO_SHARE = 0.5
+
+
+def _bitrate_kbps(bitrate: str) -> int:
+    return int(bitrate.lower().rstrip("k"))
+
+
+def get_rendition_profiles() -> List[dict]:
+    """Profils d'encodage de l'échelle de débits, du plus léger au plus lourd."""
+    profiles = []
+    for bitrate in sorted(
+        (value.strip() for value in settings.RENDITION_BITRATES.split(",") if value.strip()),
+        key=_bitrate_kbps
+    ):
+        kbps = _bitrate_kbps(bitrate)
+        profiles.append({
+            "name": f"{settings.RENDITION_CODEC.replace('lib', '')}-{kbps}k",
+            "codec": settings.RENDITION_CODEC,
+            "format": settings.RENDITION_FORMAT,
+            "bitrate": bitrate,
+            "sample_rate": 48000 if settings.RENDITION_CODEC == "libopus" else None,
+            # Mono en dessous de 64 kbit/s : la parole n'y perd rien et le débit sert à la qualité
+            "channels": 1 if kbps < 64 else 2,
+            "kbps": kbps
+        })
+    return profiles
+
+
+def get_preview_profile() -> dict:
+    profile = audio_service.get_audio_profile("playback")
+    return {**profile, "name": PREVIEW_NAME}
+
+
+def _output_args(profile: dict) -> List[str]:
+    args = audio_service.profile_ffmpeg_args(profile)
+    if profile["codec"] == "libopus":
+        # Les déclinaisons d'écoute visent la musique autant que la parole (pas de mode "voip")
+        index = args.index("-application")
+        args[index + 1] = "audio"
+    return args
+
+
+async def transcode_renditions(source_path: str) -> Dict[str, str]:
+    """
+    Produit en une seule passe ffmpeg toutes les déclinaisons et l'extrait de prévisualisation.
+    Retourne {nom: chemin du fichier temporaire}.
+    """
+    outputs = {}
+    command = ["ffmpeg", "-y", "-i", source_path]
+    try:
+        for profile in get_rendition_profiles() + [get_preview_profile()]:
+            output_file = tempfile.NamedTemporaryFile(delete=False, suffix=audio_service.profile_suffix(profile))
+            output_file.close()
+            outputs[profile["name"]] = output_file.name
+            command += ["-map", "a:0"]
+            if profile["name"] == PREVIEW_NAME:
+                command += ["-ss", str(settings.PREVIEW_START_SECONDS), "-t", str(settings.PREVIEW_SECONDS)]
+            command += _output_args(profile) + [output_file.name]
+        await run_ffmpeg(command)
+        return outputs
+    except BaseException:
+        for path in outputs.values():
+            if os.path.exists(path):
+                os.unlink(path)
+        raise
+
+
+async def create_pod_renditions(db: Session, source_path: str, audio_filename: str) -> dict:
+    """
+    Encode et stocke les déclinaisons d'un Pod (stockage adressé par contenu).
+    Retourne {"renditions": [{name, codec, bitrate, url}, ...], "preview_url": str}.
+    """
+    paths = await transcode_renditions(source_path)
+    base_name = os.path.splitext(audio_filename)[0]
+    renditions = []
+    try:
+        for profile in get_rendition_profiles():
+            path = paths[profile["name"]]
+            media_object = await media_store_service.store_media_file(
+                db, path, filename=f"{base_name}.{profile['name']}{os.path.splitext(path)[1]}"
+            )
+            renditions.append({"name": profile["name"], "codec": profile["codec"], "bitrate": profile["kbps"], "url": media_object.url})
+
+        preview_path = paths[PREVIEW_NAME]
+        preview = await media_store_service.store_media_file(
+            db, preview_path, filename=f"{base_name}.{PREVIEW_NAME}{os.path.splitext(preview_path)[1]}"
+        )
+        return {"renditions": renditions, "preview_url": preview.url}
+    except Exception:
+        # Déclinaisons déjà stockées : références retirées, une nouvelle tentative les ajoutera de nouveau
+        db.rollback()
+        for rendition in renditions:
+            media_store_service.release_media(db, rendition["url"])
+        raise
+    finally:
+        for path in paths.values():
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def select_rendition(
+    renditions: Optional[List[dict]],
+    save_data: bool = False,
+    downlink: Optional[float] = None,
+    ect: Optional[str] = None,
+    quality: Optional[str] = None
+) -> Optional[dict]:
+    """
+    Choisit la déclinaison à servir d'après les indications du client.
+
+    - `quality` ("low", "medium", "high") force un choix explicite, prioritaire sur tout le reste.
+    - Sinon, `save_data` (Save-Data: on) sert la déclinaison la plus légère.
+    - Sinon, la plus lourde dont le débit tient dans la part audio de `downlink` (Mbit/s)
+      et dans le plafond associé à `ect`. Sans indication, la plus lourde.
+    Retourne None s'il n'y a aucune déclinaison (la copie d'écoute d'origine est alors servie).
+    """
+    if not renditions:
+        return None
+    ladder = sorted(renditions, key=lambda rendition: rendition["bitrate"])
+
+    if quality == "low":
+        return ladder[0]
+    if quality == "medium":
+        return ladder[len(ladder) // 2]
+    if quality == "high":
+        return ladder[-1]
+    if save_data:
+        return ladder[0]
+
+    budgets = []
+    if downlink is not None and downlink > 0:
+        budgets.append(downlink * 1000 * DOWNLINK_AUDIO_SHARE)
+    if ect in ECT_MAX_BITRATES and ECT_MAX_BITRATES[ect] is not None:
+        budgets.append(ECT_MAX_BITRATES[ect])
+    if not budgets:
+        return ladder[-1]
+
+    budget = min(budgets)
+    fitting = [rendition for rendition in ladder if rendition["bitrate"] <= budget]
+    return fitting[-1] if fitting else ladder[0]
@@ -1,27 +1,577 @@
+# Stockage des fichiers audio : système de fichiers local ou service compatible S3 (S3, MinIO, Supabase)
+#
+# Le backend est choisi par STORAGE_BACKEND. Les fichiers sont envoyés en flux depuis le disque :
+# au-delà de STORAGE_MULTIPART_PART_SIZE, l'envoi S3 se fait en plusieurs parties et une seule
+# partie est en mémoire à la fois. Les requêtes HTTP partagent un client httpx (connexions réutilisées).
+
+import abc
+import asyncio
+import datetime
+import hashlib
+import hmac
+import logging
+import mimetypes
 import os
-import tempfile
-from typing import Optional
+import shutil
+import uuid
+from typing import AsyncIterator, BinaryIO, Optional
+from urllib.parse import quote, unquote, urlparse
+from xml.etree import ElementTree
+
+import httpx
 from fastapi import UploadFile
 
+from ..config import settings
+from . import upload_spool_service
+
+logger = logging.getLogger("storage_service")
+
+# Empreinte déclarée pour un corps non signé (les parties sont envoyées en flux)
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+
+
+class StorageError(Exception):
+    """Échec d'une opération sur le service de stockage."""
+
+    def __init__(self, operation: str, key: str, status_code: Optional[int] = None, detail: str = ""):
+        self.operation = operation
+        self.key = key
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(f"{operation} {key} a échoué ({status_code}): {detail[:200]}")
+
+
+class StoredObject:
+    """Objet listé dans le stockage (voir `StorageBackend.list_objects`)."""
+
+    def __init__(self, key: str, size: int, last_modified: datetime.datetime):
+        self.key = key
+        self.size = size
+        self.last_modified = last_modified  # UTC, sans fuseau
+
+    def __repr__(self):
+        return f"<StoredObject(key='{self.key}', size={self.size})>"
+
+
+class StorageBackend(abc.ABC):
+    """
+    Interface commune des backends de stockage. Les objets sont désignés par une clé
+    (ex. "audio/12/3f2a_episode.mp3") et exposés par une URL publique.
+    """
+
+    public_base_url: str = ""
+    # Le client peut-il envoyer/télécharger directement via une URL signée (sans passer par l'API) ?
+    supports_presigned_urls: bool = False
+
+    @abc.abstractmethod
+    async def upload_fileobj(self, file_obj: BinaryIO, key: str, content_type: Optional[str] = None) -> str:
+        """Envoie le contenu d'un fichier ouvert (lu par blocs) et retourne l'URL publique."""
+
+    @abc.abstractmethod
+    async def upload_stream(self, chunks: AsyncIterator[bytes], key: str, content_type: Optional[str] = None) -> str:
+        """Envoie un flux de taille inconnue et retourne l'URL publique."""
+
+    @abc.abstractmethod
+    async def delete(self, key: str) -> None:
+        """Supprime un objet ; un objet absent n'est pas une erreur."""
+
+    @abc.abstractmethod
+    async def stat(self, key: str) -> Optional[int]:
+        """Taille de l'objet en octets, ou None s'il n'existe pas."""
+
+    @abc.abstractmethod
+    async def download_to_path(self, key: str, path: str) -> None:
+        """Recopie un objet dans un fichier local, par blocs."""
+
+    @abc.abstractmethod
+    def presign_url(self, method: str, key: str, expires_in: int, content_type: Optional[str] = None) -> str:
+        """URL signée d'envoi ou de téléchargement direct (à vérifier avant : `supports_presigned_urls`)."""
+
+    @abc.abstractmethod
+    def list_objects(self, prefix: str = "") -> AsyncIterator[StoredObject]:
+        """Parcourt les objets dont la clé commence par `prefix`."""
+
+    async def aclose(self) -> None:
+        return None
+
+    def url_for(self, key: str) -> str:
+        return f"{self.public_base_url.rstrip('/')}/{quote(key)}"
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        """Clé d'un objet à partir de son URL publique (None si l'URL n'appartient pas à ce stockage)."""
+        prefix = self.public_base_url.rstrip("/") + "/"
+        if not url or not url.startswith(prefix):
+            return None
+        return unquote(urlparse(url).path[len(urlparse(prefix).path):])
+
+
+class LocalStorageBackend(StorageBackend):
+    """Fichiers écrits sous `root` et servis par l'application (montage /static)."""
+
+    def __init__(self, root: str, public_base_url: str, chunk_size: int = 1024 * 1024):
+        self.root = os.path.abspath(root)
+        self.public_base_url = public_base_url
+        self.chunk_size = chunk_size
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise StorageError("resolve", key, detail="clé hors du répertoire de stockage")
+        return path
+
+    def _temp_path(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return f"{path}.{uuid.uuid4().hex}.tmp"
+
+    async def upload_fileobj(self, file_obj: BinaryIO, key: str, content_type: Optional[str] = None) -> str:
+        path = self._path(key)
+        temp_path = self._temp_path(path)
+
+        def copy():
+            with open(temp_path, "wb") as destination:
+                shutil.copyfileobj(file_obj, destination, self.chunk_size)
+            os.replace(temp_path, path)
+
+        try:
+            await asyncio.to_thread(copy)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        return self.url_for(key)
+
+    async def upload_stream(self, chunks: AsyncIterator[bytes], key: str, content_type: Optional[str] = None) -> str:
+        path = self._path(key)
+        temp_path = self._temp_path(path)
+        destination = None
+        try:
+            destination = await asyncio.to_thread(open, temp_path, "wb")
+            async for chunk in chunks:
+                await asyncio.to_thread(destination.write, chunk)
+            await asyncio.to_thread(destination.close)
+            await asyncio.to_thread(os.replace, temp_path, path)
+        finally:
+            if destination is not None and not destination.closed:
+                destination.close()
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        return self.url_for(key)
+
+    async def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    async def stat(self, key: str) -> Optional[int]:
+        try:
+            return os.path.getsize(self._path(key))
+        except FileNotFoundError:
+            return None
+
+    async def download_to_path(self, key: str, path: str) -> None:
+        await asyncio.to_thread(shutil.copyfile, self._path(key), path)
+
+    def presign_url(self, method: str, key: str, expires_in: int, content_type: Optional[str] = None) -> str:
+        raise RuntimeError("URLs signées indisponibles avec le stockage local (supports_presigned_urls est faux)")
+
+    async def list_objects(self, prefix: str = "") -> AsyncIterator[StoredObject]:
+        def scan() -> list:
+            objects = []
+            for directory, _, filenames in os.walk(self.root):
+                for filename in filenames:
+                    path = os.path.join(directory, filename)
+                    key = os.path.relpath(path, self.root).replace(os.sep, "/")
+                    # Fichiers temporaires d'envois en cours (voir _temp_path)
+                    if not key.startswith(prefix) or key.endswith(".tmp"):
+                        continue
+                    try:
+                        stat_result = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    modified = datetime.datetime.utcfromtimestamp(stat_result.st_mtime)
+                    objects.append(StoredObject(key, stat_result.st_size, modified))
+            return objects
+
+        for stored_object in await asyncio.to_thread(scan):
+            yield stored_object
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Service compatible S3 (AWS S3, MinIO, point d'accès S3 de Supabase Storage), adressé en
+    « path-style » (`{endpoint}/{bucket}/{key}`) et authentifié par signature AWS Signature V4.
+    """
+
+    supports_presigned_urls = True
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        public_base_url: Optional[str] = None,
+        part_size: int = 8 * 1024 * 1024,
+        max_connections: int = 20,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.public_base_url = public_base_url or f"{self.endpoint_url}/{bucket}"
+        # S3 impose au moins 5 Mo par partie, sauf pour la dernière
+        self.part_size = max(part_size, 5 * 1024 * 1024)
+        self.max_connections = max_connections
+        self._client = client
+
+    def _client_or_default(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0, write=120.0, read=120.0),
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # --- Signature V4 ---
+    def _object_url(self, key: str) -> str:
+        return f"{self.endpoint_url}/{self.bucket}/{quote(key)}"
+
+    def _signature(self, method: str, url: httpx.URL, signed: dict, payload_hash: str, amz_date: str, query: dict = None) -> tuple:
+        """Calcule la signature V4 ; retourne (portée, en-têtes signés, signature)."""
+        signed_header_names = ";".join(sorted(signed))
+        canonical_headers = "".join(f"{name}:{signed[name]}\n" for name in sorted(signed))
+
+        query_pairs = sorted(
+            (quote(name, safe="-_.~"), quote(value, safe="-_.~"))
+            for name, value in list(url.params.multi_items()) + list((query or {}).items())
+        )
+        canonical_query = "&".join(f"{name}={value}" for name, value in query_pairs)
+        canonical_request = "\n".join([
+            method,
+            url.raw_path.split(b"?")[0].decode("ascii") or "/",
+            canonical_query,
+            canonical_headers,
+            signed_header_names,
+            payload_hash
+        ])
+
+        date_stamp = amz_date[:8]
+        scope = f"{date_stamp}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()
+        ])
+        signing_key = f"AWS4{self.secret_key}".encode("utf-8")
+        for component in (date_stamp, self.region, "s3", "aws4_request"):
+            signing_key = hmac.new(signing_key, component.encode("utf-8"), hashlib.sha256).digest()
+        signature = hmac.new(signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+        return scope, signed_header_names, signature
+
+    def sign_headers(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[dict] = None,
+        payload_hash: str = UNSIGNED_PAYLOAD,
+        now: Optional[datetime.datetime] = None
+    ) -> dict:
+        """Retourne les en-têtes de la requête complétés de la signature (Authorization, x-amz-date, ...)."""
+        amz_date = (now or datetime.datetime.utcnow()).strftime("%Y%m%dT%H%M%SZ")
+        parsed = httpx.URL(url)
+
+        signed = {key.lower(): str(value).strip() for key, value in (headers or {}).items()}
+        signed["host"] = parsed.netloc.decode("ascii")
+        signed["x-amz-date"] = amz_date
+        signed["x-amz-content-sha256"] = payload_hash
+        scope, signed_header_names, signature = self._signature(method, parsed, signed, payload_hash, amz_date)
+
+        signed.pop("host")
+        signed["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={signed_header_names}, Signature={signature}"
+        )
+        return signed
+
+    def presign_url(
+        self,
+        method: str,
+        key: str,
+        expires_in: int,
+        content_type: Optional[str] = None,
+        now: Optional[datetime.datetime] = None,
+        url: Optional[str] = None
+    ) -> str:
+        """
+        URL signée (paramètres X-Amz-*) utilisable sans autre authentification pendant `expires_in`
+        secondes. Pour un PUT, `content_type` est signé : le client doit envoyer exactement ce Content-Type.
+        `url` remplace l'URL « path-style » de l'objet (ex. adressage par sous-domaine du bucket).
+        """
+        amz_date = (now or datetime.datetime.utcnow()).strftime("%Y%m%dT%H%M%SZ")
+        parsed = httpx.URL(url or self._object_url(key))
+        signed = {"host": parsed.netloc.decode("ascii")}
+        if content_type:
+            signed["content-type"] = content_type
+        query = {
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": f"{self.access_key}/{amz_date[:8]}/{self.region}/s3/aws4_request",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(expires_in),
+            "X-Amz-SignedHeaders": ";".join(sorted(signed))
+        }
+        _, _, signature = self._signature(method, parsed, signed, UNSIGNED_PAYLOAD, amz_date, query)
+        query["X-Amz-Signature"] = signature
+        return str(parsed.copy_merge_params(query))
+
+    async def _request(
+        self,
+        operation: str,
+        method: str,
+        key: str,
+        params: Optional[dict] = None,
+        content: Optional[bytes] = None,
+        headers: Optional[dict] = None,
+        allowed_statuses: tuple = ()
+    ) -> httpx.Response:
+        url = str(httpx.URL(self._object_url(key), params=params))
+        request_headers = self.sign_headers(method, url, headers)
+        response = await self._client_or_default().request(method, url, content=content, headers=request_headers)
+        if response.status_code >= 300 and response.status_code not in allowed_statuses:
+            raise StorageError(operation, key, response.status_code, response.text)
+        return response
+
+    # --- Envois ---
+    async def _put_object(self, key: str, data: bytes, content_type: Optional[str]) -> str:
+        headers = {"content-type": content_type} if content_type else {}
+        await self._request("PutObject", "PUT", key, content=data, headers=headers)
+        return self.url_for(key)
+
+    async def _multipart_upload(self, first_part: bytes, parts: AsyncIterator[bytes], key: str, content_type: Optional[str]) -> str:
+        headers = {"content-type": content_type} if content_type else {}
+        response = await self._request("CreateMultipartUpload", "POST", key, params={"uploads": ""}, headers=headers)
+        upload_id = _xml_text(response.content, "UploadId")
+        etags = []
+        try:
+            part = first_part
+            while part:
+                response = await self._request(
+                    "UploadPart", "PUT", key,
+                    params={"partNumber": str(len(etags) + 1), "uploadId": upload_id},
+                    content=part
+                )
+                etags.append(response.headers["etag"])
+                part = await anext(parts, b"")
+
+            body = "<CompleteMultipartUpload>" + "".join(
+                f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+                for number, etag in enumerate(etags, start=1)
+            ) + "</CompleteMultipartUpload>"
+            response = await self._request(
+                "CompleteMultipartUpload", "POST", key,
+                params={"uploadId": upload_id},
+                content=body.encode("utf-8")
+            )
+            # Une erreur peut être signalée dans le corps d'une réponse 200
+            if b"<Error>" in response.content:
+                raise StorageError("CompleteMultipartUpload", key, response.status_code, response.text)
+        except BaseException:
+            # Sans abandon explicite, les parties déjà envoyées resteraient facturées
+            try:
+                await self._request("AbortMultipartUpload", "DELETE", key, params={"uploadId": upload_id}, allowed_statuses=(404,))
+            except Exception as e:
+                logger.warning(f"Abandon de l'envoi multipart {upload_id} impossible: {str(e)}")
+            raise
+        logger.info(f"Objet {key} envoyé en {len(etags)} parties")
+        return self.url_for(key)
+
+    async def _upload_parts(self, parts: AsyncIterator[bytes], key: str, content_type: Optional[str]) -> str:
+        first_part = await anext(parts, b"")
+        second_part = await anext(parts, b"")
+        if not second_part:
+            # Un seul envoi pour les petits fichiers
+            return await self._put_object(key, first_part, content_type)
+
+        async def remaining_parts():
+            yield second_part
+            async for part in parts:
+                yield part
+
+        return await self._multipart_upload(first_part, remaining_parts(), key, content_type)
+
+    async def upload_fileobj(self, file_obj: BinaryIO, key: str, content_type: Optional[str] = None) -> str:
+        async def read_parts():
+            while True:
+                part = await asyncio.to_thread(file_obj.read, self.part_size)
+                if not part:
+                    break
+                yield part
+
+        return await self._upload_parts(read_parts(), key, content_type)
+
+    async def upload_stream(self, chunks: AsyncIterator[bytes], key: str, content_type: Optional[str] = None) -> str:
+        async def regroup_parts():
+            part = bytearray()
+            async for chunk in chunks:
+                part.extend(chunk)
+                if len(part) >= self.part_size:
+                    yield bytes(part)
+                    part = bytearray()
+            if part:
+                yield bytes(part)
+
+        return await self._upload_parts(regroup_parts(), key, content_type)
+
+    async def delete(self, key: str) -> None:
+        await self._request("DeleteObject", "DELETE", key, allowed_statuses=(404,))
+
+    async def stat(self, key: str) -> Optional[int]:
+        response = await self._request("HeadObject", "HEAD", key, allowed_statuses=(404,))
+        if response.status_code == 404:
+            return None
+        return int(response.headers.get("content-length", 0))
+
+    async def download_to_path(self, key: str, path: str) -> None:
+        url = self._object_url(key)
+        async with self._client_or_default().stream("GET", url, headers=self.sign_headers("GET", url)) as response:
+            if response.status_code >= 300:
+                raise StorageError("GetObject", key, response.status_code, (await response.aread()).decode("utf-8", "replace"))
+            with open(path, "wb") as destination:
+                async for chunk in response.aiter_bytes(self.part_size):
+                    await asyncio.to_thread(destination.write, chunk)
+
+    async def list_objects(self, prefix: str = "") -> AsyncIterator[StoredObject]:
+        # ListObjectsV2, par pages de 1000 clés
+        continuation_token = None
+        while True:
+            params = {"list-type": "2", "prefix": prefix}
+            if continuation_token:
+                params["continuation-token"] = continuation_token
+            response = await self._request("ListObjectsV2", "GET", "", params=params)
+            root = ElementTree.fromstring(response.content)
+            for element in root:
+                if element.tag.rsplit("}", 1)[-1] != "Contents":
+                    continue
+                fields = {child.tag.rsplit("}", 1)[-1]: child.text or "" for child in element}
+                last_modified = datetime.datetime.strptime(fields["LastModified"][:19], "%Y-%m-%dT%H:%M:%S")
+                yield StoredObject(fields["Key"], int(fields.get("Size") or 0), last_modified)
+            if _xml_text(response.content, "IsTruncated") != "true":
+                break
+            continuation_token = _xml_text(response.content, "NextContinuationToken")
+
+
+def _xml_text(content: bytes, tag: str) -> str:
+    for element in ElementTree.fromstring(content).iter():
+        if element.tag.rsplit("}", 1)[-1] == tag:
+            return element.text or ""
+    raise StorageError("parse", tag, detail=content.decode("utf-8", "replace"))
+
+
+def create_storage_backend() -> StorageBackend:
+    if settings.STORAGE_BACKEND == "s3":
+        return S3StorageBackend(
+            endpoint_url=settings.STORAGE_S3_ENDPOINT_URL or f"{settings.SUPABASE_URL.rstrip('/')}/storage/v1/s3",
+            bucket=settings.BUCKET_NAME,
+            access_key=settings.STORAGE_S3_ACCESS_KEY,
+            secret_key=settings.STORAGE_S3_SECRET_KEY,
+            region=settings.STORAGE_S3_REGION,
+            public_base_url=settings.STORAGE_PUBLIC_BASE_URL,
+            part_size=settings.STORAGE_MULTIPART_PART_SIZE,
+            max_connections=settings.STORAGE_MAX_CONNECTIONS
+        )
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorageBackend(
+            root=settings.STORAGE_LOCAL_DIR,
+            public_base_url=settings.STORAGE_PUBLIC_BASE_URL or f"{settings.PUBLIC_BASE_URL.rstrip('/')}/static/media",
+            chunk_size=settings.UPLOAD_CHUNK_SIZE
+        )
+    raise ValueError(f"Backend de stockage inconnu: {settings.STORAGE_BACKEND}")
+
+
+_storage_backend: Optional[StorageBackend] = None
+
+
+def get_storage_backend() -> StorageBackend:
+    global _storage_backend
+    if _storage_backend is None:
+        _storage_backend = create_storage_backend()
+    return _storage_backend
+
+
+def audio_object_key(filename: str, user_id: int) -> str:
+    # Préfixe aléatoire : deux envois du même nom de fichier ne s'écrasent pas
+    return f"audio/{user_id}/{uuid.uuid4().hex[:12]}_{os.path.basename(filename)}"
+
+
+def _content_type(filename: str) -> Optional[str]:
+    return mimetypes.guess_type(filename)[0]
+
+
 async def upload_audio_from_file(file_content: bytes, filename: str, user_id: int) -> str:
     """
     Téléverse un fichier audio à partir de son contenu binaire et retourne l'URL
     """
-    # Cette fonction est une version simplifiée qui simule le téléversement
-    # Dans une implémentation réelle, vous utiliseriez un service de stockage comme S3, Supabase, etc.
-    
-    # Créer un chemin de fichier unique
-    unique_filename = f"{user_id}_{filename}"
-    
-    # Simuler le stockage et retourner une URL fictive
-    # Dans une implémentation réelle, vous téléverseriez le fichier et obtiendriez une URL réelle
-    audio_url = f"https://storage.example.com/audio/{unique_filename}"
-    
-    return audio_url
+    async def single_chunk():
+        yield file_content
+
+    return await get_storage_backend().upload_stream(single_chunk(), audio_object_key(filename, user_id), _content_type(filename))
+
+async def upload_audio_from_path(file_path: str, filename: str, user_id: int) -> str:
+    """
+    Téléverse un fichier audio présent sur le disque et retourne l'URL.
+    Le fichier est transmis en flux au service de stockage, sans être chargé en mémoire.
+    """
+    with open(file_path, "rb") as audio_file:
+        return await get_storage_backend().upload_fileobj(audio_file, audio_object_key(filename, user_id), _content_type(filename))
+
+async def upload_audio_stream(chunks: AsyncIterator[bytes], filename: str, user_id: int) -> str:
+    """
+    Téléverse un flux audio de taille inconnue (ex. sortie d'ffmpeg) et retourne l'URL.
+    Les blocs sont regroupés en parties de STORAGE_MULTIPART_PART_SIZE octets pour un envoi multipart.
+    """
+    return await get_storage_backend().upload_stream(chunks, audio_object_key(filename, user_id), _content_type(filename))
+
+def presign_upload_url(key: str, content_type: Optional[str]) -> str:
+    """URL signée d'envoi direct (PUT) vers le stockage, valable PRESIGNED_UPLOAD_EXPIRES_SECONDS."""
+    backend = get_storage_backend()
+    if not backend.supports_presigned_urls:
+        raise RuntimeError("URLs signées indisponibles avec ce stockage")
+    return backend.presign_url("PUT", key, settings.PRESIGNED_UPLOAD_EXPIRES_SECONDS, content_type)
+
+def presign_download_url(file_url: str) -> str:
+    """
+    URL signée de téléchargement direct (GET) d'un fichier du stockage, valable
+    PRESIGNED_DOWNLOAD_EXPIRES_SECONDS. Retourne l'URL publique si le stockage ne signe pas d'URL.
+    """
+    backend = get_storage_backend()
+    key = backend.key_from_url(file_url)
+    if key is None or not backend.supports_presigned_urls:
+        return file_url
+    return backend.presign_url("GET", key, settings.PRESIGNED_DOWNLOAD_EXPIRES_SECONDS)
+
+async def delete_file(file_url: str) -> None:
+    """
+    Supprime un fichier du stockage à partir de son URL
+    """
+    key = get_storage_backend().key_from_url(file_url)
+    if key is None:
+        # URL externe ou d'un ancien stockage : rien à supprimer ici
+        logger.info(f"URL hors du stockage configuré, non supprimée: {file_url}")
+        return None
+    await get_storage_backend().delete(key)
 
 async def upload_audio(file: UploadFile, user_id: int) -> str:
     """
     Téléverse un fichier audio et retourne l'URL
     """
-    content = await file.read()
-    return await upload_audio_from_file(content, file.filename, user_id)
+    # Recopie sur disque par blocs avec limite de taille, puis envoi depuis le fichier
+    with await upload_spool_service.spool_upload_file(file) as spooled_audio:
+        return await upload_audio_from_path(spooled_audio.path, file.filename, user_id)
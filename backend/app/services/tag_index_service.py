@@ -0,0 +1,130 @@
+# Index en mémoire des tags pour l'autocomplétion (GET /tags/suggest)
+#
+# Les noms des tags utilisés sont gardés triés dans une liste : les tags commençant par un
+# préfixe forment une tranche contiguë, trouvée par deux recherches dichotomiques (bisect), puis
+# classée par nombre de Pods. Aucune requête SQL par frappe : l'index est chargé une fois, puis
+# tenu à jour à chaque validation de transaction qui modifie des tags (écarts enregistrés par
+# tag_service dans la session), et rechargé périodiquement pour suivre les écritures des autres
+# processus.
+
+import bisect
+import heapq
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.tag_model import Tag
+from .tag_service import PENDING_TAG_COUNTS, TAG_COUNTS_RELOAD, normalize_tag
+
+logger = logging.getLogger("tag_index_service")
+
+# Résultats mis en cache pour les préfixes courts (tranches les plus larges), vidé à chaque écriture
+CACHED_PREFIX_LENGTH = 2
+
+
+class TagIndex:
+    """Noms de tags triés et nombre de Pods de chacun ; sûr entre threads."""
+
+    def __init__(self, refresh_seconds: Optional[float] = None):
+        self.refresh_seconds = settings.TAG_INDEX_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        self._names: List[str] = []
+        self._counts: Dict[str, int] = {}
+        self._cache: Dict[tuple, List[dict]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.updates = 0
+
+    def load(self, db: Session) -> None:
+        """(Re)charge l'index depuis la table des tags."""
+        counts = {name: count for name, count in db.query(Tag.name, Tag.pod_count).filter(Tag.pod_count > 0)}
+        names = sorted(counts)
+        with self._lock:
+            self._names, self._counts, self._cache = names, counts, {}
+            self._loaded_at = time.monotonic()
+            self.loads += 1
+        logger.debug(f"Index des tags chargé : {len(names)} tags")
+
+    def invalidate(self) -> None:
+        """Force un rechargement à la prochaine suggestion."""
+        with self._lock:
+            self._loaded_at = None
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds
+
+    def apply(self, deltas: Dict[str, int]) -> None:
+        """Reporte des variations de nombre de Pods par tag (après validation en base)."""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            for name, delta in deltas.items():
+                count = self._counts.get(name, 0) + delta
+                position = bisect.bisect_left(self._names, name)
+                present = position < len(self._names) and self._names[position] == name
+                if count > 0:
+                    self._counts[name] = count
+                    if not present:
+                        self._names.insert(position, name)
+                elif present:
+                    # Tag plus utilisé : plus proposé
+                    del self._names[position]
+                    self._counts.pop(name, None)
+            self._cache = {}
+            self.updates += 1
+
+    def suggest(self, db: Session, prefix: str, limit: int = 10) -> List[dict]:
+        """Tags commençant par `prefix`, du plus au moins utilisé : [{"name", "pod_count"}]."""
+        if self.is_stale():
+            self.load(db)
+        prefix = normalize_tag(prefix) or ""
+        cache_key = (prefix, limit)
+        with self._lock:
+            if cache_key in self._cache:
+                return self._cache[cache_key]
+            start = bisect.bisect_left(self._names, prefix)
+            # "\uffff" trie après tout caractère usuel : fin de la tranche des noms préfixés
+            end = bisect.bisect_left(self._names, prefix + "\uffff", lo=start)
+            counts = self._counts
+            # Les plus utilisés d'abord, puis par ordre alphabétique
+            best = heapq.nsmallest(limit, self._names[start:end], key=lambda name: (-counts[name], name))
+            suggestions = [{"name": name, "pod_count": counts[name]} for name in best]
+            if len(prefix) <= CACHED_PREFIX_LENGTH:
+                self._cache[cache_key] = suggestions
+            return suggestions
+
+    def get_metrics(self) -> dict:
+        return {"tags": len(self._names), "loads": self.loads, "updates": self.updates}
+
+
+tag_index = TagIndex()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_tag_counts(session: Session) -> None:
+    if session.info.pop(TAG_COUNTS_RELOAD, False):
+        session.info.pop(PENDING_TAG_COUNTS, None)
+        tag_index.invalidate()
+        return
+    deltas = session.info.pop(PENDING_TAG_COUNTS, None)
+    if deltas:
+        tag_index.apply(deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_tag_counts(session: Session) -> None:
+    session.info.pop(PENDING_TAG_COUNTS, None)
+    session.info.pop(TAG_COUNTS_RELOAD, None)
+
+
+def suggest_tags(db: Session, prefix: str, limit: int = 10) -> List[dict]:
+    return tag_index.suggest(db, prefix, limit)
+
+
+def get_tag_index_metrics() -> dict:
+    return tag_index.get_metrics()
@@ -0,0 +1,184 @@
+# Tags normalisés des Pods (tables `tags` et `pod_tags`, voir tag_model)
+#
+# Chaque tag n'existe qu'une fois ; un Pod y est relié par la table d'association, indexée par
+# tag. Le filtrage des Pods par tag passe par cet index (jointure sur les seuls Pods portant les
+# tags demandés) au lieu de lire et découper la colonne texte de chaque Pod. Le nombre de Pods par
+# tag (`pod_count`) est mis à jour par incrément à chaque ajout ou retrait, sans recomptage.
+
+import json
+import logging
+from typing import Iterable, List, Optional
+
+from sqlalchemy import func, inspect, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..models.pod_model import Pod
+from ..models.tag_model import Tag, pod_tags
+
+logger = logging.getLogger("tag_service")
+
+MAX_TAG_LENGTH = 50
+MAX_TAGS_PER_POD = 20
+
+# Clés de `Session.info` : variations des compteurs à reporter dans l'index en mémoire
+# (tag_index_service) une fois la transaction validée, ou demande de rechargement complet
+PENDING_TAG_COUNTS = "pending_tag_counts"
+TAG_COUNTS_RELOAD = "tag_counts_reload"
+
+
+def normalize_tag(name: str) -> Optional[str]:
+    """Forme canonique d'un tag (minuscules, espaces simples) ; None s'il est vide."""
+    normalized = " ".join(str(name).split()).lower()[:MAX_TAG_LENGTH]
+    return normalized or None
+
+
+def normalize_tags(names: Optional[Iterable[str]]) -> List[str]:
+    """Tags canoniques sans doublons, dans l'ordre de saisie."""
+    result = []
+    for name in names or []:
+        normalized = normalize_tag(name)
+        if normalized and normalized not in result:
+            result.append(normalized)
+    return result[:MAX_TAGS_PER_POD]
+
+
+def get_or_create_tags(db: Session, names: Iterable[str]) -> List[Tag]:
+    """Tags correspondant à `names` (normalisés), créés s'ils n'existent pas encore."""
+    names = normalize_tags(names)
+    if not names:
+        return []
+    tags = {tag.name: tag for tag in db.query(Tag).filter(Tag.name.in_(names)).all()}
+    for name in names:
+        if name in tags:
+            continue
+        try:
+            # Point de sauvegarde : un autre processus peut créer le même tag au même moment
+            with db.begin_nested():
+                tag = Tag(name=name, pod_count=0)
+                db.add(tag)
+            tags[name] = tag
+        except IntegrityError:
+            tags[name] = db.query(Tag).filter(Tag.name == name).one()
+    return [tags[name] for name in names]
+
+
+def _shift_counts(db: Session, tags: List[Tag], delta: int) -> None:
+    # UPDATE relatif : pas de lecture préalable, pas de conflit entre écritures concurrentes
+    if tags:
+        db.execute(
+            update(Tag).where(Tag.id.in_(sorted(tag.id for tag in tags))).values(pod_count=Tag.pod_count + delta),
+            execution_options={"synchronize_session": False}
+        )
+        pending = db.info.setdefault(PENDING_TAG_COUNTS, {})
+        for tag in tags:
+            pending[tag.name] = pending.get(tag.name, 0) + delta
+
+
+def set_pod_tags(db: Session, pod: Pod, names: Optional[Iterable[str]]) -> List[Tag]:
+    """
+    Remplace les tags du Pod par `names` et met à jour les compteurs des tags ajoutés et retirés.
+    Ne valide pas la transaction (à la charge de l'appelant).
+    """
+    tags = get_or_create_tags(db, names)
+    db.flush()
+    previous = list(pod.tags)
+    current_ids = {tag.id for tag in previous}
+    new_ids = {tag.id for tag in tags}
+
+    pod.tags = tags
+    _shift_counts(db, [tag for tag in tags if tag.id not in current_ids], 1)
+    _shift_counts(db, [tag for tag in previous if tag.id not in new_ids], -1)
+    # Compteurs modifiés en base : relus au prochain accès
+    for tag in previous + tags:
+        db.expire(tag, ["pod_count"])
+    return tags
+
+
+def clear_pod_tags(db: Session, pod: Pod) -> None:
+    """Retire tous les tags du Pod (avant sa suppression) en décrémentant leurs compteurs."""
+    set_pod_tags(db, pod, [])
+
+
+def tag_filter(db: Session, names: Iterable[str], match_all: bool = False) -> ColumnElement:
+    """
+    Condition « le Pod porte au moins un des tags » (ou tous si `match_all`), appuyée sur
+    l'index (tag_id, pod_id) de pod_tags.
+    """
+    names = normalize_tags(names)
+    tag_ids = [tag_id for (tag_id,) in db.query(Tag.id).filter(Tag.name.in_(names)).all()]
+    if not tag_ids or (match_all and len(tag_ids) < len(names)):
+        # Tag inconnu : aucun Pod ne peut correspondre
+        return Pod.id.is_(None)
+
+    pod_ids = select(pod_tags.c.pod_id).where(pod_tags.c.tag_id.in_(tag_ids))
+    if match_all and len(tag_ids) > 1:
+        pod_ids = pod_ids.group_by(pod_tags.c.pod_id).having(func.count() == len(tag_ids))
+    return Pod.id.in_(pod_ids)
+
+
+def get_popular_tags(db: Session, limit: int = 50) -> List[Tag]:
+    """Tags les plus utilisés (au moins un Pod), du plus au moins fréquent."""
+    return (
+        db.query(Tag)
+        .filter(Tag.pod_count > 0)
+        .order_by(Tag.pod_count.desc(), Tag.name)
+        .limit(limit)
+        .all()
+    )
+
+
+def recount_tags(db: Session) -> None:
+    """Recalcule tous les compteurs depuis pod_tags (réparation, reprise de données)."""
+    counts = (
+        select(func.count())
+        .select_from(pod_tags)
+        .where(pod_tags.c.tag_id == Tag.id)
+        .scalar_subquery()
+    )
+    db.execute(update(Tag).values(pod_count=counts), execution_options={"synchronize_session": False})
+    db.info[TAG_COUNTS_RELOAD] = True
+    db.commit()
+
+
+def _parse_legacy_tags(value: Optional[str]) -> List[str]:
+    # Ancienne colonne texte : liste JSON ou tags séparés par des virgules
+    if not value:
+        return []
+    if value.lstrip().startswith("["):
+        try:
+            return [str(tag) for tag in json.loads(value)]
+        except ValueError:
+            pass
+    return value.split(",")
+
+
+def migrate_legacy_tags(engine: Engine) -> None:
+    """
+    Reprend les tags de l'ancienne colonne texte `pods.tags` (bases créées avant les tables de
+    tags) pour les Pods qui n'ont encore aucun tag normalisé. Appelé au démarrage, après create_all.
+    La colonne des Pods repris est vidée dans la même transaction : un Pod dont on retire ensuite
+    tous les tags ne les retrouve pas au démarrage suivant.
+    """
+    if "tags" not in {column["name"] for column in inspect(engine).get_columns("pods")}:
+        return
+    with Session(bind=engine) as db:
+        rows = db.execute(
+            text(
+                "SELECT id, tags FROM pods WHERE tags IS NOT NULL AND tags != '' "
+                "AND id NOT IN (SELECT pod_id FROM pod_tags)"
+            )
+        ).all()
+        if not rows:
+            return
+        for pod_id, value in rows:
+            tags = get_or_create_tags(db, _parse_legacy_tags(value))
+            db.flush()
+            if tags:
+                db.execute(pod_tags.insert(), [{"pod_id": pod_id, "tag_id": tag.id} for tag in tags])
+        db.execute(text("UPDATE pods SET tags = NULL WHERE id = :pod_id"), [{"pod_id": pod_id} for pod_id, _ in rows])
+        db.commit()
+        recount_tags(db)
+        logger.info(f"Tags de {len(rows)} Pods repris depuis la colonne texte pods.tags")
@@ -0,0 +1,66 @@
+# Services pour les segments horodatés de transcription et la recherche dans une transcription
+
+import unicodedata
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any
+
+from ..models.transcript_segment_model import TranscriptSegment
+
+def normalize_text(text: str) -> str:
+    """
+    Normalise un texte pour la recherche : minuscules, accents retirés, espaces compactés.
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    without_accents = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(without_accents.split())
+
+def replace_pod_segments(db: Session, pod_id: int, segments: List[Dict[str, Any]], commit: bool = True) -> int:
+    """
+    Remplace l'ensemble des segments d'un Pod par ceux issus d'une nouvelle transcription.
+    Retourne le nombre de segments enregistrés.
+    """
+    db.query(TranscriptSegment).filter(TranscriptSegment.pod_id == pod_id).delete(synchronize_session=False)
+    db.bulk_save_objects([
+        TranscriptSegment(
+            pod_id=pod_id,
+            start=segment["start"],
+            end=segment["end"],
+            text=segment["text"],
+            normalized_text=normalize_text(segment["text"])
+        )
+        for segment in segments
+    ])
+    if commit:
+        db.commit()
+    return len(segments)
+
+def get_pod_segments(db: Session, pod_id: int) -> List[TranscriptSegment]:
+    return (
+        db.query(TranscriptSegment)
+        .filter(TranscriptSegment.pod_id == pod_id)
+        .order_by(TranscriptSegment.start)
+        .all()
+    )
+
+def search_pod_segments(db: Session, pod_id: int, query: str, limit: int = 20) -> List[TranscriptSegment]:
+    """
+    Recherche les segments d'un Pod contenant `query` (insensible à la casse et aux accents).
+
+    La lecture passe par l'index (pod_id, start) : seuls les segments du Pod sont examinés,
+    et les résultats sont retournés dans l'ordre chronologique.
+    """
+    normalized_query = normalize_text(query)
+    if not normalized_query:
+        return []
+    # Échapper les jokers LIKE présents dans la requête utilisateur
+    escaped = normalized_query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return (
+        db.query(TranscriptSegment)
+        .filter(
+            TranscriptSegment.pod_id == pod_id,
+            TranscriptSegment.normalized_text.like(f"%{escaped}%", escape="\\")
+        )
+        .order_by(TranscriptSegment.start)
+        .limit(limit)
+        .all()
+    )
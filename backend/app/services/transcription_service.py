@@ -3,9 +3,11 @@ import openai
 import httpx
 import os
 import tempfile
+from typing import Any, Dict, Optional, Tuple
 from fastapi import HTTPException, status
 
 from ..config import settings # Pour récupérer OPENAI_API_KEY
+from . import audio_service, media_cache_service
 
 # Initialiser le client OpenAI
 # Assurez-vous que la variable d'environnement OPENAI_API_KEY est définie
@@ -16,55 +18,91 @@ if not settings.OPENAI_API_KEY:
 
 client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
 
-async def transcribe_audio_with_whisper(audio_file_url: str) -> str | None:
+async def prepare_audio_for_whisper(source_path: str) -> Tuple[str, Optional[audio_service.TimestampMap]]:
     """
-    Télécharge un fichier audio depuis une URL, le transcrit avec OpenAI Whisper,
-    et retourne la transcription.
+    Prépare un fichier audio pour Whisper : décodage en PCM 16 kHz mono, suppression des silences (VAD)
+    et encodage avec le profil `speech` (Opus mono bas débit par défaut).
+
+    Retourne le chemin du fichier à envoyer et la TimestampMap permettant de ramener les instants
+    de la transcription sur l'audio original (None si la VAD est désactivée ou si le pré-traitement
+    a échoué, auquel cas le fichier source est envoyé tel quel).
+    """
+    speech_profile = audio_service.get_audio_profile("speech")
+    prepared = tempfile.NamedTemporaryFile(delete=False, suffix=audio_service.profile_suffix(speech_profile))
+    prepared.close()
+    try:
+        if settings.VAD_ENABLED:
+            timestamp_map = await audio_service.prepare_speech_audio(source_path, prepared.name)
+            return prepared.name, timestamp_map
+        samples = await audio_service.decode_to_pcm(source_path)
+        await audio_service.encode_pcm(samples, prepared.name, speech_profile)
+        return prepared.name, None
+    except Exception as e:
+        print(f"Pré-traitement audio impossible, envoi de l'audio original: {e}")
+        if os.path.exists(prepared.name):
+            os.unlink(prepared.name)
+        return source_path, None
+
+def _read_field(item: Any, name: str, default: Any = None) -> Any:
+    # Le SDK OpenAI retourne des objets Pydantic, mais certains proxys renvoient des dictionnaires
+    if isinstance(item, dict):
+        return item.get(name, default)
+    return getattr(item, name, default)
+
+def parse_verbose_transcription(
+    transcription_response: Any,
+    timestamp_map: Optional[audio_service.TimestampMap] = None
+) -> Dict[str, Any]:
+    """
+    Extrait le texte et les segments horodatés d'une réponse Whisper `verbose_json`.
+
+    Les instants des segments sont ramenés sur l'audio original via `timestamp_map`
+    lorsque les silences ont été retirés avant l'envoi.
+    """
+    segments = []
+    for segment in _read_field(transcription_response, "segments", None) or []:
+        text = (_read_field(segment, "text", "") or "").strip()
+        if not text:
+            continue
+        start = float(_read_field(segment, "start", 0.0))
+        end = float(_read_field(segment, "end", start))
+        if timestamp_map is not None:
+            start, end = timestamp_map.to_original(start), timestamp_map.to_original(end, is_end=True)
+        segments.append({"start": start, "end": end, "text": text})
+
+    text = (_read_field(transcription_response, "text", "") or "").strip()
+    if not text and segments:
+        text = " ".join(segment["text"] for segment in segments)
+    return {"text": text, "segments": segments}
+
+async def transcribe_audio_file(audio_file_path: str) -> Dict[str, Any]:
+    """
+    Transcrit un fichier audio local avec OpenAI Whisper.
+
+    Retourne un dictionnaire {"text": str, "segments": [{"start", "end", "text"}, ...]},
+    les instants étant exprimés en secondes sur l'audio original.
     """
     if not settings.OPENAI_API_KEY:
         print("Transcription ignorée car OPENAI_API_KEY n'est pas configurée.")
-        # Retourner None ou une chaîne vide, ou lever une exception selon la politique de gestion d'erreur
-        # Pour l'instant, on retourne None pour ne pas bloquer si la clé n'est pas là pendant le dev
-        return "Transcription non disponible (clé API OpenAI manquante)."
+        return {"text": "Transcription non disponible (clé API OpenAI manquante).", "segments": []}
 
     try:
-        async with httpx.AsyncClient() as http_client:
-            response = await http_client.get(audio_file_url)
-            response.raise_for_status() # Lève une exception pour les codes d'erreur HTTP 4xx/5xx
-            audio_content = response.content
-
-        # Whisper API attend un objet fichier, donc nous sauvegardons temporairement le contenu téléchargé
-        # tempfile.NamedTemporaryFile crée un fichier qui est supprimé à sa fermeture
-        with tempfile.NamedTemporaryFile(delete=True, suffix=".mp3") as tmp_audio_file: # Assurez-vous que le suffixe correspond au format audio attendu par Whisper ou que Whisper peut le gérer
-            tmp_audio_file.write(audio_content)
-            tmp_audio_file.flush() # S'assurer que toutes les données sont écrites
-            tmp_audio_file.seek(0) # Rembobiner au début du fichier pour la lecture
-            
-            # Lire le fichier temporaire pour l'envoyer à Whisper
+        # Pré-traitement : suppression des silences et copie compacte pour réduire la durée facturée et la latence
+        whisper_input_path, timestamp_map = await prepare_audio_for_whisper(audio_file_path)
+        try:
             # Le client OpenAI s'attend à un objet fichier ouvert en mode binaire ('rb')
-            with open(tmp_audio_file.name, "rb") as audio_for_whisper:
+            with open(whisper_input_path, "rb") as audio_for_whisper:
                 transcription_response = client.audio.transcriptions.create(
                     model="whisper-1",
                     file=audio_for_whisper,
-                    response_format="text" # ou "json", "verbose_json", etc.
+                    response_format="verbose_json" # Texte + segments horodatés
                 )
-        
-        # La réponse pour le format "text" est directement la chaîne de transcription
-        if isinstance(transcription_response, str):
-            return transcription_response.strip()
-        else:
-            # Si le format de réponse est différent (ex: json), ajustez l'extraction ici
-            # Pour l'instant, on s'attend à du texte brut.
-            print(f"Réponse inattendue de Whisper: {transcription_response}")
-            return "Erreur lors de l'extraction de la transcription."
+        finally:
+            if whisper_input_path != audio_file_path and os.path.exists(whisper_input_path):
+                os.unlink(whisper_input_path)
+
+        return parse_verbose_transcription(transcription_response, timestamp_map)
 
-    except httpx.HTTPStatusError as e:
-        print(f"Erreur HTTP lors du téléchargement du fichier audio: {e.response.status_code} - {e.response.text}")
-        # Lever une HTTPException pour que FastAPI la gère proprement
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Impossible de télécharger le fichier audio depuis l'URL fournie: {e.response.status_code}"
-        )
     except openai.APIError as e:
         print(f"Erreur API OpenAI: {e}")
         # Lever une HTTPException
@@ -80,6 +118,44 @@ async def transcribe_audio_with_whisper(audio_file_url: str) -> str | None:
             detail=f"Une erreur interne est survenue lors de la tentative de transcription de l'audio."
         )
 
+async def transcribe_audio_url(audio_file_url: str) -> Dict[str, Any]:
+    """
+    Télécharge un fichier audio depuis une URL et le transcrit avec OpenAI Whisper.
+
+    Retourne le même dictionnaire que `transcribe_audio_file`.
+    """
+    if not settings.OPENAI_API_KEY:
+        print("Transcription ignorée car OPENAI_API_KEY n'est pas configurée.")
+        # On ne bloque pas si la clé n'est pas là pendant le dev
+        return {"text": "Transcription non disponible (clé API OpenAI manquante).", "segments": []}
+
+    try:
+        # Le cache disque évite de retélécharger un audio déjà récupéré par un autre traitement
+        cached_audio_path = await media_cache_service.fetch_media(audio_file_url)
+    except httpx.HTTPStatusError as e:
+        print(f"Erreur HTTP lors du téléchargement du fichier audio: {e.response.status_code}")
+        # Lever une HTTPException pour que FastAPI la gère proprement
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Impossible de télécharger le fichier audio depuis l'URL fournie: {e.response.status_code}"
+        )
+    except Exception as e:
+        print(f"Erreur inattendue lors du téléchargement du fichier audio: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Une erreur interne est survenue lors de la tentative de transcription de l'audio."
+        )
+
+    return await transcribe_audio_file(cached_audio_path)
+
+async def transcribe_audio_with_whisper(audio_file_url: str) -> str | None:
+    """
+    Télécharge un fichier audio depuis une URL, le transcrit avec OpenAI Whisper,
+    et retourne uniquement le texte de la transcription.
+    """
+    result = await transcribe_audio_url(audio_file_url)
+    return result["text"]
+
 # Vous pourriez ajouter ici une fonction pour utiliser GPT-4 pour résumer ou analyser la transcription
 # async def analyze_transcription_with_gpt4(transcription: str) -> str | None:
 #     if not settings.OPENAI_API_KEY:
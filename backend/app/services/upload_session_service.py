@@ -0,0 +1,263 @@
+# Téléversements reprenables (protocole compatible tus 1.0)
+#
+# Le client crée une session en annonçant la taille totale, puis envoie la vidéo en plusieurs
+# requêtes PATCH, chacune indiquant la position (`Upload-Offset`) de ses octets. Après une coupure
+# réseau, le client lit la position courante (HEAD) et reprend à partir de là au lieu de tout renvoyer.
+
+import asyncio
+import base64
+import binascii
+import logging
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from starlette.requests import ClientDisconnect
+
+from ..config import settings
+from ..models.upload_session_model import UploadSession
+from ..schemas.upload_schema import PresignedUploadCreate
+from . import storage_service
+
+logger = logging.getLogger("upload_session_service")
+
+TUS_VERSION = "1.0.0"
+
+STATUS_UPLOADING = "uploading"
+STATUS_PRESIGNED = "presigned"  # Envoi direct au stockage via une URL signée
+STATUS_FINALIZED = "finalized"
+
+# Une seule requête PATCH à la fois par session (au sein du processus)
+_session_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _spool_directory() -> str:
+    directory = os.path.join(settings.UPLOAD_SPOOL_DIR or tempfile.gettempdir(), "spotbulle-uploads")
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def parse_upload_metadata(header: Optional[str]) -> Dict[str, str]:
+    """
+    Décode l'en-tête tus `Upload-Metadata` : paires « clé valeur_base64 » séparées par des virgules.
+    """
+    metadata = {}
+    if not header:
+        return metadata
+    for pair in header.split(","):
+        parts = pair.strip().split(" ")
+        if not parts[0]:
+            continue
+        try:
+            metadata[parts[0]] = base64.b64decode(parts[1], validate=True).decode("utf-8") if len(parts) > 1 else ""
+        except (binascii.Error, UnicodeDecodeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Valeur invalide dans Upload-Metadata pour la clé '{parts[0]}'"
+            )
+    return metadata
+
+
+def create_upload_session(
+    db: Session,
+    user_id: int,
+    upload_length: int,
+    metadata: Optional[Dict[str, str]] = None
+) -> UploadSession:
+    if upload_length <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload-Length doit être un entier positif"
+        )
+    if upload_length > settings.MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Taille maximale autorisée : {settings.MAX_UPLOAD_BYTES // (1024 * 1024)}MB"
+        )
+
+    metadata = metadata or {}
+    session_id = uuid.uuid4().hex
+    filename = metadata.get("filename")
+    spool_path = os.path.join(_spool_directory(), f"{session_id}{os.path.splitext(filename or '')[1][:10]}")
+    # Fichier créé vide : les PATCH y écrivent à la position enregistrée en base
+    open(spool_path, "wb").close()
+
+    upload_session = UploadSession(
+        id=session_id,
+        user_id=user_id,
+        upload_length=upload_length,
+        offset=0,
+        filename=filename,
+        content_type=metadata.get("filetype"),
+        upload_metadata=metadata,
+        spool_path=spool_path,
+        status=STATUS_UPLOADING,
+        expires_at=datetime.utcnow() + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    )
+    db.add(upload_session)
+    db.commit()
+    db.refresh(upload_session)
+    return upload_session
+
+
+def create_presigned_upload_session(db: Session, user_id: int, upload: PresignedUploadCreate) -> UploadSession:
+    """
+    Prépare un envoi direct de la vidéo vers le stockage : le client envoie le fichier avec
+    l'URL signée (voir `presign_upload_session`) sans passer par l'API, puis appelle /complete.
+    Les objets déposés sous "uploads/" et jamais finalisés sont à purger par une règle de cycle
+    de vie du bucket.
+    """
+    if not storage_service.get_storage_backend().supports_presigned_urls:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Envoi direct indisponible avec ce stockage : utilisez /uploads (tus) ou /videos/upload"
+        )
+    if upload.size > settings.MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Taille maximale autorisée : {settings.MAX_UPLOAD_BYTES // (1024 * 1024)}MB"
+        )
+
+    session_id = uuid.uuid4().hex
+    extension = os.path.splitext(upload.filename)[1][:10]
+    upload_session = UploadSession(
+        id=session_id,
+        user_id=user_id,
+        upload_length=upload.size,
+        offset=0,
+        filename=upload.filename,
+        content_type=upload.content_type,
+        upload_metadata={
+            "title": upload.title,
+            "description": upload.description or "",
+            "tags": ",".join(upload.tags or []),
+            "transcribe": "true" if upload.transcribe else "false"
+        },
+        # Emplacement local où l'ingestion recopiera la vidéo depuis le stockage
+        spool_path=os.path.join(_spool_directory(), f"{session_id}{extension}"),
+        storage_key=f"uploads/{user_id}/{session_id}{extension}",
+        status=STATUS_PRESIGNED,
+        # L'URL signée expire bien avant la session : un envoi long peut se terminer après son expiration
+        expires_at=datetime.utcnow() + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    )
+    db.add(upload_session)
+    db.commit()
+    db.refresh(upload_session)
+    return upload_session
+
+
+def presign_upload_session(upload_session: UploadSession) -> str:
+    return storage_service.presign_upload_url(upload_session.storage_key, upload_session.content_type)
+
+
+async def verify_presigned_upload(db: Session, upload_session: UploadSession) -> None:
+    """Vérifie que l'objet a bien été déposé, à la taille annoncée (409 sinon)."""
+    size = await storage_service.get_storage_backend().stat(upload_session.storage_key)
+    if size is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Fichier non reçu par le stockage"
+        )
+    if size != upload_session.upload_length:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Taille reçue ({size} octets) différente de la taille annoncée ({upload_session.upload_length} octets)"
+        )
+    upload_session.offset = size
+    db.commit()
+
+
+def get_upload_session(db: Session, session_id: str, user_id: int) -> UploadSession:
+    upload_session = (
+        db.query(UploadSession)
+        .filter(UploadSession.id == session_id, UploadSession.user_id == user_id)
+        .first()
+    )
+    if not upload_session or upload_session.expires_at < datetime.utcnow():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session de téléversement introuvable ou expirée"
+        )
+    return upload_session
+
+
+async def append_chunk(
+    db: Session,
+    upload_session: UploadSession,
+    offset: int,
+    chunks: AsyncIterator[bytes]
+) -> int:
+    """
+    Ajoute les octets reçus à la fin du fichier de la session et retourne la nouvelle position.
+
+    `offset` doit correspondre à la position courante (409 sinon). Si le client se déconnecte en
+    cours de requête, les octets déjà écrits sont conservés : la reprise se fera à partir d'eux.
+    """
+    lock = _session_locks.setdefault(upload_session.id, asyncio.Lock())
+    async with lock:
+        db.refresh(upload_session)
+        if upload_session.status != STATUS_UPLOADING:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Téléversement déjà finalisé"
+            )
+        if offset != upload_session.offset:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload-Offset invalide : position courante {upload_session.offset}"
+            )
+
+        remaining = upload_session.upload_length - upload_session.offset
+        written = 0
+        try:
+            with open(upload_session.spool_path, "r+b") as spool_file:
+                # Écrire à la position validée (écrase une éventuelle fin partielle non comptabilisée)
+                spool_file.seek(upload_session.offset)
+                spool_file.truncate()
+                async for chunk in chunks:
+                    if written + len(chunk) > remaining:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail="Les données dépassent Upload-Length"
+                        )
+                    spool_file.write(chunk)
+                    written += len(chunk)
+        except ClientDisconnect:
+            logger.info(f"Téléversement {upload_session.id} interrompu après {written} octets")
+        finally:
+            upload_session.offset += written
+            db.commit()
+        return upload_session.offset
+
+
+def is_complete(upload_session: UploadSession) -> bool:
+    return upload_session.offset == upload_session.upload_length
+
+
+def mark_finalized(db: Session, upload_session: UploadSession, pod_id: int) -> UploadSession:
+    # Le fichier appartient désormais au pipeline d'ingestion du Pod
+    upload_session.status = STATUS_FINALIZED
+    upload_session.pod_id = pod_id
+    db.commit()
+    _session_locks.pop(upload_session.id, None)
+    return upload_session
+
+
+def delete_upload_session(db: Session, upload_session: UploadSession) -> None:
+    if upload_session.status == STATUS_UPLOADING and os.path.exists(upload_session.spool_path):
+        os.unlink(upload_session.spool_path)
+    _session_locks.pop(upload_session.id, None)
+    db.delete(upload_session)
+    db.commit()
+
+
+def delete_expired_sessions(db: Session) -> int:
+    """Supprime les sessions expirées et leurs fichiers. Retourne le nombre de sessions supprimées."""
+    expired = db.query(UploadSession).filter(UploadSession.expires_at < datetime.utcnow()).all()
+    for upload_session in expired:
+        delete_upload_session(db, upload_session)
+    return len(expired)
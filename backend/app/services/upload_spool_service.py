@@ -0,0 +1,132 @@
+# Écriture en flux des fichiers téléversés sur disque, avec limite de taille appliquée à la volée
+#
+# Les fichiers ne sont jamais lus entièrement en mémoire : le corps est recopié par blocs de taille
+# fixe dans un fichier temporaire, pendant que la taille et le SHA-256 sont calculés. Les étapes
+# suivantes (ffmpeg, stockage, empreinte) reçoivent simplement un chemin.
+
+import hashlib
+import logging
+import os
+import tempfile
+from typing import AsyncIterator, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+
+from ..config import settings
+
+logger = logging.getLogger("upload_spool_service")
+
+
+class SpooledUpload:
+    """Fichier téléversé recopié sur disque, avec sa taille et son empreinte SHA-256."""
+
+    def __init__(self, path: str, size: int, sha256: str, filename: Optional[str], content_type: Optional[str]):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.filename = filename
+        self.content_type = content_type
+
+    def cleanup(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.cleanup()
+
+    def __repr__(self):
+        return f"<SpooledUpload(path='{self.path}', size={self.size}, sha256='{self.sha256[:12]}')>"
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Taille maximale autorisée : {max_bytes // (1024 * 1024)}MB"
+    )
+
+
+async def spool_stream(
+    chunks: AsyncIterator[bytes],
+    max_bytes: Optional[int] = None,
+    filename: Optional[str] = None,
+    content_type: Optional[str] = None,
+    suffix: str = ""
+) -> SpooledUpload:
+    """
+    Recopie un flux de blocs d'octets dans un fichier temporaire.
+
+    Lève une HTTPException 413 dès que `max_bytes` est dépassé (le fichier partiel est supprimé).
+    """
+    max_bytes = max_bytes or settings.MAX_UPLOAD_BYTES
+    digest = hashlib.sha256()
+    size = 0
+
+    spool_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=settings.UPLOAD_SPOOL_DIR)
+    try:
+        with spool_file:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(max_bytes)
+                digest.update(chunk)
+                spool_file.write(chunk)
+    except BaseException:
+        os.unlink(spool_file.name)
+        raise
+
+    return SpooledUpload(spool_file.name, size, digest.hexdigest(), filename, content_type)
+
+
+async def peek_stream(chunks: AsyncIterator[bytes], size: int) -> Tuple[bytes, AsyncIterator[bytes]]:
+    """
+    Lit au moins `size` premiers octets d'un flux (moins s'il est plus court) sans les consommer :
+    retourne cet en-tête et un flux équivalent au flux d'origine, en-tête compris.
+    """
+    received = []
+    header_size = 0
+    iterator = chunks.__aiter__()
+    while header_size < size:
+        try:
+            chunk = await iterator.__anext__()
+        except StopAsyncIteration:
+            break
+        received.append(chunk)
+        header_size += len(chunk)
+
+    async def replayed_chunks():
+        for chunk in received:
+            yield chunk
+        async for chunk in iterator:
+            yield chunk
+
+    return b"".join(received)[:size], replayed_chunks()
+
+
+async def iter_upload_file(upload: UploadFile, chunk_size: int) -> AsyncIterator[bytes]:
+    await upload.seek(0)
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def spool_upload_file(upload: UploadFile, max_bytes: Optional[int] = None, chunk_size: Optional[int] = None) -> SpooledUpload:
+    """Recopie un UploadFile FastAPI sur disque par blocs de `UPLOAD_CHUNK_SIZE` octets."""
+    # Rejet immédiat si la taille annoncée dépasse déjà la limite
+    max_bytes = max_bytes or settings.MAX_UPLOAD_BYTES
+    if upload.size is not None and upload.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    return await spool_stream(
+        iter_upload_file(upload, chunk_size or settings.UPLOAD_CHUNK_SIZE),
+        max_bytes=max_bytes,
+        filename=upload.filename,
+        content_type=upload.content_type,
+        suffix=os.path.splitext(upload.filename or "")[1]
+    )
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from sqlalchemy.exc import IntegrityError
 import logging
 
@@ -7,6 +7,7 @@ import logging
 from ..models.user_model import User
 from ..schemas import user_schema
 from ..utils import security
+from ..utils.pagination import paginate
 
 logger = logging.getLogger("user_service")
 logger.setLevel(logging.INFO)
@@ -19,7 +20,11 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
 
 # Modification des annotations de type
 def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-    return db.query(User).offset(skip).limit(limit).all()
+    return get_users_page(db, limit=limit, skip=skip)[0]
+
+def get_users_page(db: Session, limit: int = 100, cursor: Optional[str] = None, skip: int = 0) -> Tuple[List[User], Optional[str]]:
+    """Utilisateurs du plus récent au plus ancien et curseur de la page suivante (voir utils.pagination)."""
+    return paginate(db.query(User), User, limit, cursor=cursor, skip=skip)
 
 def create_user(db: Session, user: user_schema.UserCreate) -> User:
     try:
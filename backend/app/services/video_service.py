@@ -1,28 +1,81 @@
+import asyncio
+import contextlib
 import os
+import struct
 import tempfile
-import subprocess
-from typing import Optional
+from typing import AsyncIterator, List, Optional, Tuple
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
 from ..models.pod_model import Pod
 from ..config import settings
-from . import transcription_service
+from . import transcription_service, audio_service, transcript_service, media_store_service, upload_spool_service
+from .ffmpeg_service import run_ffmpeg, stream_ffmpeg, FFmpegError, FFmpegBusyError
+
+# Types de fichiers vidéo acceptés au téléversement
+VALID_VIDEO_TYPES = ["video/mp4", "video/quicktime", "video/x-msvideo", "video/x-ms-wmv"]
+
+# Boîtes de premier niveau par lesquelles commence un conteneur MP4/QuickTime
+ISO_BMFF_BOXES = {b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot"}
+
+def validate_video_content_type(content_type: Optional[str]) -> None:
+    if content_type not in VALID_VIDEO_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Type de fichier vidéo non supporté. Types acceptés: {', '.join(VALID_VIDEO_TYPES)}"
+        )
+
+def parse_tags(tags: Optional[str]) -> List[str]:
+    """
+    Découpe une liste de tags séparés par des virgules (20 tags de 50 caractères au maximum).
+    """
+    tag_list = []
+    if tags:
+        raw_tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
+        if len(raw_tags) > 20:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Maximum 20 tags autorisés"
+            )
+        for tag in raw_tags:
+            if len(tag) > 50:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Tag trop long : '{tag[:20]}...' (max 50 caractères)"
+                )
+            tag_list.append(tag)
+    return tag_list
+
+def playback_audio_filename(video_filename: Optional[str]) -> str:
+    """Nom du fichier audio d'écoute dérivé du nom de la vidéo (l'extension dépend du profil d'écoute)."""
+    base_name = os.path.splitext(video_filename or "audio")[0]
+    return f"{base_name}{audio_service.profile_suffix(audio_service.get_audio_profile('playback'))}"
 
 async def transcribe_pod(db: Session, pod_id: int, audio_url: str) -> Pod:
     """
     Transcrit un fichier audio d'un Pod et met à jour la base de données
     """
+    return await _transcribe_pod(db, pod_id, transcription_service.transcribe_audio_url(audio_url))
+
+async def transcribe_pod_from_file(db: Session, pod_id: int, media_file_path: str) -> Pod:
+    """
+    Transcrit un Pod à partir d'un fichier local (vidéo ou audio déjà présent sur le disque),
+    sans retélécharger l'audio depuis le stockage.
+    """
+    return await _transcribe_pod(db, pod_id, transcription_service.transcribe_audio_file(media_file_path))
+
+async def _transcribe_pod(db: Session, pod_id: int, transcription_coro) -> Pod:
     try:
         # Appel au service de transcription
-        transcription = await transcription_service.transcribe_audio_with_whisper(audio_url)
+        transcription = await transcription_coro
         
         # Mise à jour du Pod en base de données
         pod = db.query(Pod).filter(Pod.id == pod_id).first()
         if not pod:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pod introuvable")
         
-        pod.transcription = transcription
+        pod.transcription = transcription["text"]
+        transcript_service.replace_pod_segments(db, pod_id, transcription["segments"], commit=False)
         db.commit()
         db.refresh(pod)
         
@@ -39,37 +92,60 @@ async def transcribe_pod(db: Session, pod_id: int, audio_url: str) -> Pod:
             detail="Erreur lors de la transcription du Pod"
         )
 
-async def extract_audio_from_video(video_file_path: str) -> str:
+async def extract_audio_from_video(video_file_path: str, profile_name: str = "playback") -> str:
     """
-    Extrait la piste audio d'un fichier vidéo et retourne le chemin du fichier audio
+    Extrait la piste audio d'un fichier vidéo et retourne le chemin du fichier audio.
+
+    `profile_name` choisit le profil d'encodage : `playback` (copie d'écoute à débit raisonnable)
+    ou `speech` (copie compacte destinée à la transcription). L'extension du fichier retourné
+    dépend du format du profil.
+
+    Pour le profil `playback`, la piste est d'abord inspectée avec ffprobe : si son codec (AAC, Opus...)
+    et son débit conviennent déjà à l'écoute, elle est recopiée sans réencodage (`-c:a copy`),
+    ce qui prend quelques millisecondes au lieu de plusieurs secondes.
     """
     try:
+        profile = audio_service.get_audio_profile(profile_name)
+        output_args = audio_service.profile_ffmpeg_args(profile)
+        suffix = audio_service.profile_suffix(profile)
+
+        if profile_name == "playback":
+            try:
+                audio_stream = audio_service.first_audio_stream(await audio_service.probe_media(video_file_path))
+            except (FFmpegError, ValueError) as e:
+                print(f"Inspection ffprobe impossible, réencodage de l'audio: {str(e)}")
+                audio_stream = None
+            if audio_service.can_copy_audio_stream(audio_stream):
+                output_args = audio_service.copy_ffmpeg_args(audio_stream["codec"])
+                suffix = audio_service.FORMAT_SUFFIXES[audio_service.COPY_FORMATS[audio_stream["codec"]]]
+
         # Créer un fichier temporaire pour l'audio extrait
-        audio_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
+        audio_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
         audio_file_path = audio_file.name
         audio_file.close()
         
         # Utiliser ffmpeg pour extraire l'audio
         command = [
             "ffmpeg",
+            "-y",
             "-i", video_file_path,
-            "-q:a", "0",
-            "-map", "a",
-            "-f", "mp3",
+            "-map", "a:0",
+            *output_args,
             audio_file_path
         ]
         
-        process = subprocess.run(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=True
-        )
+        await run_ffmpeg(command)
         
         return audio_file_path
     
-    except subprocess.CalledProcessError as e:
+    except FFmpegBusyError as e:
+        print(f"Extraction audio refusée, serveur saturé: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serveur momentanément saturé, veuillez réessayer plus tard",
+            headers={"Retry-After": "30"}
+        )
+    except FFmpegError as e:
         print(f"Erreur lors de l'extraction audio avec ffmpeg: {e.stderr}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -81,3 +157,123 @@ async def extract_audio_from_video(video_file_path: str) -> str:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur inattendue lors de l'extraction audio"
         )
+
+def can_stream_container(header: bytes) -> bool:
+    """
+    Indique si un fichier vidéo peut être décodé par ffmpeg depuis un pipe, d'après ses premiers octets.
+
+    Un MP4/MOV n'est lisible en flux que si son index (`moov`) précède les données (`mdat`),
+    comme dans les fichiers « faststart ». Les autres conteneurs sont lisibles séquentiellement.
+    """
+    if len(header) < 8 or header[4:8] not in ISO_BMFF_BOXES:
+        return True
+
+    offset = 0
+    while offset + 8 <= len(header):
+        size, box_type = struct.unpack(">I4s", header[offset:offset + 8])
+        if box_type == b"moov":
+            return True
+        if box_type == b"mdat":
+            return False
+        if size == 1:
+            if offset + 16 > len(header):
+                break
+            size = struct.unpack(">Q", header[offset + 8:offset + 16])[0]
+        if size < 8:
+            # Taille 0 : la boîte s'étend jusqu'à la fin du fichier, sans `moov` rencontré
+            return False
+        offset += size
+    # Position de `moov` inconnue dans l'en-tête lu : mode fichier par prudence
+    return False
+
+async def ingest_video_stream(
+    db: Session,
+    chunks: AsyncIterator[bytes],
+    audio_filename: str,
+    filename: Optional[str] = None,
+    content_type: Optional[str] = None,
+    profile_name: str = "playback"
+) -> Tuple[upload_spool_service.SpooledUpload, str]:
+    """
+    Reçoit une vidéo et en extrait l'audio en flux, sans fichier audio intermédiaire.
+
+    `chunks` est le corps de la requête tel qu'il arrive (`Request.stream()`) : chaque bloc reçu
+    est à la fois recopié sur disque (empreinte, transcription) et écrit sur l'entrée standard
+    d'ffmpeg, dont la sortie est téléversée au fil de l'eau. Réception, extraction et envoi se
+    recouvrent. Retourne la vidéo recopiée et l'URL de l'audio.
+
+    La référence à l'audio stocké n'est pas validée : elle l'est avec la création du Pod qui
+    l'utilise (un échec avant cette création l'annule, rien n'est compté en trop).
+    """
+    profile = audio_service.get_audio_profile(profile_name)
+    command = [
+        "ffmpeg",
+        "-i", "pipe:0",
+        "-map", "a:0",
+        *audio_service.profile_ffmpeg_args(profile),
+        "pipe:1"
+    ]
+    pipe_queue: asyncio.Queue = asyncio.Queue(maxsize=8)
+    pipe_closed = False
+
+    async def received_chunks():
+        async for chunk in chunks:
+            if not pipe_closed:
+                await pipe_queue.put(chunk)
+            yield chunk
+        if not pipe_closed:
+            await pipe_queue.put(None)
+
+    async def ffmpeg_input():
+        while (chunk := await pipe_queue.get()) is not None:
+            yield chunk
+
+    async def upload_encoded_audio() -> str:
+        nonlocal pipe_closed
+        try:
+            async with contextlib.aclosing(stream_ffmpeg(command, ffmpeg_input())) as encoded_audio:
+                media_object = await media_store_service.store_media_stream(db, encoded_audio, audio_filename, commit=False)
+                return media_object.url
+        finally:
+            # ffmpeg ne lit plus son entrée : la réception ne doit pas rester bloquée sur la file
+            pipe_closed = True
+            while not pipe_queue.empty():
+                pipe_queue.get_nowait()
+
+    spool_task = asyncio.create_task(upload_spool_service.spool_stream(
+        received_chunks(),
+        filename=filename,
+        content_type=content_type,
+        suffix=os.path.splitext(filename or "")[1]
+    ))
+    upload_task = asyncio.create_task(upload_encoded_audio())
+    try:
+        done, _ = await asyncio.wait({spool_task, upload_task}, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            task.result()
+        return await spool_task, await upload_task
+
+    except BaseException as e:
+        for task in (spool_task, upload_task):
+            task.cancel()
+        await asyncio.gather(spool_task, upload_task, return_exceptions=True)
+        # Référence à l'audio éventuellement ajoutée : annulée (l'objet stocké sans référence
+        # est supprimé par le ramasse-miettes)
+        db.rollback()
+        if spool_task.done() and not spool_task.cancelled() and spool_task.exception() is None:
+            spool_task.result().cleanup()
+
+        if isinstance(e, FFmpegBusyError):
+            print(f"Extraction audio refusée, serveur saturé: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Serveur momentanément saturé, veuillez réessayer plus tard",
+                headers={"Retry-After": "30"}
+            )
+        if isinstance(e, FFmpegError):
+            print(f"Erreur lors de l'extraction audio en flux avec ffmpeg: {e.stderr}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erreur lors de l'extraction audio du fichier vidéo"
+            )
+        raise
@@ -0,0 +1,134 @@
+# Tests pour le service audio_service.py
+
+import numpy as np
+import pytest
+
+from app.services import audio_service
+
+SR = audio_service.PCM_SAMPLE_RATE
+
+def _tone(seconds: float, amplitude: float = 0.5, freq: float = 440.0) -> np.ndarray:
+    t = np.arange(int(seconds * SR)) / SR
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+VAD_OPTIONS = dict(frame_ms=30, threshold_db=-40.0, min_silence_ms=600, padding_ms=150)
+
+# --- Tests pour detect_speech_regions ---
+def test_detect_speech_regions_only_silence():
+    assert audio_service.detect_speech_regions(_silence(2.0), SR, **VAD_OPTIONS) == []
+
+def test_detect_speech_regions_finds_two_regions():
+    samples = np.concatenate([_silence(1.0), _tone(1.0), _silence(3.0), _tone(1.0), _silence(1.0)])
+    regions = audio_service.detect_speech_regions(samples, SR, **VAD_OPTIONS)
+    assert len(regions) == 2
+    # La marge de 150 ms est ajoutée de chaque côté de la parole
+    assert regions[0][0] == pytest.approx(0.85 * SR, abs=0.03 * SR)
+    assert regions[1][1] == pytest.approx(6.15 * SR, abs=0.03 * SR)
+
+def test_detect_speech_regions_merges_short_pauses():
+    samples = np.concatenate([_tone(1.0), _silence(0.3), _tone(1.0)])
+    regions = audio_service.detect_speech_regions(samples, SR, **VAD_OPTIONS)
+    assert len(regions) == 1
+
+# --- Tests pour trim_silence et TimestampMap ---
+def test_trim_silence_shortens_audio_and_maps_back():
+    samples = np.concatenate([_silence(5.0), _tone(1.0), _silence(10.0), _tone(2.0)])
+    trimmed, timestamp_map = audio_service.trim_silence(samples, SR, **VAD_OPTIONS)
+
+    assert len(trimmed) < len(samples) / 3
+    assert timestamp_map.trimmed_duration == pytest.approx(len(trimmed) / SR)
+    # Le début de la première zone de parole correspond à ~4.85 s dans l'original
+    assert timestamp_map.to_original(0.0) == pytest.approx(4.85, abs=0.05)
+    # Un instant dans la deuxième zone est décalé des ~10 s de silence retirés
+    second_start = timestamp_map.pieces[1][0]
+    assert timestamp_map.to_original(second_start + 0.5) == pytest.approx(16.35, abs=0.05)
+
+def test_trim_silence_without_speech_returns_identity():
+    samples = _silence(2.0)
+    trimmed, timestamp_map = audio_service.trim_silence(samples, SR, **VAD_OPTIONS)
+    assert len(trimmed) == len(samples)
+    assert timestamp_map.to_original(1.5) == pytest.approx(1.5)
+
+def test_timestamp_map_roundtrip_list():
+    timestamp_map = audio_service.TimestampMap([(0.0, 2.0, 1.0), (1.0, 10.0, 3.0)])
+    restored = audio_service.TimestampMap.from_list(timestamp_map.to_list())
+    assert restored.to_original(2.0) == pytest.approx(11.0)
+    assert restored.trimmed_duration == pytest.approx(4.0)
+
+# --- Tests pour les profils d'encodage ---
+def test_speech_profile_is_mono_16k_opus():
+    profile = audio_service.get_audio_profile("speech")
+    args = audio_service.profile_ffmpeg_args(profile)
+    assert args[args.index("-ac") + 1] == "1"
+    assert args[args.index("-ar") + 1] == "16000"
+    assert args[args.index("-c:a") + 1] == "libopus"
+    assert audio_service.profile_suffix(profile) == ".ogg"
+
+def test_playback_profile_keeps_source_sample_rate():
+    args = audio_service.profile_ffmpeg_args(audio_service.get_audio_profile("playback"))
+    assert "-ar" not in args
+    assert args[args.index("-b:a") + 1] == "96k"
+
+def test_unknown_profile_raises():
+    with pytest.raises(ValueError):
+        audio_service.get_audio_profile("hifi")
+
+PHONE_MP4_PROBE = {
+    "streams": [
+        {"codec_type": "video", "codec_name": "h264", "bit_rate": "8000000"},
+        {"codec_type": "audio", "codec_name": "aac", "bit_rate": "128000", "sample_rate": "48000", "channels": 2, "duration": "12.5"}
+    ],
+    "format": {"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "bit_rate": "8200000", "duration": "12.5"}
+}
+
+def test_first_audio_stream_reads_probe():
+    stream = audio_service.first_audio_stream(PHONE_MP4_PROBE)
+    assert stream == {"codec": "aac", "bitrate": 128000, "sample_rate": 48000, "channels": 2, "duration": 12.5}
+    assert audio_service.first_audio_stream({"streams": [{"codec_type": "video"}]}) is None
+
+def test_first_audio_stream_ignores_container_bitrate():
+    # MKV : débit de la piste dans ses statistiques, jamais celui du conteneur (vidéo comprise)
+    mkv_probe = {
+        "streams": [{"codec_type": "audio", "codec_name": "opus", "sample_rate": "48000", "channels": 2, "tags": {"BPS": "96000"}}],
+        "format": {"bit_rate": "8200000", "duration": "12.5"}
+    }
+    assert audio_service.first_audio_stream(mkv_probe)["bitrate"] == 96000
+    del mkv_probe["streams"][0]["tags"]
+    assert audio_service.first_audio_stream(mkv_probe)["bitrate"] is None
+
+def test_can_copy_audio_stream():
+    stream = audio_service.first_audio_stream(PHONE_MP4_PROBE)
+    assert audio_service.can_copy_audio_stream(stream) is True
+    assert audio_service.can_copy_audio_stream({**stream, "codec": "pcm_s16le"}) is False
+    assert audio_service.can_copy_audio_stream({**stream, "bitrate": 1_536_000}) is False
+    assert audio_service.can_copy_audio_stream({**stream, "bitrate": None}) is False
+    assert audio_service.can_copy_audio_stream(None) is False
+
+def test_copy_ffmpeg_args_keeps_codec():
+    args = audio_service.copy_ffmpeg_args("aac")
+    assert args[args.index("-c:a") + 1] == "copy"
+    assert args[-2:] == ["-f", "ipod"]
+    assert audio_service.copy_ffmpeg_args("opus")[-2:] == ["-f", "ogg"]
+
+# --- Tests pour compute_waveform_peaks ---
+def test_compute_waveform_peaks_min_max_per_block():
+    samples = np.concatenate([_tone(1.0, amplitude=0.5), _silence(1.0)])
+    peaks = audio_service.compute_waveform_peaks(samples, peak_count=10)
+    assert peaks.dtype == np.int8
+    assert peaks.shape == (10, 2)
+    # Première moitié : ton d'amplitude 0.5 ; seconde moitié : silence
+    assert abs(int(peaks[0, 0]) + 64) <= 1 and abs(int(peaks[0, 1]) - 64) <= 1
+    assert np.all(peaks[5:] == 0)
+
+def test_compute_waveform_peaks_short_and_empty_signals():
+    assert audio_service.compute_waveform_peaks(np.array([0.1, -0.2], dtype=np.float32), peak_count=10).shape == (2, 2)
+    assert audio_service.compute_waveform_peaks(np.zeros(0, dtype=np.float32)).shape == (0, 2)
+
+def test_waveform_bytes_round_trip():
+    peaks = audio_service.compute_waveform_peaks(_tone(0.5), peak_count=16)
+    data = audio_service.waveform_to_bytes(peaks)
+    assert len(data) == 32
+    assert np.array_equal(audio_service.waveform_from_bytes(data), peaks)
@@ -0,0 +1,76 @@
+# Tests pour le service avatar_service.py
+
+import io
+import os
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.profile_model import Profile
+from app.services import avatar_service
+
+@pytest.fixture
+def avatar_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(avatar_service.settings, "AVATAR_DIR", str(tmp_path))
+    monkeypatch.setattr(avatar_service.settings, "PUBLIC_BASE_URL", "https://api.example.com/")
+    return tmp_path
+
+def test_store_avatar_variants_content_addressed(avatar_dir):
+    urls = avatar_service.store_avatar_variants({64: b"small", 128: b"medium"})
+
+    assert set(urls) == {"64", "128"}
+    assert urls["64"].startswith("https://api.example.com/static/avatars/")
+    assert urls["64"].endswith("-64.webp")
+    assert sorted(os.listdir(avatar_dir)) == sorted(os.path.basename(url) for url in urls.values())
+    # Même contenu, même nom
+    assert avatar_service.store_avatar_variants({64: b"small"})["64"] == urls["64"]
+    assert avatar_service.store_avatar_variants({64: b"other"})["64"] != urls["64"]
+
+def test_delete_unused_variants_keeps_shared_files(avatar_dir):
+    engine = create_engine("sqlite://")
+    Profile.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    old = avatar_service.store_avatar_variants({64: b"small", 128: b"medium"})
+    # Autre profil avec la même image, dont l'URL par défaut est une autre taille
+    db.add_all([
+        Profile(id=1, user_id=1, avatar_variants={"256": "https://api.example.com/static/avatars/new-256.webp"}),
+        Profile(id=2, user_id=2, profile_picture_url="https://cdn.example.com/other.webp", avatar_variants={"64": old["64"]})
+    ])
+    db.commit()
+
+    avatar_service._delete_unused_variants(db, db.get(Profile, 1), old)
+
+    assert os.listdir(avatar_dir) == [os.path.basename(old["64"])]
+
+def test_pick_avatar_url():
+    variants = {"64": "u64", "128": "u128", "256": "u256"}
+    assert avatar_service.pick_avatar_url(None) is None
+    assert avatar_service.pick_avatar_url(variants, size=100) == "u128"
+    assert avatar_service.pick_avatar_url(variants, size=512) == "u256"
+    assert avatar_service.pick_avatar_url(variants) == variants[str(avatar_service.settings.AVATAR_DEFAULT_SIZE)]
+
+def test_render_avatar_variants_without_pillow(monkeypatch):
+    monkeypatch.setattr(avatar_service, "Image", None)
+    with pytest.raises(HTTPException) as exc_info:
+        avatar_service.render_avatar_variants(b"data")
+    assert exc_info.value.status_code == 503
+
+def test_render_avatar_variants_resizes_to_webp():
+    Image = pytest.importorskip("PIL.Image")
+    source = io.BytesIO()
+    Image.new("RGB", (640, 480), (200, 30, 30)).save(source, format="JPEG")
+
+    variants = avatar_service.render_avatar_variants(source.getvalue())
+
+    assert sorted(variants) == avatar_service.get_avatar_sizes()
+    for size, content in variants.items():
+        image = Image.open(io.BytesIO(content))
+        assert image.format == "WEBP"
+        assert image.size == (size, size)
+
+def test_render_avatar_variants_rejects_invalid_image():
+    pytest.importorskip("PIL")
+    with pytest.raises(HTTPException) as exc_info:
+        avatar_service.render_avatar_variants(b"not an image")
+    assert exc_info.value.status_code == 400
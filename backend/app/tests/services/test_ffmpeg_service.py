@@ -0,0 +1,120 @@
+# Tests pour le service ffmpeg_service.py (exécutés avec des commandes système simples à la place d'ffmpeg)
+
+import asyncio
+import sys
+
+import pytest
+
+from app.services.ffmpeg_service import FFmpegRunner, FFmpegError, FFmpegTimeoutError, FFmpegBusyError
+
+PYTHON = sys.executable
+
+@pytest.mark.asyncio
+async def test_run_returns_stdout_and_passes_stdin():
+    runner = FFmpegRunner(max_concurrency=2)
+    stdout = await runner.run([PYTHON, "-c", "import sys; sys.stdout.write(sys.stdin.read().upper())"], input=b"abc")
+    assert stdout == b"ABC"
+    assert runner.metrics()["completed"] == 1
+
+@pytest.mark.asyncio
+async def test_run_raises_on_non_zero_exit():
+    runner = FFmpegRunner(max_concurrency=1)
+    with pytest.raises(FFmpegError) as exc_info:
+        await runner.run([PYTHON, "-c", "import sys; sys.stderr.write('boom'); sys.exit(3)"])
+    assert exc_info.value.returncode == 3
+    assert "boom" in exc_info.value.stderr
+    assert runner.metrics()["failed"] == 1
+
+@pytest.mark.asyncio
+async def test_run_kills_process_on_timeout():
+    runner = FFmpegRunner(max_concurrency=1, timeout=0.2)
+    with pytest.raises(FFmpegTimeoutError):
+        await runner.run([PYTHON, "-c", "import time; time.sleep(10)"])
+    metrics = runner.metrics()
+    assert metrics["timed_out"] == 1
+    assert metrics["running"] == 0
+
+@pytest.mark.asyncio
+async def test_cancellation_kills_process_and_releases_slot():
+    runner = FFmpegRunner(max_concurrency=1)
+    task = asyncio.create_task(runner.run([PYTHON, "-c", "import time; time.sleep(10)"]))
+    await asyncio.sleep(0.2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert runner.metrics()["cancelled"] == 1
+    # Le créneau est libéré pour la tâche suivante
+    assert await runner.run([PYTHON, "-c", "print('ok')"]) == b"ok\n"
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_and_queue_limit():
+    runner = FFmpegRunner(max_concurrency=1, max_queue_depth=1)
+    sleeper = [PYTHON, "-c", "import time; time.sleep(0.3)"]
+    first = asyncio.create_task(runner.run(sleeper))
+    second = asyncio.create_task(runner.run(sleeper))
+    await asyncio.sleep(0.1)
+    assert runner.metrics()["running"] == 1
+    assert runner.metrics()["queued"] == 1
+    with pytest.raises(FFmpegBusyError):
+        await runner.run(sleeper)
+    await asyncio.gather(first, second)
+    metrics = runner.metrics()
+    assert metrics["completed"] == 2
+    assert metrics["rejected"] == 1
+
+async def _chunks(*blocks):
+    for block in blocks:
+        yield block
+
+@pytest.mark.asyncio
+async def test_stream_pipes_stdin_to_stdout():
+    runner = FFmpegRunner(max_concurrency=1)
+    command = [PYTHON, "-c", "import sys; sys.stdout.buffer.write(sys.stdin.buffer.read()[::-1])"]
+    output = b"".join([block async for block in runner.stream(command, _chunks(b"abc", b"def"))])
+    assert output == b"fedcba"
+    assert runner.metrics()["completed"] == 1
+
+@pytest.mark.asyncio
+async def test_stream_raises_on_non_zero_exit():
+    runner = FFmpegRunner(max_concurrency=1)
+    command = [PYTHON, "-c", "import sys; sys.stdin.read(); sys.exit(2)"]
+    with pytest.raises(FFmpegError):
+        async for _ in runner.stream(command, _chunks(b"abc")):
+            pass
+    assert runner.metrics()["running"] == 0
+
+async def _stalled_chunks():
+    yield b"abc"
+    # Client qui n'envoie plus rien sans fermer la connexion
+    await asyncio.sleep(10)
+    yield b"def"
+
+@pytest.mark.asyncio
+async def test_stream_kills_process_when_input_stalls():
+    runner = FFmpegRunner(max_concurrency=1, idle_timeout=0.3)
+    command = [PYTHON, "-c", "import sys; sys.stdout.buffer.write(sys.stdin.buffer.read())"]
+    with pytest.raises(FFmpegTimeoutError):
+        async for _ in runner.stream(command, _stalled_chunks()):
+            pass
+    metrics = runner.metrics()
+    assert metrics["timed_out"] == 1
+    assert metrics["running"] == 0
+
+@pytest.mark.asyncio
+async def test_stream_without_queue_rejects_only_when_full():
+    runner = FFmpegRunner(max_concurrency=1, max_queue_depth=0)
+    command = [PYTHON, "-c", "import sys; sys.stdout.buffer.write(sys.stdin.buffer.read())"]
+    stream = runner.stream(command, _stalled_chunks())
+    consumer = asyncio.create_task(stream.__anext__())
+    await asyncio.sleep(0.2)
+    assert runner.metrics()["running"] == 1
+    with pytest.raises(FFmpegBusyError):
+        async for _ in runner.stream(command, _chunks(b"abc")):
+            pass
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+    await stream.aclose()
+    assert runner.metrics()["running"] == 0
+    output = b"".join([block async for block in runner.stream(command, _chunks(b"abc"))])
+    assert output == b"abc"
@@ -0,0 +1,74 @@
+# Tests pour le service fingerprint_service.py
+
+import numpy as np
+import pytest
+
+from app.services import fingerprint_service
+
+SR = fingerprint_service.FINGERPRINT_SAMPLE_RATE
+
+@pytest.fixture
+def signal():
+    rng = np.random.default_rng(42)
+    # Bruit modulé lentement : spectre qui évolue dans le temps comme de la parole
+    t = np.arange(20 * SR) / SR
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 0.7 * t)
+    tones = sum(np.sin(2 * np.pi * f * t + f) * np.sin(2 * np.pi * (0.3 + i * 0.11) * t) for i, f in enumerate([350, 520, 800, 1200, 1700]))
+    return (0.2 * envelope * tones + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+
+def test_compute_fingerprint_shape(signal):
+    fingerprint = fingerprint_service.compute_fingerprint(signal)
+    assert fingerprint.dtype == np.uint32
+    # Une sous-empreinte toutes les 64 ms
+    assert len(fingerprint) == pytest.approx(20 / 0.064, abs=3)
+
+def test_compute_fingerprint_too_short():
+    assert len(fingerprint_service.compute_fingerprint(np.zeros(100, dtype=np.float32))) == 0
+
+def test_fingerprint_robust_to_noise_and_gain(signal):
+    rng = np.random.default_rng(1)
+    degraded = (0.8 * signal + 0.005 * rng.standard_normal(len(signal))).astype(np.float32)
+    first = fingerprint_service.compute_fingerprint(signal)
+    second = fingerprint_service.compute_fingerprint(degraded)
+    assert fingerprint_service.bit_error_rate(first, second) < 0.2
+
+def test_different_audio_has_high_bit_error_rate(signal):
+    rng = np.random.default_rng(7)
+    other = (0.2 * rng.standard_normal(len(signal))).astype(np.float32)
+    first = fingerprint_service.compute_fingerprint(signal)
+    second = fingerprint_service.compute_fingerprint(other)
+    assert fingerprint_service.bit_error_rate(first, second) > 0.35
+
+def test_bit_error_rate_with_offset():
+    base = ((np.arange(100, dtype=np.uint64) * 2654435761) & 0xFFFFFFFF).astype(np.uint32)
+    assert fingerprint_service.bit_error_rate(base[10:], base, offset=-10) == 0.0
+    assert fingerprint_service.bit_error_rate(base, base[10:], offset=10) == 0.0
+    assert fingerprint_service.bit_error_rate(base[:5], base[:5], offset=10) == 1.0
+
+def test_fingerprint_bytes_roundtrip(signal):
+    fingerprint = fingerprint_service.compute_fingerprint(signal)
+    restored = fingerprint_service.fingerprint_from_bytes(fingerprint_service.fingerprint_to_bytes(fingerprint))
+    assert np.array_equal(fingerprint, restored)
+
+def test_deleting_original_keeps_duplicates():
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+
+    from app.database import Base
+    from app.models.pod_model import Pod
+    from app.models.tag_model import Tag, pod_tags
+    from app.models.user_model import User
+    from app.services import pod_service
+
+    engine = create_engine("sqlite://")
+    # Contraintes de clé étrangère appliquées, comme sur PostgreSQL
+    event.listen(engine, "connect", lambda connection, record: connection.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(engine, tables=[User.__table__, Pod.__table__, Tag.__table__, pod_tags])
+    db = sessionmaker(bind=engine)()
+    db.add_all([Pod(id=1, title="Original"), Pod(id=2, title="Doublon", duplicate_of_id=1)])
+    db.commit()
+
+    pod_service.delete_pod(db, 1)
+
+    db.expire_all()
+    assert db.get(Pod, 2).duplicate_of_id is None
@@ -0,0 +1,243 @@
+# Tests pour ingest_service.py (moteur de pipeline et étapes)
+
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.media_object_model import MediaObject
+from app.models.pod_model import Pod
+from app.models.tag_model import Tag, pod_tags
+from app.services import ingest_service
+from app.services.ingest_service import (
+    Pipeline, Stage, StageSkipped,
+    IngestContext, STAGE_DONE, STAGE_SKIPPED, STAGE_FAILED, STAGE_BLOCKED, INGEST_READY, INGEST_FAILED
+)
+from app.services.storage_service import LocalStorageBackend
+
+class FakeContext:
+    def __init__(self):
+        self.outputs = {}
+        self.calls = []
+
+def _stage(name, depends_on=(), result=None, delay=0.0, **options):
+    async def func(context):
+        context.calls.append(("start", name))
+        await asyncio.sleep(delay)
+        context.calls.append(("end", name))
+        if isinstance(result, Exception):
+            raise result
+        return result if result is not None else {"stage": name}
+    return Stage(name, func, depends_on=depends_on, retry_delay=0.0, **options)
+
+async def _run(pipeline, state=None, context=None):
+    context = context or FakeContext()
+    saved = []
+    state = await pipeline.run(context, state if state is not None else {}, lambda current: saved.append(current["stages"].copy()))
+    return state, context, saved
+
+@pytest.mark.asyncio
+async def test_independent_stages_run_concurrently():
+    pipeline = Pipeline([
+        _stage("analyze"),
+        _stage("upload", depends_on=["analyze"], delay=0.05),
+        _stage("transcribe", depends_on=["analyze"], delay=0.05),
+        _stage("index", depends_on=["upload", "transcribe"])
+    ])
+    state, context, saved = await _run(pipeline)
+
+    assert state["status"] == INGEST_READY
+    assert all(stage["status"] == STAGE_DONE for stage in state["stages"].values())
+    # upload et transcribe démarrent tous deux avant que l'un d'eux ne se termine
+    starts = [context.calls.index(("start", name)) for name in ("upload", "transcribe")]
+    ends = [context.calls.index(("end", name)) for name in ("upload", "transcribe")]
+    assert max(starts) < min(ends)
+    assert context.calls[-1] == ("end", "index")
+    assert context.outputs["upload"] == {"stage": "upload"}
+    assert saved
+
+@pytest.mark.asyncio
+async def test_retries_then_success():
+    attempts = []
+
+    async def flaky(context):
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("erreur temporaire")
+        return {"ok": True}
+
+    pipeline = Pipeline([Stage("upload", flaky, retries=2, retry_delay=0.0)])
+    state, _, _ = await _run(pipeline)
+    assert state["stages"]["upload"]["status"] == STAGE_DONE
+    assert state["stages"]["upload"]["attempts"] == 3
+    assert pipeline.metrics.snapshot()["upload"]["retries"] == 2
+
+@pytest.mark.asyncio
+async def test_failure_blocks_dependents_but_not_independent_stages():
+    pipeline = Pipeline([
+        _stage("analyze"),
+        _stage("upload", depends_on=["analyze"], result=RuntimeError("stockage indisponible"), retries=1),
+        _stage("transcribe", depends_on=["analyze"]),
+        _stage("index", depends_on=["upload", "transcribe"])
+    ])
+    state, _, _ = await _run(pipeline)
+    assert state["status"] == INGEST_FAILED
+    assert state["stages"]["upload"]["status"] == STAGE_FAILED
+    assert "stockage indisponible" in state["stages"]["upload"]["error"]
+    assert state["stages"]["transcribe"]["status"] == STAGE_DONE
+    assert state["stages"]["index"]["status"] == STAGE_BLOCKED
+
+@pytest.mark.asyncio
+async def test_skipped_stage_satisfies_dependents():
+    async def skip(context):
+        raise StageSkipped("transcription non demandée")
+
+    pipeline = Pipeline([Stage("transcribe", skip), _stage("embed", depends_on=["transcribe"])])
+    state, _, _ = await _run(pipeline)
+    assert state["stages"]["transcribe"]["status"] == STAGE_SKIPPED
+    assert state["stages"]["embed"]["status"] == STAGE_DONE
+
+@pytest.mark.asyncio
+async def test_resumption_skips_completed_stages():
+    pipeline = Pipeline([_stage("analyze"), _stage("upload", depends_on=["analyze"])])
+    state = {"stages": {"analyze": {"status": STAGE_DONE, "output": {"duplicate_of_id": None}}}}
+    state, context, _ = await _run(pipeline, state=state)
+    assert ("start", "analyze") not in context.calls
+    assert context.outputs["analyze"] == {"duplicate_of_id": None}
+    assert state["status"] == INGEST_READY
+
+def test_reset_ephemeral_stages_when_dependents_unfinished():
+    pipeline = Pipeline([
+        _stage("transcode", ephemeral=True),
+        _stage("upload", depends_on=["transcode"])
+    ])
+    state = {"stages": {"transcode": {"status": STAGE_DONE, "output": {"audio_path": "/tmp/disparu.mp3"}}}}
+    pipeline.reset_ephemeral_stages(state)
+    assert "transcode" not in state["stages"]
+
+    state = {"stages": {"transcode": {"status": STAGE_DONE}, "upload": {"status": STAGE_DONE}}}
+    pipeline.reset_ephemeral_stages(state)
+    assert "transcode" in state["stages"]
+
+def test_pipeline_rejects_cycles_and_unknown_dependencies():
+    with pytest.raises(ValueError):
+        Pipeline([_stage("a", depends_on=["b"]), _stage("b", depends_on=["a"])])
+    with pytest.raises(ValueError):
+        Pipeline([_stage("a", depends_on=["inconnue"])])
+
+# --- Étapes et exécution sur une base SQLite ---
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Pod.__table__, Tag.__table__, pod_tags, MediaObject.__table__])
+    return sessionmaker(bind=engine)
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    backend = LocalStorageBackend(root=str(tmp_path / "storage"), public_base_url="https://api.example.com/static/media")
+    monkeypatch.setattr(ingest_service.media_store_service.storage_service, "_storage_backend", backend)
+
+    async def probe_media(path):
+        return {"streams": [{"codec_type": "audio", "codec_name": "aac", "bit_rate": "96000", "sample_rate": "44100", "channels": 1}]}
+
+    monkeypatch.setattr(ingest_service.media_analysis_service.audio_service, "probe_media", probe_media)
+
+@pytest.mark.asyncio
+async def test_upload_stage_stores_extracted_audio(session_factory, storage, tmp_path):
+    db = session_factory()
+    db.add(Pod(id=1, title="Test"))
+    db.commit()
+    audio_path = tmp_path / "extrait.m4a"
+    audio_path.write_bytes(b"audio")
+    context = IngestContext(db=db, pod_id=1, source_path=str(tmp_path / "video.mp4"), audio_filename="1_video.mp3", user_id=1)
+    context.outputs = {"analyze": {"duplicate_of_id": None}, "transcode": {"audio_path": str(audio_path)}}
+
+    output = await ingest_service.upload_stage(context)
+
+    pod = db.get(Pod, 1)
+    assert pod.audio_file_url == output["audio_url"]
+    # Extension de l'audio extrait conservée (piste recopiée sans réencodage)
+    assert output["audio_url"].endswith(".m4a")
+    assert db.query(MediaObject).one().ref_count == 1
+    assert (pod.audio_bitrate, pod.audio_sample_rate, pod.audio_channels) == (96000, 44100, 1)
+    assert not audio_path.exists()
+
+@pytest.mark.asyncio
+async def test_run_pod_ingest_marks_unexpected_errors_failed(session_factory, tmp_path, monkeypatch):
+    source_path = tmp_path / "video.mp4"
+    source_path.write_bytes(b"video")
+    db = session_factory()
+    pod = Pod(id=1, title="Test")
+    db.add(pod)
+    context = IngestContext(db=db, pod_id=1, source_path=str(source_path), audio_filename="1_video.mp3", user_id=1)
+    ingest_service.start_pod_ingest(db, pod, context)
+
+    async def run(context, state, save_state):
+        raise RuntimeError("base indisponible")
+
+    monkeypatch.setattr(ingest_service, "SessionLocal", session_factory)
+    monkeypatch.setattr(ingest_service.INGEST_PIPELINE, "run", run)
+    assert await ingest_service.run_pod_ingest(1) is None
+
+    db.expire_all()
+    pod = db.get(Pod, 1)
+    assert pod.ingest_status == INGEST_FAILED
+    assert pod.ingest_state["error"] == "base indisponible"
+
+@pytest.mark.asyncio
+async def test_upload_stage_releases_reference_when_pod_update_fails(session_factory, storage, tmp_path, monkeypatch):
+    db = session_factory()
+    db.add(Pod(id=1, title="Test"))
+    db.commit()
+    audio_path = tmp_path / "extrait.m4a"
+    audio_path.write_bytes(b"audio")
+    context = IngestContext(db=db, pod_id=1, source_path=str(tmp_path / "video.mp4"), audio_filename="1_video.mp3", user_id=1)
+    context.outputs = {"analyze": {"duplicate_of_id": None}, "transcode": {"audio_path": str(audio_path)}}
+    commit = db.commit
+    commits = []
+
+    def failing_commit():
+        commits.append(1)
+        if len(commits) == 2:  # Enregistrement de l'URL sur le Pod
+            raise RuntimeError("connexion perdue")
+        commit()
+
+    monkeypatch.setattr(db, "commit", failing_commit)
+    with pytest.raises(RuntimeError):
+        await ingest_service.upload_stage(context)
+
+    assert db.get(Pod, 1).audio_file_url is None
+    assert db.query(MediaObject).one().ref_count == 0
+    # Audio extrait conservé pour la nouvelle tentative
+    assert audio_path.exists()
+
+@pytest.mark.asyncio
+async def test_renditions_stage_rerun_keeps_one_reference(session_factory, storage, tmp_path, monkeypatch):
+    async def run_ffmpeg(command, **kwargs):
+        # Contenu déterministe par sortie : une nouvelle tentative produit les mêmes fichiers
+        outputs = [arg for arg in command if os.path.isfile(arg)]
+        for index, path in enumerate(outputs):
+            with open(path, "wb") as output:
+                output.write(f"sortie {index}".encode())
+        return b""
+
+    monkeypatch.setattr(ingest_service.rendition_service, "run_ffmpeg", run_ffmpeg)
+    monkeypatch.setattr(ingest_service.settings, "RENDITIONS_ENABLED", True)
+    monkeypatch.setattr(ingest_service.settings, "RENDITION_BITRATES", "32k,64k")
+    db = session_factory()
+    db.add(Pod(id=1, title="Test"))
+    db.commit()
+    context = IngestContext(db=db, pod_id=1, source_path=str(tmp_path / "video.mp4"), audio_filename="1_video.mp3", user_id=1)
+    context.outputs = {"analyze": {"duplicate_of_id": None}}
+
+    assert await ingest_service.renditions_stage(context) == {"renditions": 2}
+    # Tentative interrompue après l'enregistrement sur le Pod, puis rejouée à la reprise
+    assert await ingest_service.renditions_stage(context) == {"renditions": 2}
+
+    pod = db.get(Pod, 1)
+    assert [rendition["bitrate"] for rendition in pod.audio_renditions] == [32, 64]
+    assert pod.preview_url
+    assert [media_object.ref_count for media_object in db.query(MediaObject).all()] == [1, 1, 1]
@@ -0,0 +1,68 @@
+# Tests pour le service media_analysis_service.py
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session
+
+from app.models.pod_model import Pod
+from app.services import media_analysis_service
+
+@pytest.fixture
+def fake_media(monkeypatch):
+    async def probe_media(path):
+        return {
+            "streams": [{"codec_type": "audio", "codec_name": "aac", "bit_rate": "128000", "sample_rate": "48000", "channels": 2}],
+            "format": {"duration": "3.2"}
+        }
+
+    async def decode_to_pcm(path, sample_rate=16000):
+        return np.full(3 * sample_rate, 0.25, dtype=np.float32)
+
+    monkeypatch.setattr(media_analysis_service.audio_service, "probe_media", probe_media)
+    monkeypatch.setattr(media_analysis_service.audio_service, "decode_to_pcm", decode_to_pcm)
+
+@pytest.mark.asyncio
+async def test_analyze_media_file(fake_media):
+    analysis = await media_analysis_service.analyze_media_file("/tmp/clip.mp4")
+    assert analysis.sample_rate == media_analysis_service.FINGERPRINT_SAMPLE_RATE
+    # Durée du conteneur prioritaire sur celle du signal décodé
+    assert analysis.duration_seconds == 3.2
+    assert analysis.waveform_peaks.shape[1] == 2
+
+@pytest.mark.asyncio
+async def test_save_pod_analysis_sets_columns(fake_media):
+    analysis = await media_analysis_service.analyze_media_file("/tmp/clip.mp4")
+    db = MagicMock(spec=Session)
+    pod = Pod(id=1, title="Test")
+
+    media_analysis_service.save_pod_analysis(db, pod, analysis)
+
+    assert pod.duration_seconds == 3.2
+    assert len(pod.waveform_peaks) == 2 * len(analysis.waveform_peaks)
+    # Caractéristiques de la piste de la vidéo d'origine : pas celles de la copie d'écoute
+    assert pod.audio_bitrate is None
+    db.commit.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_probe_audio_stream_sets_audio_format(fake_media):
+    pod = Pod(id=1, title="Test")
+    audio_stream = await media_analysis_service.probe_audio_stream("/tmp/clip.m4a")
+
+    media_analysis_service.apply_audio_format(pod, audio_stream)
+
+    assert pod.audio_bitrate == 128000
+    assert pod.audio_sample_rate == 48000
+    assert pod.audio_channels == 2
+
+@pytest.mark.asyncio
+async def test_probe_audio_stream_failure(monkeypatch):
+    async def probe_media(path):
+        raise media_analysis_service.FFmpegError(["ffprobe"], 1, b"Invalid data")
+
+    monkeypatch.setattr(media_analysis_service.audio_service, "probe_media", probe_media)
+    assert await media_analysis_service.probe_audio_stream("/tmp/clip.m4a") is None
+
+def test_duration_falls_back_to_decoded_signal():
+    analysis = media_analysis_service.MediaAnalysis(np.zeros(16000, dtype=np.float32), 8000, None)
+    assert analysis.duration_seconds == 2.0
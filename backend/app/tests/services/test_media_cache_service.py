@@ -0,0 +1,99 @@
+# Tests pour le service media_cache_service.py
+
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from app.services.media_cache_service import MediaCache
+
+URL = "https://storage.example.com/audio/pod.mp3"
+
+def _make_cache(tmp_path, handler, max_bytes=10_000, revalidate_seconds=0):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return MediaCache(str(tmp_path), max_bytes=max_bytes, revalidate_seconds=revalidate_seconds, client=client)
+
+@pytest.mark.asyncio
+async def test_fetch_downloads_once_then_revalidates_with_etag(tmp_path):
+    calls = []
+
+    def handler(request):
+        calls.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=b"audio-bytes", headers={"ETag": '"v1"'})
+
+    cache = _make_cache(tmp_path, handler)
+    first = await cache.fetch(URL)
+    second = await cache.fetch(URL)
+
+    assert first == second
+    assert first.endswith(".mp3")
+    with open(first, "rb") as cached:
+        assert cached.read() == b"audio-bytes"
+    assert calls == [None, '"v1"']
+
+@pytest.mark.asyncio
+async def test_fetch_within_revalidation_window_skips_network(tmp_path):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url)
+        return httpx.Response(200, content=b"data", headers={"ETag": '"v1"'})
+
+    cache = _make_cache(tmp_path, handler, revalidate_seconds=300)
+    await cache.fetch(URL)
+    await cache.fetch(URL)
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_fetch_replaces_entry_when_etag_changes(tmp_path):
+    versions = iter([(b"old", '"v1"'), (b"new", '"v2"')])
+
+    def handler(request):
+        content, etag = next(versions)
+        return httpx.Response(200, content=content, headers={"ETag": etag})
+
+    cache = _make_cache(tmp_path, handler)
+    old_path = await cache.fetch(URL)
+    new_path = await cache.fetch(URL)
+
+    assert old_path != new_path
+    assert not os.path.exists(old_path)
+    with open(new_path, "rb") as cached:
+        assert cached.read() == b"new"
+
+@pytest.mark.asyncio
+async def test_concurrent_fetches_download_once(tmp_path):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url)
+        return httpx.Response(200, content=b"x" * 100, headers={"ETag": '"v1"'})
+
+    cache = _make_cache(tmp_path, handler, revalidate_seconds=300)
+    paths = await asyncio.gather(*(cache.fetch(URL) for _ in range(5)))
+    assert len(set(paths)) == 1
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_eviction_keeps_total_size_under_limit(tmp_path):
+    def handler(request):
+        return httpx.Response(200, content=b"x" * 400, headers={"ETag": f'"{request.url.path}"'})
+
+    cache = _make_cache(tmp_path, handler, max_bytes=1000)
+    first = await cache.fetch("https://storage.example.com/a.mp3")
+    os.utime(first, (1, 1))  # Le plus ancien accès
+    await cache.fetch("https://storage.example.com/b.mp3")
+    await cache.fetch("https://storage.example.com/c.mp3")
+
+    remaining = [entry for entry in os.scandir(cache.data_directory)]
+    assert sum(entry.stat().st_size for entry in remaining) <= 1000
+    assert not os.path.exists(first)
+
+@pytest.mark.asyncio
+async def test_fetch_raises_on_http_error(tmp_path):
+    cache = _make_cache(tmp_path, lambda request: httpx.Response(404))
+    with pytest.raises(httpx.HTTPStatusError):
+        await cache.fetch(URL)
@@ -0,0 +1,120 @@
+# Tests pour le service media_fetch_service.py
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.media_fetch_service import HedgedReader, LatencyTracker
+
+URL = "https://storage.example.com/audio/pod.mp3"
+HOST = "https://storage.example.com"
+
+def make_reader(handler, **kwargs):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    kwargs.setdefault("backoff_base_seconds", 0)
+    return HedgedReader(client=client, **kwargs)
+
+def warm_up(reader, latency=0.01, samples=20):
+    reader.requests = samples
+    for _ in range(samples):
+        reader._latencies.setdefault(HOST, LatencyTracker()).record(latency)
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker()
+    for value in range(1, 101):
+        tracker.record(value / 100)
+    assert tracker.percentile(0.95) == 0.96
+    assert LatencyTracker().percentile(0.95) is None
+
+@pytest.mark.asyncio
+async def test_hedge_fires_when_primary_exceeds_p95():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        # La première requête est lente, la requête de couverture répond tout de suite
+        if len(calls) == 1:
+            await asyncio.sleep(0.5)
+        return httpx.Response(200, content=f"copy-{len(calls)}".encode())
+
+    reader = make_reader(handler)
+    warm_up(reader)
+
+    response = await reader.get(URL)
+
+    assert await response.aread() == b"copy-2"
+    assert reader.hedges_fired == 1
+    assert reader.hedges_won == 1
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_latency_history():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, content=b"audio")
+
+    reader = make_reader(handler)
+    response = await reader.get(URL)
+
+    assert await response.aread() == b"audio"
+    assert len(calls) == 1
+    assert reader.hedges_fired == 0
+
+@pytest.mark.asyncio
+async def test_hedge_budget_limits_extra_requests():
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, content=b"audio")
+
+    reader = make_reader(handler, max_hedge_ratio=0.1)
+    warm_up(reader, samples=20)
+    reader.hedges_fired = 3
+
+    await reader.get(URL)
+
+    assert reader.hedges_fired == 3
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors_with_backoff():
+    responses = iter([httpx.Response(503), httpx.ConnectError("refused"), httpx.Response(200, content=b"audio")])
+
+    def handler(request):
+        result = next(responses)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    reader = make_reader(handler, max_retries=2)
+    response = await reader.get(URL)
+
+    assert response.status_code == 200
+    assert reader.retries == 2
+    assert reader.failures == 0
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+    def handler(request):
+        raise httpx.ConnectError("refused")
+
+    reader = make_reader(handler, max_retries=1)
+    with pytest.raises(httpx.ConnectError):
+        await reader.get(URL)
+    assert reader.retries == 1
+    assert reader.failures == 1
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(404)
+
+    reader = make_reader(handler, max_retries=2)
+    response = await reader.get(URL)
+
+    assert response.status_code == 404
+    assert len(calls) == 1
@@ -0,0 +1,108 @@
+# Tests pour le service media_gc_service.py
+
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.media_object_model import MediaObject
+from app.models.pod_model import Pod
+from app.models.profile_model import Profile
+from app.models.tag_model import Tag, pod_tags
+from app.models.upload_session_model import UploadSession
+from app.services import media_gc_service
+from app.services.storage_service import LocalStorageBackend
+
+BASE_URL = "https://api.example.com/static/media"
+OLD = datetime.utcnow() - timedelta(days=3)
+
+@pytest.fixture
+def db():
+    # Connexion unique partagée : les parcours des tables s'exécutent dans un thread (asyncio.to_thread)
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    tables = [Pod.__table__, Tag.__table__, pod_tags, Profile.__table__, MediaObject.__table__, UploadSession.__table__]
+    Base.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    root = tmp_path / "storage"
+    monkeypatch.setattr(media_gc_service.storage_service, "_storage_backend", LocalStorageBackend(root=str(root), public_base_url=BASE_URL))
+    monkeypatch.setattr(media_gc_service.settings, "UPLOAD_SPOOL_DIR", str(tmp_path / "spool"))
+    monkeypatch.setattr(media_gc_service.settings, "MEDIA_GC_GRACE_SECONDS", 3600)
+    monkeypatch.setattr(media_gc_service.settings, "MEDIA_GC_BATCH_SIZE", 2)
+    monkeypatch.setattr(media_gc_service.settings, "MEDIA_GC_BATCH_PAUSE_SECONDS", 0)
+    return root
+
+def put_file(root, key, content, age_seconds=0):
+    path = root / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    modified = time.time() - age_seconds
+    os.utime(path, (modified, modified))
+    return path
+
+@pytest.mark.asyncio
+async def test_gc_deletes_orphans_and_unreferenced_objects(db, storage):
+    put_file(storage, "audio/1/kept.mp3", b"kept", age_seconds=7200)
+    put_file(storage, "audio/1/orphan.mp3", b"orphan!", age_seconds=7200)
+    put_file(storage, "audio/1/recent.mp3", b"recent", age_seconds=10)
+    put_file(storage, "media/ab/released.mp3", b"released", age_seconds=7200)
+    put_file(storage, "media/cd/shared.mp3", b"shared", age_seconds=7200)
+    db.add(Pod(title="Pod", audio_file_url=f"{BASE_URL}/audio/1/kept.mp3"))
+    db.add(MediaObject(sha256="ab" * 32, key="media/ab/released.mp3", url=f"{BASE_URL}/media/ab/released.mp3", size=8, ref_count=0, updated_at=OLD))
+    db.add(MediaObject(sha256="cd" * 32, key="media/cd/shared.mp3", url=f"{BASE_URL}/media/cd/shared.mp3", size=6, ref_count=1, updated_at=OLD))
+    db.commit()
+
+    report = await media_gc_service.run_media_gc(db)
+
+    remaining = sorted(str(path.relative_to(storage)) for path in storage.rglob("*") if path.is_file())
+    assert remaining == ["audio/1/kept.mp3", "audio/1/recent.mp3", "media/cd/shared.mp3"]
+    assert report["unreferenced"]["deleted"] == 1
+    assert report["orphaned"]["deleted"] == 1
+    assert report["bytes_reclaimed"] == len(b"released") + len(b"orphan!")
+    assert db.query(MediaObject).count() == 1
+    assert media_gc_service.get_gc_report() is report
+
+def test_collect_referenced_urls(db):
+    db.add(Pod(
+        title="Pod", audio_file_url="a.mp3", preview_url="p.mp3",
+        audio_renditions=[{"name": "opus-32k", "url": "r32.opus"}], transcription="texte " * 1000
+    ))
+    db.add(Pod(title="Sans audio"))
+    db.add(Profile(user_id=1, profile_picture_url="v128.webp", avatar_variants={"64": "v64.webp", "128": "v128.webp"}))
+    db.commit()
+
+    assert media_gc_service.collect_referenced_urls(db) == {"a.mp3", "p.mp3", "r32.opus", "v64.webp", "v128.webp"}
+
+@pytest.mark.asyncio
+async def test_gc_keeps_recently_released_objects(db, storage):
+    put_file(storage, "media/ab/released.mp3", b"released", age_seconds=7200)
+    db.add(MediaObject(sha256="ab" * 32, key="media/ab/released.mp3", url=f"{BASE_URL}/media/ab/released.mp3", size=8, ref_count=0))
+    db.commit()
+
+    report = await media_gc_service.run_media_gc(db)
+
+    assert report["bytes_reclaimed"] == 0
+    assert (storage / "media/ab/released.mp3").exists()
+
+@pytest.mark.asyncio
+async def test_gc_removes_abandoned_spool_files(db, storage, tmp_path):
+    spool = tmp_path / "spool" / "spotbulle-uploads"
+    abandoned = put_file(spool, "abandoned.mp4", b"video", age_seconds=7200)
+    active = put_file(spool, "active.mp4", b"video", age_seconds=7200)
+    db.add(UploadSession(id="a" * 32, user_id=1, upload_length=5, spool_path=str(active), expires_at=datetime.utcnow() + timedelta(hours=1)))
+    db.commit()
+
+    report = await media_gc_service.run_media_gc(db)
+
+    assert report["temp_files"]["deleted"] == 1
+    assert not abandoned.exists()
+    assert active.exists()
@@ -0,0 +1,69 @@
+# Tests pour le service media_serving_service.py
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from app.services import media_serving_service
+
+SHA256 = "ab" * 32
+
+@pytest.fixture
+def media_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(media_serving_service.settings, "STORAGE_LOCAL_DIR", str(tmp_path))
+    monkeypatch.setattr(media_serving_service.settings, "MEDIA_ACCEL_REDIRECT_PREFIX", None)
+    (tmp_path / "ab").mkdir()
+    (tmp_path / "ab" / f"{SHA256}.mp3").write_bytes(bytes(range(256)) * 8)
+    (tmp_path / "episode.mp3").write_bytes(b"named audio")
+    return tmp_path
+
+@pytest.fixture
+def client(media_dir):
+    app = FastAPI()
+
+    @app.api_route("/static/media/{path:path}", methods=["GET", "HEAD"])
+    async def serve(path: str, request: Request):
+        return media_serving_service.build_media_response(request, "media", path)
+
+    return TestClient(app)
+
+def test_is_content_addressed():
+    assert media_serving_service.is_content_addressed(f"{SHA256}.mp3")
+    assert media_serving_service.is_content_addressed("0123456789abcdef01234567-128.webp")
+    assert not media_serving_service.is_content_addressed("episode.mp3")
+
+def test_etag_matches():
+    assert media_serving_service.etag_matches('"x", W/"abc"', '"abc"')
+    assert media_serving_service.etag_matches("*", '"abc"')
+    assert not media_serving_service.etag_matches('"other"', '"abc"')
+    assert not media_serving_service.etag_matches(None, '"abc"')
+
+def test_resolve_media_path_rejects_traversal(media_dir):
+    with pytest.raises(HTTPException):
+        media_serving_service.resolve_media_path("media", "../outside.mp3")
+    with pytest.raises(HTTPException):
+        media_serving_service.resolve_media_path("unknown", "episode.mp3")
+
+def test_range_request_on_content_addressed_file(client):
+    response = client.get(f"/static/media/ab/{SHA256}.mp3", headers={"Range": "bytes=100-199"})
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == "bytes 100-199/2048"
+    assert response.content == (bytes(range(256)) * 8)[100:200]
+    assert response.headers["etag"] == f'"{SHA256}"'
+    assert "immutable" in response.headers["cache-control"]
+
+def test_conditional_request_returns_304(client):
+    etag = client.get("/static/media/episode.mp3").headers["etag"]
+    response = client.get("/static/media/episode.mp3", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert "immutable" not in response.headers["cache-control"]
+
+def test_accel_redirect_delegates_body(client, monkeypatch):
+    monkeypatch.setattr(media_serving_service.settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "/_protected/")
+    response = client.get("/static/media/episode.mp3")
+
+    assert response.headers["x-accel-redirect"] == "/_protected/media/episode.mp3"
+    assert response.content == b""
@@ -0,0 +1,87 @@
+# Tests pour le service media_store_service.py
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.media_object_model import MediaObject
+from app.services import media_store_service
+from app.services.storage_service import LocalStorageBackend
+
+@pytest.fixture
+def db():
+    # Base SQLite en mémoire limitée à la table media_objects (compteurs mis à jour en SQL)
+    engine = create_engine("sqlite://")
+    MediaObject.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    backend = LocalStorageBackend(root=str(tmp_path / "storage"), public_base_url="https://api.example.com/static/media")
+    monkeypatch.setattr(media_store_service.storage_service, "_storage_backend", backend)
+    return tmp_path / "storage"
+
+def stored_files(storage):
+    return sorted(path.name for path in storage.rglob("*") if path.is_file())
+
+@pytest.mark.asyncio
+async def test_store_media_file_deduplicates(db, storage, tmp_path):
+    first = tmp_path / "a.mp3"
+    second = tmp_path / "b.mp3"
+    first.write_bytes(b"same audio")
+    second.write_bytes(b"same audio")
+
+    first_object = await media_store_service.store_media_file(db, str(first), "episode.mp3")
+    second_object = await media_store_service.store_media_file(db, str(second), "other-name.mp3")
+
+    assert first_object.url == second_object.url
+    assert first_object.url.endswith(f"/media/{first_object.sha256[:2]}/{first_object.sha256}.mp3")
+    assert db.query(MediaObject).one().ref_count == 2
+    assert len(stored_files(storage)) == 1
+
+@pytest.mark.asyncio
+async def test_release_media_only_decrements(db, storage, tmp_path):
+    audio = tmp_path / "a.mp3"
+    audio.write_bytes(b"audio")
+    url = (await media_store_service.store_media_file(db, str(audio), "a.mp3")).url
+    media_store_service.acquire_media(db, url)
+
+    assert media_store_service.release_media(db, url) is False
+    assert media_store_service.release_media(db, url) is True
+    # Suppression différée au ramasse-miettes (media_gc_service)
+    assert len(stored_files(storage)) == 1
+    assert db.query(MediaObject).one().ref_count == 0
+
+def test_release_media_ignores_unknown_urls(db, storage):
+    assert media_store_service.release_media(db, "https://storage.example.com/audio/7_legacy.mp3") is False
+    assert media_store_service.release_media(db, None) is False
+
+@pytest.mark.asyncio
+async def test_store_media_stream_drops_duplicate_upload(db, storage, tmp_path):
+    audio = tmp_path / "a.ogg"
+    audio.write_bytes(b"encoded audio")
+    stored = await media_store_service.store_media_file(db, str(audio), "a.ogg")
+
+    async def chunks():
+        yield b"encoded "
+        yield b"audio"
+
+    streamed = await media_store_service.store_media_stream(db, chunks(), "b.ogg")
+
+    assert streamed.url == stored.url
+    assert streamed.ref_count == 2
+    # La copie provisoire envoyée en flux a été supprimée
+    assert stored_files(storage) == [f"{stored.sha256}.ogg"]
+
+@pytest.mark.asyncio
+async def test_store_media_stream_new_content(db, storage):
+    async def chunks():
+        yield b"new audio"
+
+    media_object = await media_store_service.store_media_stream(db, chunks(), "clip.ogg")
+
+    assert media_object.ref_count == 1
+    assert media_object.size == len(b"new audio")
+    assert "/media/incoming/" in media_object.url
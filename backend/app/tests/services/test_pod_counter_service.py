@@ -0,0 +1,127 @@
+# Tests pour le service pod_counter_service.py
+
+import os
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.counter_batch_model import CounterBatch
+from app.models.pod_like_model import PodLike
+from app.models.pod_model import Pod
+from app.models.tag_model import Tag, pod_tags
+from app.services import pod_counter_service, pod_service
+from app.services.pod_counter_service import CounterBuffer
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    tables = [Pod.__table__, Tag.__table__, pod_tags, PodLike.__table__, CounterBatch.__table__]
+    Base.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+    session.add_all([Pod(id=1, title="Pod 1"), Pod(id=2, title="Pod 2")])
+    session.commit()
+    yield session
+    session.close()
+
+@pytest.fixture
+def journal_dir(tmp_path):
+    return str(tmp_path / "journal")
+
+@pytest.fixture
+def buffer(journal_dir, monkeypatch):
+    buffer = CounterBuffer(journal_dir=journal_dir)
+    monkeypatch.setattr(pod_counter_service, "counter_buffer", buffer)
+    return buffer
+
+def stored_counts(db, pod_id):
+    db.expire_all()
+    pod = db.get(Pod, pod_id)
+    return pod.play_count, pod.like_count
+
+def test_plays_are_buffered_then_flushed_in_one_update_per_pod(db, buffer, journal_dir):
+    for _ in range(50):
+        pod_service.record_play(db, 1, user_id=7)
+    result = pod_service.record_play(db, 2, user_id=7)
+
+    assert result == {"total_plays": 1}
+    assert stored_counts(db, 1) == (0, 0)
+
+    assert buffer.flush(db) == 2
+    assert stored_counts(db, 1) == (50, 0)
+    assert pod_service.record_play(db, 1, user_id=7) == {"total_plays": 51}
+    # Les segments reportés sont supprimés avec leur trace dans counter_batches
+    buffer.flush(db)
+    assert os.listdir(journal_dir) == []
+    assert db.query(CounterBatch).count() == 0
+
+def test_toggle_like_deduplicates_per_user(db, buffer):
+    assert pod_service.toggle_like(db, 1, user_id=7) == {"liked": True, "total_likes": 1}
+    assert pod_service.toggle_like(db, 1, user_id=8) == {"liked": True, "total_likes": 2}
+    assert pod_service.toggle_like(db, 1, user_id=7) == {"liked": False, "total_likes": 1}
+
+    buffer.flush(db)
+    assert stored_counts(db, 1) == (0, 1)
+    assert [like.user_id for like in db.query(PodLike).all()] == [8]
+
+def test_unknown_pod_is_rejected(db, buffer):
+    with pytest.raises(HTTPException) as exc_info:
+        pod_service.record_play(db, 99, user_id=7)
+    assert exc_info.value.status_code == 404
+    assert buffer.events == 0
+
+def test_failed_flush_keeps_events(db, buffer, monkeypatch):
+    buffer.record(1, plays=3)
+
+    def fail(*args):
+        raise RuntimeError("base indisponible")
+
+    monkeypatch.setattr(pod_counter_service, "apply_counts", fail)
+    with pytest.raises(RuntimeError):
+        buffer.flush(db)
+    monkeypatch.undo()
+
+    buffer.record(1, plays=2)
+    buffer.flush(db)
+    assert stored_counts(db, 1) == (5, 0)
+
+def test_journal_is_replayed_after_crash(db, journal_dir):
+    crashed = CounterBuffer(journal_dir=journal_dir)
+    crashed.record(1, plays=2)
+    crashed.record(2, plays=1, likes=1)
+    crashed.record(1, plays=1)
+    # Une ligne tronquée par l'arrêt est ignorée
+    crashed._segments[-1].file.write("1 40")
+    crashed._segments[-1].file.close()
+
+    restarted = CounterBuffer(journal_dir=journal_dir)
+    assert restarted.recover(db) == 1
+    assert stored_counts(db, 1) == (3, 0)
+    assert stored_counts(db, 2) == (1, 1)
+    assert os.listdir(journal_dir) == []
+    assert restarted.recover(db) == 0
+
+def test_already_applied_segment_is_not_counted_twice(db, journal_dir):
+    crashed = CounterBuffer(journal_dir=journal_dir)
+    crashed.record(1, plays=4)
+    segment = crashed._segments[-1]
+    # Arrêt entre la validation du report et la suppression du segment
+    pod_counter_service.apply_counts(db, {1: [4, 0]}, [segment.id])
+    segment.file.close()
+
+    assert CounterBuffer(journal_dir=journal_dir).recover(db) == 0
+    assert stored_counts(db, 1) == (4, 0)
+    assert os.listdir(journal_dir) == []
+
+@pytest.mark.skipif(pod_counter_service.fcntl is None, reason="flock indisponible")
+def test_segments_of_running_processes_are_left_alone(db, journal_dir):
+    running = CounterBuffer(journal_dir=journal_dir)
+    running.record(1, plays=1)
+
+    assert CounterBuffer(journal_dir=journal_dir).recover(db) == 0
+    assert stored_counts(db, 1) == (0, 0)
+
+    running.flush(db)
+    assert stored_counts(db, 1) == (1, 0)
@@ -0,0 +1,64 @@
+# Tests pour le service pod_search_service.py
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.pod_model import Pod
+from app.models.tag_model import Tag, pod_tags
+from app.services import pod_search_service, pod_service
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Pod.__table__, Tag.__table__, pod_tags])
+    session = sessionmaker(bind=engine)()
+    # Pod antérieur à la création de l'index : indexé par la reconstruction initiale
+    session.add(Pod(id=1, title="Recette de la ratatouille", description="Cuisine provençale"))
+    session.commit()
+    pod_search_service.ensure_search_index(engine)
+    session.add(Pod(id=2, title="Entretien", description="Parcours d'une cheffe", transcription="Ma première ratatouille était ratée."))
+    session.add(Pod(id=3, title="Jardinage", description="Tomates et courgettes"))
+    session.commit()
+    yield session
+    session.close()
+
+def test_build_match_query_quotes_words():
+    assert pod_search_service.build_match_query('cafe "OR" NEAR(') == '"cafe" "OR" "NEAR"*'
+    assert pod_search_service.build_match_query("  ?! ") is None
+
+def test_search_ranks_title_matches_first(db):
+    results = pod_search_service.search_pods(db, "ratatouille")
+
+    assert [result["pod"].id for result in results] == [1, 2]
+    assert results[0]["rank"] > results[1]["rank"]
+    assert "<mark>ratatouille</mark>" in results[1]["snippet"].lower()
+
+def test_search_ignores_accents_and_matches_prefix(db):
+    assert [result["pod"].id for result in pod_search_service.search_pods(db, "provencale")] == [1]
+    assert [result["pod"].id for result in pod_search_service.search_pods(db, "courg")] == [3]
+
+def test_index_follows_updates_and_deletes(db):
+    pod = db.query(Pod).filter(Pod.id == 3).one()
+    pod.transcription = "On plante la ratatouille au printemps"
+    db.commit()
+    assert {result["pod"].id for result in pod_search_service.search_pods(db, "printemps")} == {3}
+
+    db.delete(pod)
+    db.commit()
+    assert pod_search_service.search_pods(db, "printemps") == []
+
+def test_snippet_is_html_escaped(db):
+    db.add(Pod(id=4, title="Balises", transcription="<script>alert(1)</script> ratatouille"))
+    db.commit()
+
+    snippet = pod_search_service.search_pods(db, "alert")[0]["snippet"]
+
+    assert "<script>" not in snippet
+    assert "&lt;script&gt;" in snippet
+    assert "<mark>alert</mark>" in snippet
+
+def test_pod_listing_search_uses_index(db):
+    pods, _ = pod_service.get_pods_page(db, limit=10, search="ratatouille")
+    assert sorted(pod.id for pod in pods) == [1, 2]
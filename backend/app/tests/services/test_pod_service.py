@@ -2,12 +2,15 @@
 
 import pytest
 from unittest.mock import MagicMock, patch, AsyncMock # Ajout de AsyncMock
-from sqlalchemy.orm import Session
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
 from fastapi import HTTPException, UploadFile
+from datetime import datetime
 import io
 
 from app.services import pod_service, storage_service # Assurez-vous que transcription_service est importé si utilisé
-from app.models import pod_model, user_model
+from app.database import Base
+from app.models import pod_model, tag_model, user_model
 from app.schemas import pod_schema
 
 @pytest.fixture
@@ -37,7 +40,7 @@ def mock_existing_pod(mock_current_user):
         audio_file_url="http://example.com/audio.mp3",
         transcription=None,
         owner_id=mock_current_user.id, # S_assurer que owner_id est cohérent
-        tags=["existant"]
+        tags=[tag_model.Tag(name="existant")]
     )
 
 @pytest.fixture
@@ -162,11 +165,49 @@ def test_get_pods_by_user_id(db_session_mock, mock_existing_pod):
 
 # --- Tests pour get_all_pods ---
 def test_get_all_pods(db_session_mock, mock_existing_pod):
-    db_session_mock.query.return_value.offset.return_value.limit.return_value.all.return_value = [mock_existing_pod]
+    db_session_mock.query.return_value.order_by.return_value.limit.return_value.all.return_value = [mock_existing_pod]
     pods = pod_service.get_all_pods(db=db_session_mock, skip=0, limit=10)
     assert len(pods) == 1
     assert pods[0] == mock_existing_pod
 
+# --- Tests pour get_pods_page (pagination par curseur) ---
+@pytest.fixture
+def sqlite_db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[pod_model.Pod.__table__, tag_model.Tag.__table__, tag_model.pod_tags])
+    db = sessionmaker(bind=engine)()
+    # Deux Pods partagent la même date : l'identifiant départage
+    created_at = [datetime(2024, 1, day) for day in (1, 2, 2, 3, 4)]
+    for index, date in enumerate(created_at, start=1):
+        db.add(pod_model.Pod(id=index, title=f"Pod {index}", owner_id=1 if index % 2 else 2, created_at=date))
+    db.commit()
+    yield db
+    db.close()
+
+def test_get_pods_page_walks_all_pods_with_cursor(sqlite_db):
+    first_page, cursor = pod_service.get_pods_page(sqlite_db, limit=2)
+    assert [pod.id for pod in first_page] == [5, 4]
+
+    # Une insertion entre deux pages ne décale pas la suite
+    sqlite_db.add(pod_model.Pod(id=6, title="Pod 6", owner_id=1))
+    sqlite_db.commit()
+
+    second_page, cursor = pod_service.get_pods_page(sqlite_db, limit=2, cursor=cursor)
+    third_page, last_cursor = pod_service.get_pods_page(sqlite_db, limit=2, cursor=cursor)
+    assert [pod.id for pod in second_page] == [3, 2]
+    assert [pod.id for pod in third_page] == [1]
+    assert last_cursor is None
+
+def test_get_pods_page_filters_owner(sqlite_db):
+    pods, cursor = pod_service.get_pods_page(sqlite_db, limit=10, owner_id=2)
+    assert [pod.id for pod in pods] == [4, 2]
+    assert cursor is None
+
+def test_get_pods_page_rejects_invalid_cursor(sqlite_db):
+    with pytest.raises(HTTPException) as exc_info:
+        pod_service.get_pods_page(sqlite_db, limit=2, cursor="pas-un-curseur")
+    assert exc_info.value.status_code == 400
+
 # --- Tests pour update_pod ---
 @patch("app.services.storage_service.upload_file_to_storage", new_callable=AsyncMock)
 @patch("app.services.storage_service.delete_file_from_storage", new_callable=AsyncMock)
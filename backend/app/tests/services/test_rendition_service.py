@@ -0,0 +1,86 @@
+# Tests pour le service rendition_service.py
+
+import os
+import pytest
+
+from app.services import rendition_service
+
+RENDITIONS = [
+    {"name": "opus-128k", "codec": "libopus", "bitrate": 128, "url": "https://cdn.example.com/a.opus-128k.webm"},
+    {"name": "opus-32k", "codec": "libopus", "bitrate": 32, "url": "https://cdn.example.com/a.opus-32k.webm"},
+    {"name": "opus-64k", "codec": "libopus", "bitrate": 64, "url": "https://cdn.example.com/a.opus-64k.webm"}
+]
+
+def test_get_rendition_profiles_sorted_by_bitrate(monkeypatch):
+    monkeypatch.setattr(rendition_service.settings, "RENDITION_BITRATES", "128k, 32k,64k")
+    profiles = rendition_service.get_rendition_profiles()
+    assert [profile["kbps"] for profile in profiles] == [32, 64, 128]
+    assert profiles[0]["name"] == "opus-32k"
+    assert profiles[0]["channels"] == 1
+
+def test_select_rendition_without_renditions():
+    assert rendition_service.select_rendition(None) is None
+    assert rendition_service.select_rendition([]) is None
+
+def test_select_rendition_defaults_to_highest():
+    assert rendition_service.select_rendition(RENDITIONS)["bitrate"] == 128
+
+def test_select_rendition_save_data_and_quality():
+    assert rendition_service.select_rendition(RENDITIONS, save_data=True)["bitrate"] == 32
+    assert rendition_service.select_rendition(RENDITIONS, quality="medium")["bitrate"] == 64
+    # Un choix explicite l'emporte sur les indications de connexion
+    assert rendition_service.select_rendition(RENDITIONS, ect="2g", quality="high")["bitrate"] == 128
+    assert rendition_service.select_rendition(RENDITIONS, save_data=True, quality="high")["bitrate"] == 128
+
+def test_select_rendition_from_network_hints():
+    assert rendition_service.select_rendition(RENDITIONS, ect="3g")["bitrate"] == 64
+    assert rendition_service.select_rendition(RENDITIONS, ect="4g")["bitrate"] == 128
+    # 0,15 Mbit/s : 75 kbit/s pour l'audio
+    assert rendition_service.select_rendition(RENDITIONS, downlink=0.15)["bitrate"] == 64
+    # Budget inférieur à la plus légère : on sert tout de même la plus légère
+    assert rendition_service.select_rendition(RENDITIONS, downlink=0.01)["bitrate"] == 32
+
+@pytest.mark.asyncio
+async def test_transcode_renditions_single_ffmpeg_pass(monkeypatch):
+    commands = []
+
+    async def run_ffmpeg(command, **kwargs):
+        commands.append(command)
+        return b""
+
+    monkeypatch.setattr(rendition_service, "run_ffmpeg", run_ffmpeg)
+    monkeypatch.setattr(rendition_service.settings, "RENDITION_BITRATES", "32k,64k")
+
+    outputs = await rendition_service.transcode_renditions("/tmp/source.mp4")
+    try:
+        assert len(commands) == 1
+        command = commands[0]
+        assert command.count("-i") == 1
+        assert command.count("-map") == 3
+        assert set(outputs) == {"opus-32k", "opus-64k", rendition_service.PREVIEW_NAME}
+        # L'extrait est limité à PREVIEW_SECONDS
+        assert command[command.index("-t") + 1] == str(rendition_service.settings.PREVIEW_SECONDS)
+        assert command[-1] == outputs[rendition_service.PREVIEW_NAME]
+    finally:
+        for path in outputs.values():
+            os.unlink(path)
+
+@pytest.mark.asyncio
+async def test_transcode_renditions_cleans_up_on_failure(monkeypatch):
+    created = []
+    original = rendition_service.tempfile.NamedTemporaryFile
+
+    def named_temporary_file(*args, **kwargs):
+        handle = original(*args, **kwargs)
+        created.append(handle.name)
+        return handle
+
+    async def run_ffmpeg(command, **kwargs):
+        raise RuntimeError("ffmpeg")
+
+    monkeypatch.setattr(rendition_service.tempfile, "NamedTemporaryFile", named_temporary_file)
+    monkeypatch.setattr(rendition_service, "run_ffmpeg", run_ffmpeg)
+
+    with pytest.raises(RuntimeError):
+        await rendition_service.transcode_renditions("/tmp/source.mp4")
+    assert created and not any(os.path.exists(path) for path in created)
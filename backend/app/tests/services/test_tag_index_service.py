@@ -0,0 +1,84 @@
+# Tests pour le service tag_index_service.py
+
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.pod_model import Pod
+from app.models.tag_model import Tag, pod_tags
+from app.services import pod_service, tag_index_service, tag_service
+from app.services.tag_index_service import TagIndex
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Pod.__table__, Tag.__table__, pod_tags])
+    session = sessionmaker(bind=engine)()
+    for tags in (["jazz", "java"], ["jazz", "Jam Session"], ["jazz"], ["rock"]):
+        pod_service.create_pod(session, title="Pod", description=None, tags=tags, audio_url=None, owner_id=1)
+    monkeypatch.setattr(tag_index_service, "tag_index", TagIndex(refresh_seconds=3600))
+    yield session
+    session.close()
+
+def names(suggestions):
+    return [suggestion["name"] for suggestion in suggestions]
+
+def test_suggest_orders_by_usage_then_name(db):
+    assert tag_index_service.suggest_tags(db, "ja") == [
+        {"name": "jazz", "pod_count": 3},
+        {"name": "jam session", "pod_count": 1},
+        {"name": "java", "pod_count": 1}
+    ]
+    assert names(tag_index_service.suggest_tags(db, "  JAM ")) == ["jam session"]
+    assert names(tag_index_service.suggest_tags(db, "", limit=2)) == ["jazz", "jam session"]
+    assert tag_index_service.suggest_tags(db, "x") == []
+
+def test_suggest_does_not_query_database_once_loaded(db):
+    tag_index_service.suggest_tags(db, "j")
+
+    # Sans session : une requête en base échouerait
+    assert names(tag_index_service.suggest_tags(None, "ro")) == ["rock"]
+
+    assert tag_index_service.tag_index.loads == 1
+
+def test_committed_tag_writes_update_index(db):
+    tag_index_service.suggest_tags(db, "j")
+
+    pod = pod_service.create_pod(db, title="Pod", description=None, tags=["Javascript", "java"], audio_url=None, owner_id=1)
+    assert tag_index_service.suggest_tags(db, "jav") == [
+        {"name": "java", "pod_count": 2},
+        {"name": "javascript", "pod_count": 1}
+    ]
+
+    pod_service.delete_pod(db, pod.id)
+    assert names(tag_index_service.suggest_tags(db, "jav")) == ["java"]
+    assert tag_index_service.tag_index.loads == 1
+
+def test_rolled_back_writes_are_ignored(db):
+    tag_index_service.suggest_tags(db, "j")
+
+    pod = db.query(Pod).first()
+    tag_service.set_pod_tags(db, pod, ["blues"])
+    db.rollback()
+
+    assert tag_index_service.suggest_tags(db, "b") == []
+
+def test_recount_triggers_reload(db):
+    tag_index_service.suggest_tags(db, "j")
+    tag_service.recount_tags(db)
+    tag_index_service.suggest_tags(db, "j")
+    assert tag_index_service.tag_index.loads == 2
+
+def test_suggest_is_fast_on_large_index():
+    index = TagIndex(refresh_seconds=3600)
+    index._names = sorted(f"tag{number:06d}" for number in range(50000))
+    index._counts = {name: len(name) for name in index._names}
+    index._loaded_at = time.monotonic()
+
+    started = time.perf_counter()
+    for _ in range(100):
+        index.suggest(None, "tag0123")
+    assert (time.perf_counter() - started) / 100 < 0.001
@@ -0,0 +1,98 @@
+# Tests pour le service tag_service.py
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.pod_model import Pod
+from app.models.tag_model import Tag, pod_tags
+from app.services import pod_service, tag_service
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Pod.__table__, Tag.__table__, pod_tags])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+def make_pod(db, tags):
+    return pod_service.create_pod(db, title="Pod", description=None, tags=tags, audio_url=None, owner_id=1)
+
+def counts(db):
+    return {tag.name: tag.pod_count for tag in db.query(Tag).all()}
+
+def test_normalize_tags_deduplicates():
+    assert tag_service.normalize_tags([" Jazz ", "jazz", "Hip  Hop", "", "  "]) == ["jazz", "hip hop"]
+
+def test_counts_follow_pod_writes(db):
+    first = make_pod(db, ["Jazz", "Live"])
+    second = make_pod(db, ["jazz"])
+    assert counts(db) == {"jazz": 2, "live": 1}
+    assert [tag.name for tag in first.tags] == ["jazz", "live"]
+
+    pod_service.update_pod(db, first.id, {"tags": ["live", "soul"]})
+    assert counts(db) == {"jazz": 1, "live": 1, "soul": 1}
+
+    pod_service.delete_pod(db, second.id)
+    assert counts(db) == {"jazz": 0, "live": 1, "soul": 1}
+    assert [tag.name for tag in tag_service.get_popular_tags(db)] == ["live", "soul"]
+
+def test_filter_any_and_all(db):
+    jazz = make_pod(db, ["jazz"])
+    both = make_pod(db, ["jazz", "live"])
+    live = make_pod(db, ["live"])
+
+    def filtered(tags, match_all):
+        pods, _ = pod_service.get_pods_page(db, limit=10, tags=tags, match_all_tags=match_all)
+        return sorted(pod.id for pod in pods)
+
+    assert filtered(["Jazz", "live"], False) == sorted([jazz.id, both.id, live.id])
+    assert filtered(["jazz", "live"], True) == [both.id]
+    assert filtered(["jazz", "inconnu"], False) == [jazz.id, both.id]
+    assert filtered(["jazz", "inconnu"], True) == []
+
+def test_recount_repairs_counts(db):
+    make_pod(db, ["jazz"])
+    db.execute(text("UPDATE tags SET pod_count = 42"))
+    db.commit()
+
+    tag_service.recount_tags(db)
+
+    assert counts(db) == {"jazz": 1}
+
+def test_migrate_legacy_text_column():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Tag.__table__, pod_tags])
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE pods (id INTEGER PRIMARY KEY, tags TEXT)"))
+        connection.execute(text("""INSERT INTO pods VALUES (1, 'Jazz, live'), (2, '["jazz"]'), (3, NULL)"""))
+
+    tag_service.migrate_legacy_tags(engine)
+    tag_service.migrate_legacy_tags(engine)
+
+    with engine.connect() as connection:
+        links = connection.execute(text("SELECT pod_id, name FROM pod_tags JOIN tags ON tags.id = tag_id ORDER BY pod_id, name")).all()
+        tag_counts = dict(connection.execute(text("SELECT name, pod_count FROM tags")).all())
+    assert [tuple(link) for link in links] == [(1, "jazz"), (1, "live"), (2, "jazz")]
+    assert tag_counts == {"jazz": 2, "live": 1}
+
+def test_migrate_legacy_tags_runs_once_per_pod():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Tag.__table__, pod_tags])
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE pods (id INTEGER PRIMARY KEY, tags TEXT)"))
+        connection.execute(text("INSERT INTO pods VALUES (1, 'jazz, live')"))
+    tag_service.migrate_legacy_tags(engine)
+
+    # Tous les tags retirés après la reprise, puis redémarrage
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM pod_tags"))
+        connection.execute(text("UPDATE tags SET pod_count = 0"))
+    tag_service.migrate_legacy_tags(engine)
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM pod_tags")).scalar() == 0
+        assert connection.execute(text("SELECT tags FROM pods")).scalar() is None
+        assert dict(connection.execute(text("SELECT name, pod_count FROM tags")).all()) == {"jazz": 0, "live": 0}
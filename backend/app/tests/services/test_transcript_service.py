@@ -0,0 +1,56 @@
+# Tests pour les services transcript_service.py et le parsing verbose_json de transcription_service.py
+
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session
+
+from app.services import transcript_service, transcription_service, audio_service
+from app.models.transcript_segment_model import TranscriptSegment
+
+@pytest.fixture
+def db_session_mock():
+    db = MagicMock(spec=Session)
+    return db
+
+# --- Tests pour normalize_text ---
+def test_normalize_text_strips_case_and_accents():
+    assert transcript_service.normalize_text("  Élève   DÉCOUVRE l'Été ") == "eleve decouvre l'ete"
+
+# --- Tests pour replace_pod_segments ---
+def test_replace_pod_segments_deletes_then_inserts(db_session_mock):
+    segments = [{"start": 0.0, "end": 2.5, "text": "Bonjour à tous"}, {"start": 2.5, "end": 4.0, "text": "Bienvenue"}]
+    count = transcript_service.replace_pod_segments(db_session_mock, 7, segments)
+
+    assert count == 2
+    db_session_mock.query.return_value.filter.return_value.delete.assert_called_once()
+    saved = db_session_mock.bulk_save_objects.call_args[0][0]
+    assert all(isinstance(segment, TranscriptSegment) for segment in saved)
+    assert saved[0].normalized_text == "bonjour a tous"
+    db_session_mock.commit.assert_called_once()
+
+def test_search_pod_segments_empty_query_does_not_hit_db(db_session_mock):
+    assert transcript_service.search_pod_segments(db_session_mock, 7, "   ") == []
+    db_session_mock.query.assert_not_called()
+
+# --- Tests pour parse_verbose_transcription ---
+def test_parse_verbose_transcription_maps_segments_to_original_timeline():
+    response = {
+        "text": "Bonjour. Au revoir.",
+        "segments": [
+            {"start": 0.0, "end": 1.0, "text": " Bonjour."},
+            {"start": 1.0, "end": 2.0, "text": " Au revoir."},
+            {"start": 2.0, "end": 2.1, "text": "  "}
+        ]
+    }
+    # Deux zones de parole : [3 s, 4 s] et [10 s, 11 s] dans l'original
+    timestamp_map = audio_service.TimestampMap([(0.0, 3.0, 1.0), (1.0, 10.0, 1.0)])
+    result = transcription_service.parse_verbose_transcription(response, timestamp_map)
+
+    assert result["text"] == "Bonjour. Au revoir."
+    assert len(result["segments"]) == 2
+    assert result["segments"][0] == {"start": 3.0, "end": 4.0, "text": "Bonjour."}
+    assert result["segments"][1]["start"] == pytest.approx(10.0)
+
+def test_parse_verbose_transcription_without_segments():
+    result = transcription_service.parse_verbose_transcription({"text": " Texte seul "})
+    assert result == {"text": "Texte seul", "segments": []}
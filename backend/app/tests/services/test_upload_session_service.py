@@ -0,0 +1,122 @@
+# Tests pour le service upload_session_service.py
+
+import base64
+import os
+
+import pytest
+from unittest.mock import MagicMock
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from starlette.requests import ClientDisconnect
+
+from app.schemas.upload_schema import PresignedUploadCreate
+from app.services import upload_session_service
+from app.services.storage_service import LocalStorageBackend
+
+@pytest.fixture
+def db_session_mock():
+    return MagicMock(spec=Session)
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_session_service.settings, "UPLOAD_SPOOL_DIR", str(tmp_path))
+    return tmp_path
+
+@pytest.fixture
+def upload_session(db_session_mock, spool_dir):
+    session = upload_session_service.create_upload_session(
+        db_session_mock, user_id=1, upload_length=10, metadata={"filename": "clip.mp4", "filetype": "video/mp4"}
+    )
+    yield session
+    if os.path.exists(session.spool_path):
+        os.unlink(session.spool_path)
+
+async def _chunks(*blocks, disconnect=False):
+    for block in blocks:
+        yield block
+    if disconnect:
+        raise ClientDisconnect()
+
+def _b64(value: str) -> str:
+    return base64.b64encode(value.encode("utf-8")).decode("ascii")
+
+# --- Tests pour parse_upload_metadata ---
+def test_parse_upload_metadata():
+    header = f"filename {_b64('vidéo.mp4')},title {_b64('Mon pod')},is_draft"
+    assert upload_session_service.parse_upload_metadata(header) == {"filename": "vidéo.mp4", "title": "Mon pod", "is_draft": ""}
+    assert upload_session_service.parse_upload_metadata(None) == {}
+
+def test_parse_upload_metadata_invalid_base64():
+    with pytest.raises(HTTPException) as exc_info:
+        upload_session_service.parse_upload_metadata("title !!!")
+    assert exc_info.value.status_code == 400
+
+# --- Tests pour create_upload_session ---
+def test_create_upload_session(upload_session, db_session_mock):
+    assert upload_session.offset == 0
+    assert upload_session.spool_path.endswith(".mp4")
+    assert os.path.getsize(upload_session.spool_path) == 0
+    db_session_mock.add.assert_called_once()
+    db_session_mock.commit.assert_called_once()
+
+def test_create_upload_session_too_large(db_session_mock, spool_dir, monkeypatch):
+    monkeypatch.setattr(upload_session_service.settings, "MAX_UPLOAD_BYTES", 100)
+    with pytest.raises(HTTPException) as exc_info:
+        upload_session_service.create_upload_session(db_session_mock, user_id=1, upload_length=101)
+    assert exc_info.value.status_code == 413
+
+# --- Tests pour append_chunk ---
+@pytest.mark.asyncio
+async def test_append_chunks_and_resume(upload_session, db_session_mock):
+    offset = await upload_session_service.append_chunk(db_session_mock, upload_session, 0, _chunks(b"abc", b"de"))
+    assert offset == 5
+    offset = await upload_session_service.append_chunk(db_session_mock, upload_session, 5, _chunks(b"fghij"))
+    assert offset == 10
+    assert upload_session_service.is_complete(upload_session)
+    with open(upload_session.spool_path, "rb") as spool_file:
+        assert spool_file.read() == b"abcdefghij"
+
+@pytest.mark.asyncio
+async def test_append_chunk_rejects_wrong_offset(upload_session, db_session_mock):
+    await upload_session_service.append_chunk(db_session_mock, upload_session, 0, _chunks(b"abc"))
+    with pytest.raises(HTTPException) as exc_info:
+        await upload_session_service.append_chunk(db_session_mock, upload_session, 0, _chunks(b"abc"))
+    assert exc_info.value.status_code == 409
+
+@pytest.mark.asyncio
+async def test_append_chunk_keeps_bytes_received_before_disconnect(upload_session, db_session_mock):
+    offset = await upload_session_service.append_chunk(db_session_mock, upload_session, 0, _chunks(b"abcd", disconnect=True))
+    assert offset == 4
+    assert upload_session.offset == 4
+
+@pytest.mark.asyncio
+async def test_append_chunk_rejects_data_beyond_upload_length(upload_session, db_session_mock):
+    with pytest.raises(HTTPException) as exc_info:
+        await upload_session_service.append_chunk(db_session_mock, upload_session, 0, _chunks(b"abcdef", b"ghijkl"))
+    assert exc_info.value.status_code == 413
+    # Le premier bloc, valide, reste acquis
+    assert upload_session.offset == 6
+
+@pytest.mark.asyncio
+async def test_append_chunk_after_finalize(upload_session, db_session_mock):
+    upload_session_service.mark_finalized(db_session_mock, upload_session, pod_id=3)
+    with pytest.raises(HTTPException) as exc_info:
+        await upload_session_service.append_chunk(db_session_mock, upload_session, 0, _chunks(b"abc"))
+    assert exc_info.value.status_code == 409
+
+def test_delete_upload_session_removes_file(upload_session, db_session_mock):
+    upload_session_service.delete_upload_session(db_session_mock, upload_session)
+    assert not os.path.exists(upload_session.spool_path)
+    db_session_mock.delete.assert_called_once_with(upload_session)
+
+def test_presigned_upload_requires_s3_storage(db_session_mock, spool_dir, monkeypatch):
+    monkeypatch.setattr(
+        upload_session_service.storage_service,
+        "_storage_backend",
+        LocalStorageBackend(root=str(spool_dir), public_base_url="https://api.example.com/static/media")
+    )
+    upload = PresignedUploadCreate(title="Mon pod", filename="clip.mp4", content_type="video/mp4", size=10)
+
+    with pytest.raises(HTTPException) as exc_info:
+        upload_session_service.create_presigned_upload_session(db_session_mock, user_id=1, upload=upload)
+    assert exc_info.value.status_code == 501
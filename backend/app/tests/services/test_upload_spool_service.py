@@ -0,0 +1,69 @@
+# Tests pour le service upload_spool_service.py
+
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.services import upload_spool_service
+
+def _upload_file(content: bytes, filename: str = "video.mp4", size=None) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=filename, size=size)
+
+@pytest.mark.asyncio
+async def test_spool_upload_file_computes_size_and_sha256():
+    content = b"0123456789" * 1000
+    spooled = await upload_spool_service.spool_upload_file(_upload_file(content), max_bytes=20_000, chunk_size=512)
+    try:
+        assert spooled.size == len(content)
+        assert spooled.sha256 == hashlib.sha256(content).hexdigest()
+        assert spooled.path.endswith(".mp4")
+        with open(spooled.path, "rb") as spooled_file:
+            assert spooled_file.read() == content
+    finally:
+        spooled.cleanup()
+    assert not os.path.exists(spooled.path)
+
+@pytest.mark.asyncio
+async def test_spool_upload_file_rejects_oversized_body_while_streaming(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_spool_service.settings, "UPLOAD_SPOOL_DIR", str(tmp_path))
+    with pytest.raises(HTTPException) as exc_info:
+        await upload_spool_service.spool_upload_file(_upload_file(b"x" * 5000), max_bytes=1000, chunk_size=256)
+    assert exc_info.value.status_code == 413
+    # Le fichier partiel est supprimé
+    assert list(tmp_path.iterdir()) == []
+
+@pytest.mark.asyncio
+async def test_spool_upload_file_rejects_declared_size_upfront():
+    with pytest.raises(HTTPException) as exc_info:
+        await upload_spool_service.spool_upload_file(_upload_file(b"", size=10_000), max_bytes=1000)
+    assert exc_info.value.status_code == 413
+
+@pytest.mark.asyncio
+async def test_spool_stream_context_manager_cleans_up():
+    async def chunks():
+        yield b"abc"
+        yield b""
+        yield b"def"
+
+    with await upload_spool_service.spool_stream(chunks(), max_bytes=100, filename="a.ogg") as spooled:
+        assert spooled.size == 6
+        assert spooled.filename == "a.ogg"
+        path = spooled.path
+    assert not os.path.exists(path)
+
+@pytest.mark.asyncio
+async def test_peek_stream_replays_header():
+    async def chunks():
+        for chunk in (b"abc", b"defg", b"hij"):
+            yield chunk
+
+    header, body = await upload_spool_service.peek_stream(chunks(), 5)
+    assert header == b"abcde"
+    assert b"".join([chunk async for chunk in body]) == b"abcdefghij"
+
+    header, body = await upload_spool_service.peek_stream(chunks(), 100)
+    assert header == b"abcdefghij"
+    assert b"".join([chunk async for chunk in body]) == b"abcdefghij"
@@ -0,0 +1,134 @@
+# Tests pour le service video_service.py
+
+import asyncio
+import os
+import struct
+import sys
+
+import pytest
+from unittest.mock import MagicMock
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.services import video_service
+from app.services.ffmpeg_service import FFmpegRunner
+
+def _box(box_type: bytes, payload_size: int = 0) -> bytes:
+    return struct.pack(">I4s", 8 + payload_size, box_type) + b"\0" * payload_size
+
+def test_can_stream_container_faststart_mp4():
+    header = _box(b"ftyp", 16) + _box(b"moov", 100) + _box(b"mdat", 1000)
+    assert video_service.can_stream_container(header) is True
+
+def test_can_stream_container_mdat_before_moov():
+    header = _box(b"ftyp", 16) + _box(b"free") + _box(b"mdat", 1000)
+    assert video_service.can_stream_container(header) is False
+
+def test_can_stream_container_unknown_layout_falls_back_to_file_mode():
+    # La première boîte dépasse l'en-tête lu : position de `moov` inconnue
+    header = struct.pack(">I4s", 1_000_000, b"ftyp") + b"\0" * 64
+    assert video_service.can_stream_container(header) is False
+
+def test_can_stream_container_non_mp4():
+    # En-tête EBML (Matroska/WebM)
+    assert video_service.can_stream_container(b"\x1a\x45\xdf\xa3" + b"\0" * 60) is True
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch):
+    """Remplace ffmpeg par un processus Python qui inverse les octets reçus."""
+    runner = FFmpegRunner(max_concurrency=2)
+    script = "import sys; sys.stdout.buffer.write(sys.stdin.buffer.read()[::-1])"
+
+    def stream_ffmpeg(command, chunks, timeout=None):
+        return runner.stream([sys.executable, "-c", script], chunks, timeout=timeout)
+
+    monkeypatch.setattr(video_service, "stream_ffmpeg", stream_ffmpeg)
+    return runner
+
+async def _request_body(content, chunk_size):
+    # Corps de requête reçu par blocs, comme Request.stream()
+    for start in range(0, len(content), chunk_size):
+        await asyncio.sleep(0)
+        yield content[start:start + chunk_size]
+
+@pytest.fixture
+def uploaded_audio(monkeypatch):
+    uploaded = {}
+
+    async def store_media_stream(db, chunks, filename, commit=True):
+        uploaded["content"] = b"".join([chunk async for chunk in chunks])
+        uploaded["commit"] = commit
+        return MagicMock(url=f"https://storage.example.com/media/{filename}")
+
+    monkeypatch.setattr(video_service.media_store_service, "store_media_stream", store_media_stream)
+    return uploaded
+
+@pytest.mark.asyncio
+async def test_ingest_video_stream_spools_and_uploads_concurrently(fake_ffmpeg, uploaded_audio, monkeypatch):
+    content = bytes(range(256)) * 40
+
+    spooled, audio_url = await video_service.ingest_video_stream(
+        MagicMock(spec=Session), _request_body(content, 1024), "clip.mp3", filename="clip.mp4"
+    )
+    try:
+        with open(spooled.path, "rb") as spooled_file:
+            assert spooled_file.read() == content
+        assert uploaded_audio["content"] == content[::-1]
+        assert audio_url == "https://storage.example.com/media/clip.mp3"
+        # Référence validée avec la création du Pod
+        assert uploaded_audio["commit"] is False
+        assert fake_ffmpeg.metrics()["completed"] == 1
+    finally:
+        spooled.cleanup()
+
+@pytest.mark.asyncio
+async def test_ingest_video_stream_rejects_oversized_upload(fake_ffmpeg, uploaded_audio, monkeypatch, tmp_path):
+    monkeypatch.setattr(video_service.settings, "MAX_UPLOAD_BYTES", 4096)
+    monkeypatch.setattr(video_service.settings, "UPLOAD_SPOOL_DIR", str(tmp_path))
+    db = MagicMock(spec=Session)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await video_service.ingest_video_stream(db, _request_body(b"x" * 10_000, 1024), "clip.mp3", filename="clip.mp4")
+    assert exc_info.value.status_code == 413
+    db.rollback.assert_called_once()
+    assert list(tmp_path.iterdir()) == []
+    assert fake_ffmpeg.metrics()["running"] == 0
+
+@pytest.fixture
+def recorded_ffmpeg(monkeypatch):
+    commands = []
+
+    async def run_ffmpeg(command, input=None, timeout=None):
+        commands.append(command)
+        return b""
+
+    monkeypatch.setattr(video_service, "run_ffmpeg", run_ffmpeg)
+    return commands
+
+@pytest.mark.asyncio
+async def test_extract_audio_copies_compatible_track(recorded_ffmpeg, monkeypatch):
+    async def probe_media(path):
+        return {"streams": [{"codec_type": "audio", "codec_name": "aac", "bit_rate": "128000"}], "format": {}}
+
+    monkeypatch.setattr(video_service.audio_service, "probe_media", probe_media)
+    audio_path = await video_service.extract_audio_from_video("/tmp/clip.mp4")
+    try:
+        assert audio_path.endswith(".m4a")
+        command = recorded_ffmpeg[0]
+        assert command[command.index("-c:a") + 1] == "copy"
+    finally:
+        os.unlink(audio_path)
+
+@pytest.mark.asyncio
+async def test_extract_audio_reencodes_other_tracks(recorded_ffmpeg, monkeypatch):
+    async def probe_media(path):
+        return {"streams": [{"codec_type": "audio", "codec_name": "pcm_s16le", "bit_rate": "1536000"}], "format": {}}
+
+    monkeypatch.setattr(video_service.audio_service, "probe_media", probe_media)
+    audio_path = await video_service.extract_audio_from_video("/tmp/clip.mov")
+    try:
+        assert audio_path.endswith(".mp3")
+        command = recorded_ffmpeg[0]
+        assert command[command.index("-c:a") + 1] == "libmp3lame"
+    finally:
+        os.unlink(audio_path)
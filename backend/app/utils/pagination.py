@@ -0,0 +1,57 @@
+# Pagination par curseur (« keyset ») sur (created_at, id)
+#
+# Les listes sont triées du plus récent au plus ancien. Le curseur opaque encode le couple
+# (created_at, id) du dernier élément renvoyé ; la page suivante reprend strictement après lui
+# grâce à un index composite (created_at, id). Le coût d'une page ne dépend pas de sa position,
+# et les insertions concurrentes ne provoquent ni doublons ni éléments sautés, contrairement à OFFSET.
+
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Décode un curseur ; 400 s'il est invalide."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Curseur de pagination invalide")
+
+
+def paginate(query: Query, model, limit: int, cursor: Optional[str] = None, skip: int = 0) -> Tuple[List, Optional[str]]:
+    """
+    Retourne une page de `query` (triée par created_at puis id décroissants) et le curseur de la
+    page suivante (None s'il n'y en a pas). `skip` (OFFSET) n'est conservé que pour compatibilité.
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, item_id))
+    elif skip:
+        query = query.offset(skip)
+
+    # Un élément de plus que demandé indique s'il existe une page suivante
+    items = query.limit(limit + 1).all()
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor(items[-1].created_at, items[-1].id)
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor